@@ -180,38 +180,37 @@ class ModuleFtv(PluginModuleBase):
         if mode == 'none':
             return
 
+        from .trans_batch import trans_batch
+
+        # 번역 대상 (dict, key) 를 모아 한 번에 일괄 번역한 뒤 제자리에 반영
+        targets = []
         if data_type == 'show':
             if data['is_plot_kor'] == False:
                 data['is_plot_kor'] = True
-                data['plot'] = SiteUtil.trans(data['plot'], source='en')
+                targets.append((data, 'plot'))
             if mode == 'all':
                 for actor in data['actor']:
                     #if 'is_kor_name' in actor and actor['is_kor_name'] == False:
                     #    actor['name'] = SiteUtil.trans(actor['name_original'], source='en')
                     #    actor['role'] = SiteUtil.trans(actor['role'], source='en')
                     if SiteUtil.is_include_hangul(actor['name']) == False:
-                        actor['name'] = SiteUtil.trans(actor['name'], source='en')
+                        targets.append((actor, 'name'))
                     if SiteUtil.is_include_hangul(actor['role']) == False:
-                        actor['role'] = SiteUtil.trans(actor['role'], source='en')
-                lists = [data['director'], data['producer'], data['writer']]
-                for _list in lists:
-                    new = []
-                    for name in _list:
-                        if SiteUtil.is_include_hangul(name) == False:
-                            new.append(SiteUtil.trans(name, source='en'))
-                        else:
-                            new.append(name)
-                    _list = new
+                        targets.append((actor, 'role'))
+                # director/producer/writer 번역 결과는 기존에도 반영되지 않았으므로(지역 변수에만 대입) 요청하지 않음
 
         if data_type == 'season':
             for key, tmdb_epi in data['episodes'].items():
                 try:
                     if tmdb_epi['is_title_kor'] == False:
-                        tmdb_epi['title'] = SiteUtil.trans(tmdb_epi['title'], source='en')
+                        targets.append((tmdb_epi, 'title'))
                     if tmdb_epi['is_plot_kor'] == False:
-                        tmdb_epi['plot'] = SiteUtil.trans(tmdb_epi['plot'], source='en')
+                        targets.append((tmdb_epi, 'plot'))
                 except:
                     pass
+
+        for (target, key), value in zip(targets, trans_batch([target[key] for target, key in targets], source='en', module=self.name)):
+            target[key] = value
         return data
 
 
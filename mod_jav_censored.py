@@ -1,7 +1,13 @@
 import os
 import re
+import copy
+import json
 import shutil
+import threading
+import time
 import traceback
+from collections import deque
+from types import MappingProxyType
 
 from urllib.parse import urlparse
 from flask import send_from_directory
@@ -22,6 +28,7 @@ from support_site.entity_av import EntityAVSearch
 
 from .setup import *
 from support import SupportYaml
+from sqlalchemy import and_, or_
 
 from flask import send_file
 from io import BytesIO
@@ -46,10 +53,23 @@ class ModuleJavCensored(PluginModuleBase):
             f"{self.name}_db_version": "1",
             f"{self.name}_order": "dmm, mgstage, jav321, javbus, javdb",
             f"{self.name}_actor_order": "avdbs",
+            # info() 배우 정보 조회 동시 처리 스레드 수 (모든 요청 공유, 1 이면 순차)
+            f"{self.name}_actor_resolve_workers": "4",
             f"{self.name}_result_priority_order": "dmm_videoa, dmm_dvd, mgstage, dmm_bluray, dmm_amateur, dmm_unknown, jav321, javbus, javdb",
 
             f"{self.name}_mgs_label_priority": "False",
             f"{self.name}_mgs_label_priority_exclude": "",
+            # 사이트 동시 검색 (fan-out). 사이트별 동시 요청 상한은 '사이트:개수' 쉼표 구분
+            f"{self.name}_search_fanout": "False",
+            f"{self.name}_search_fanout_workers": "4",
+            f"{self.name}_search_site_concurrency": "dmm:2, mgstage:2, jav321:2, javdb:1, javbus:2",
+            # 검색 결과 캐시 (시간 단위 TTL, 결과 없음은 negative TTL)
+            f"{self.name}_search_cache_use": "False",
+            f"{self.name}_search_cache_ttl": "72",
+            f"{self.name}_search_cache_negative_ttl": "6",
+            # 레이블 -> 사이트 검색 경로 학습 (N회 조회 동안 100점이 없던 사이트는 해당 레이블 검색에서 제외, 0 이면 제외 안 함)
+            f"{self.name}_label_route_use": "False",
+            f"{self.name}_label_route_prune_attempts": "10",
 
             # 공통 설정
             f"{self.name}_trans_option": "using",  #"not_using" 사용안함, "using" 내장기본구글web2, "using_plugin":번역플러그인
@@ -76,11 +96,14 @@ class ModuleJavCensored(PluginModuleBase):
             f"{self.name}_db_use": "False",
             f"{self.name}_db_save": "False",
             f"{self.name}_db_save_only_translated": "True",
+            f"{self.name}_db_save_write_behind": "False",
             f"{self.name}_db_auto_enrich": "True",
             f"{self.name}_db_delete_user_images": "False",
             f"{self.name}_enrich_delay": "2.0",
             f"{self.name}_db_import_path": "",
+            f"{self.name}_db_export_format": "db",
             f"{self.name}_db_image_url_mapping": "",
+            f"{self.name}_image_manifest_time": "",
 
             f"{self.name}_selenium_url": "", 
             f"{self.name}_selenium_driver_type": "chrome",
@@ -176,6 +199,26 @@ class ModuleJavCensored(PluginModuleBase):
             'is_running': False, 'status': '대기 중', 'total': 0,
             'current': 0, 'success': 0, 'fail': 0, 'current_code': '', 'stop_flag': False
         }
+        self.export_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0,
+            'current': 0, 'filename': '', 'msg': ''
+        }
+        self.clear_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0, 'current': 0,
+            'count': 0, 'deleted': 0, 'skipped_user': 0, 'msg': ''
+        }
+        self.manifest_status = {
+            'is_running': False, 'status': '대기 중', 'current': 0, 'indexed': 0, 'msg': ''
+        }
+
+        self._search_executor = None
+        self._search_executor_workers = 0
+        self._site_gates = {}
+        self._search_fanout_lock = threading.Lock()
+        self._actor_executor = None
+        self._actor_executor_workers = 0
+        self._actor_executor_lock = threading.Lock()
+        self.setting_snapshot = None
 
         try:
             self.keyword_cache = F.get_cache(f"{P.package_name}_{self.name}_keyword_cache")
@@ -206,9 +249,10 @@ class ModuleJavCensored(PluginModuleBase):
             logger.error(f"[{self.name}] DB Sync Error: {e_db_sync}")
 
         try:
-            from .model_metadata_db import engine, Base, ModelAvMetadata
+            from .model_metadata_db import engine, Base, ModelAvMetadata, migrate_db
             
             Base.metadata.create_all(bind=engine)
+            migrate_db()
             logger.info(f"[{self.name}] Dedicated Metadata DB initialized perfectly at metadata_av.db")
             self.web_list_model = ModelAvMetadata
         except Exception as e_db_create:
@@ -217,15 +261,56 @@ class ModuleJavCensored(PluginModuleBase):
 
         self.create_default_settings_yaml()
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
+
+
+    def plugin_unload(self):
+        # write-behind 큐에 남은 메타데이터 저장
+        try:
+            from .model_metadata_db import ModelAvMetadata
+            ModelAvMetadata.flush_write_behind()
+        except Exception as e:
+            logger.error(f"[{self.name}] write-behind flush error: {e}")
+        if self._search_executor is not None:
+            self._search_executor.shutdown(wait=False)
+            self._search_executor = None
+        if self._actor_executor is not None:
+            self._actor_executor.shutdown(wait=False)
+            self._actor_executor = None
 
 
     def plugin_load_celery(self):
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
 
 
     # 사이트 설정값이 바뀌면 config
     def setting_save_after(self, change_list):
         ins_list = []
+        self._rebuild_setting_snapshot()
+        # Uncensored 모듈도 jav_censored_ 공통 설정(타이틀 포맷/태그/부가영상)을 스냅샷으로 사용
+        try:
+            uncensored_module = P.get_module('jav_uncensored')
+            if uncensored_module:
+                uncensored_module._rebuild_setting_snapshot()
+        except Exception as e:
+            logger.error(f"[{self.name}] uncensored setting snapshot error: {e}")
+
+        # 검색 순서/우선순위 설정이 바뀌면 검색 결과 캐시 무효화
+        if set(change_list) & set(self._search_cache_setting_keys()):
+            try:
+                from .model_metadata_db import ModelAvSearchCache
+                ModelAvSearchCache.invalidate(self.name)
+            except Exception as e:
+                logger.error(f"[{self.name}] search cache invalidate error: {e}")
+
+        # 통합 설정 파일이 바뀌면 태그 번역 규칙도 바뀌므로 태그 번역 메모리 초기화
+        if "jav_settings_filepath" in change_list:
+            try:
+                from .model_metadata_db import ModelAvTransMemory
+                ModelAvTransMemory.clear(engine='av_tag')
+            except Exception as e:
+                logger.error(f"[{self.name}] trans memory clear error: {e}")
 
         always_all_set = [
             "jav_censored_use_extras",
@@ -276,6 +361,95 @@ class ModuleJavCensored(PluginModuleBase):
                 P.logger.error(f"Error initializing site {ins}: {str(e)}")
 
 
+    def _build_setting_snapshot(self):
+        """
+        search/info/web_list 요청 경로에서 쓰는 설정을 한 번에 읽어 파싱한 읽기 전용 스냅샷.
+        설정 저장(setting_save_after)/플러그인 로드 시 통째로 새로 만들어 교체하므로 요청 처리 중에는 설정 DB 를 읽지 않음
+        """
+        import hashlib
+        from .model_metadata_db import ModelAvMetadata
+        MS = P.ModelSetting
+
+        order = tuple(site_key for site_key in MS.get_list(f"{self.name}_order", ",") if site_key)
+
+        # 사이트별 '지정 레이블 최우선 검색' 레이블 집합과, 레이블 -> 우선 사이트 (메타 우선순위 순서상 첫 사이트)
+        site_priority_labels = {}
+        for site_key in self.site_map:
+            labels_str = MS.get(f"{self.name}_{site_key}_priority_search_labels") or ''
+            labels = frozenset(lbl.strip().upper() for lbl in labels_str.split(',') if lbl.strip())
+            if labels:
+                site_priority_labels[site_key] = labels
+        priority_label_site = {}
+        for site_key in order:
+            for label in site_priority_labels.get(site_key, ()):
+                priority_label_site.setdefault(label, site_key)
+
+        exclude_str = MS.get(f"{self.name}_mgs_label_priority_exclude") or ''
+        priority_list = [x.strip() for x in (MS.get('jav_censored_result_priority_order') or '').split(',') if x.strip()]
+
+        site_concurrency = {}
+        for part in re.split(r'[,\n]', MS.get(f"{self.name}_search_site_concurrency") or ''):
+            if ':' in part:
+                site_key, cap = part.split(':', 1)
+                try: site_concurrency[site_key.strip().lower()] = max(1, int(cap.strip()))
+                except ValueError: pass
+
+        # 번역 메모리 엔진 키. 번역 방식/모델이 바뀌면 다른 키가 되어 이전 번역을 재사용하지 않음
+        if MS.get_bool(f"{self.name}_use_ollama"):
+            trans_engine = f"jav:ollama:{MS.get(f'{self.name}_ollama_model')}"
+        else:
+            trans_engine = f"jav:{MS.get(f'{self.name}_trans_option')}"
+
+        def ttl_seconds(key):
+            try: return int(float(MS.get(key) or 0) * 3600)
+            except ValueError: return 0
+
+        return MappingProxyType({
+            'order': order,
+            'site_priority_labels': MappingProxyType(site_priority_labels),
+            'priority_label_site': MappingProxyType(priority_label_site),
+            'mgs_label_priority': MS.get_bool(f"{self.name}_mgs_label_priority"),
+            'mgs_label_priority_exclude': frozenset(x.strip().upper() for x in re.split(r'[\s,\n]', exclude_str) if x.strip()),
+            'result_priority_map': MappingProxyType({key: index for index, key in enumerate(priority_list)}),
+            'search_fanout': MS.get_bool(f"{self.name}_search_fanout"),
+            'search_fanout_workers': max(1, MS.get_int(f"{self.name}_search_fanout_workers") or 4),
+            'search_site_concurrency': MappingProxyType(site_concurrency),
+            'search_cache_use': MS.get_bool(f"{self.name}_search_cache_use"),
+            'search_cache_fingerprint': hashlib.sha1('\n'.join(f"{key}={MS.get(key)}" for key in self._search_cache_setting_keys()).encode('utf-8')).hexdigest(),
+            'search_cache_ttl': ttl_seconds(f"{self.name}_search_cache_ttl"),
+            'search_cache_negative_ttl': ttl_seconds(f"{self.name}_search_cache_negative_ttl"),
+            'label_route_use': MS.get_bool(f"{self.name}_label_route_use"),
+            'label_route_prune_attempts': MS.get_int(f"{self.name}_label_route_prune_attempts") or 0,
+            'db_use': MS.get_bool(f"{self.name}_db_use"),
+            'db_save': MS.get_bool(f"{self.name}_db_save"),
+            'db_save_only_translated': MS.get_bool(f"{self.name}_db_save_only_translated"),
+            'db_save_write_behind': MS.get_bool(f"{self.name}_db_save_write_behind"),
+            'db_image_url_mappings': ModelAvMetadata.parse_url_mappings(MS.get(f"{self.name}_db_image_url_mapping")),
+            'use_hq_poster_check': MS.get_bool(f"{self.name}_use_hq_poster_check"),
+            'title_format': MS.get(f"{self.name}_title_format"),
+            'tag_option': MS.get(f"{self.name}_tag_option"),
+            'actor_order': tuple(MS.get_list(f"{self.name}_actor_order", ",")),
+            'actor_resolve_workers': max(1, MS.get_int(f"{self.name}_actor_resolve_workers") or 1),
+            'image_mode': MS.get('jav_censored_image_mode'),
+            'trans_engine': trans_engine,
+        })
+
+
+    def _rebuild_setting_snapshot(self):
+        try:
+            self.setting_snapshot = self._build_setting_snapshot()
+        except Exception as e:
+            logger.error(f"[{self.name}] setting snapshot build error: {e}")
+            logger.error(traceback.format_exc())
+
+
+    def _get_setting_snapshot(self):
+        snapshot = self.setting_snapshot
+        if snapshot is None:
+            snapshot = self.setting_snapshot = self._build_setting_snapshot()
+        return snapshot
+
+
     def _sort_search_results(self, search_results_raw, call_site=None):
         """
         검색 결과 리스트를 사용자 정의 우선순위에 따라 정렬합니다.
@@ -283,10 +457,8 @@ class ModuleJavCensored(PluginModuleBase):
         if not search_results_raw:
             return []
 
-        priority_string = P.ModelSetting.get('jav_censored_result_priority_order')
-        priority_list = [x.strip() for x in priority_string.split(',') if x.strip()]
-        dynamic_priority_map = {key: index for index, key in enumerate(priority_list)}
-        lowest_priority = len(priority_list)
+        dynamic_priority_map = self._get_setting_snapshot()['result_priority_map']
+        lowest_priority = len(dynamic_priority_map)
 
         def get_priority_value(item_to_sort):
             site_key = item_to_sort.get('site_key', call_site)
@@ -316,17 +488,44 @@ class ModuleJavCensored(PluginModuleBase):
             # 1. 폼 검색 목록 요청(command가 없거나 db_list인 경우)
             if not command or command == 'db_list' or req.form.get('page_size') is not None:
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             # 2. 백그라운드 미디어 채우기 상태 조회 (최우선 즉시 반환)
             if command == 'db_enrich_status':
                 return jsonify({'ret': 'success', 'data': self.enrich_status})
+            if command == 'db_export_status':
+                return jsonify({'ret': 'success', 'data': self.export_status})
+            if command == 'db_clear_status':
+                return jsonify({'ret': 'success', 'data': self.clear_status})
+            if command == 'db_image_reconcile_status':
+                return jsonify({'ret': 'success', 'data': self.manifest_status})
+            if command == 'db_write_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_write_behind_status()})
+            if command == 'db_cache_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_metadata_cache_status()})
+            if command == 'db_info_flight_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_info_flight_status(self.name)})
+            if command == 'db_wal_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_wal_status()})
+            if command == 'db_trans_memory_status':
+                from .model_metadata_db import ModelAvTransMemory
+                return jsonify({'ret': 'success', 'data': ModelAvTransMemory.get_status()})
+            if command == 'db_search_cache_status':
+                from .model_metadata_db import ModelAvSearchCache
+                return jsonify({'ret': 'success', 'data': ModelAvSearchCache.get_status(self.name)})
+            if command == 'db_crop_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_crop_job(req.form.get('arg1'))})
 
             logger.debug(f"[{self.name}] process_ajax 요청됨 - command: {command}")
             
             # 3. 기타 커스텀 명령 처리
             custom_commands = [
-                'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum', 'db_import', 'db_export',
+                'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum', 'db_compress', 'db_detail', 'db_image_reconcile', 'db_import', 'db_export',
                 'db_enrich_start', 'db_enrich_stop', 'db_enrich_status', 'db_refresh_image', 'db_crop_save'
             ]
             if command in custom_commands:
@@ -350,11 +549,11 @@ class ModuleJavCensored(PluginModuleBase):
                 code = arg1
                 crop_data = arg2
                 pl_base64 = arg3
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(code, crop_data, pl_image_base64_data=pl_base64)
+                success, result = ModelAvMetadata.start_user_crop(code, crop_data, pl_image_base64_data=pl_base64)
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터(_p_user)가 성공적으로 저장되었습니다.', 'new_url': result_msg})
+                    return jsonify(dict(result, ret='success', msg='포스터(_p_user) 처리를 시작했습니다.'))
                 else:
-                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result_msg}'})
+                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result}'})
 
             elif command == "test":
                 code = arg2
@@ -394,18 +593,24 @@ class ModuleJavCensored(PluginModuleBase):
                 
                 # 1. Censored 모듈의 모든 사이트 설정 갱신
                 self._set_site_setting() 
+                self._rebuild_setting_snapshot()
                 
                 # 2. Uncensored 모듈을 가져와서 설정 갱신 함수 호출
                 try:
                     uncensored_module = P.get_module('jav_uncensored')
                     if uncensored_module:
                         uncensored_module._set_site_setting()
+                        uncensored_module._rebuild_setting_snapshot()
                         # logger.debug("Uncensored 모듈의 파싱 규칙도 성공적으로 새로고침했습니다.")
                     else:
                         logger.warning("Uncensored 모듈을 찾을 수 없습니다.")
                 except Exception as e:
                     logger.error(f"Uncensored 모듈의 설정을 새로고침하는 중 오류 발생: {e}")
 
+                # 태그 번역 규칙이 바뀌었을 수 있으므로 태그 번역 메모리 초기화
+                from .model_metadata_db import ModelAvTransMemory
+                ModelAvTransMemory.clear(engine='av_tag')
+
                 ret['msg'] = "모든 JAV 설정을 새로고침했습니다."
                 return jsonify(ret)
 
@@ -428,8 +633,24 @@ class ModuleJavCensored(PluginModuleBase):
                         instance.session.cache.clear()
                     except Exception as e:
                         pass
+                from .model_metadata_db import ModelAvSearchCache
+                ModelAvSearchCache.invalidate(self.name)
                 return jsonify({"msg": "초기화 성공"})
 
+            elif command == "label_route_table":
+                from .model_metadata_db import ModelAvLabelRoute
+                return jsonify({'ret': 'success', 'data': ModelAvLabelRoute.get_table(self.name)})
+
+            elif command == "label_route_reset":
+                from .model_metadata_db import ModelAvLabelRoute
+                count = ModelAvLabelRoute.reset(self.name, label=arg1 or None)
+                return jsonify({'ret': 'success', 'msg': f"레이블 경로 {count}건 초기화"})
+
+            elif command == "trans_memory_clear":
+                from .model_metadata_db import ModelAvTransMemory
+                count = ModelAvTransMemory.clear(engine=arg1 or None)
+                return jsonify({'ret': 'success', 'msg': f"번역 메모리 {count}건 초기화"})
+
             elif command == 'model_action':
                 action = arg1 # 'download'
                 model_type = arg2 # 'face' or 'pose'
@@ -482,7 +703,7 @@ class ModuleJavCensored(PluginModuleBase):
 
             elif command == 'db_list':
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             elif command == 'db_delete':
                 from .model_metadata_db import ModelAvMetadata
@@ -517,10 +738,17 @@ class ModuleJavCensored(PluginModuleBase):
                 
             elif command == 'db_clear':
                 from .model_metadata_db import ModelAvMetadata
-                success, count = ModelAvMetadata.clear_db(self.category)
-                ret['ret'] = 'success' if success else 'error'
-                ret['msg'] = f"모든 메타데이터 DB가 초기화되었습니다. ({count}건 삭제됨)" if success else "초기화 실패"
-                return jsonify(ret)
+                if self.clear_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 DB 초기화 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_clear(self.category, status=self.clear_status)
+                return jsonify({'ret': 'success', 'msg': 'DB 초기화 작업을 백그라운드에서 시작했습니다.'})
+
+            elif command == 'db_image_reconcile':
+                from .model_metadata_db import ModelAvMetadata
+                if self.manifest_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 이미지 인덱스 재구성 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_image_reconcile(self.category, status=self.manifest_status)
+                return jsonify({'ret': 'success', 'msg': '이미지 인덱스 재구성을 백그라운드에서 시작했습니다.'})
 
             elif command == 'db_vacuum':
                 from .model_metadata_db import ModelAvMetadata
@@ -529,65 +757,48 @@ class ModuleJavCensored(PluginModuleBase):
                 ret['msg'] = "DB 최적화(VACUUM)가 완료되었습니다." if success else "최적화 실패"
                 return jsonify(ret)
 
+            elif command == 'db_detail':
+                from .model_metadata_db import ModelAvMetadata
+                data = ModelAvMetadata.get_detail(arg1)
+                if data is None:
+                    return jsonify({'ret': 'warning', 'msg': f'DB 레코드 없음: {arg1}'})
+                return jsonify({'ret': 'success', 'data': data})
+
+            elif command == 'db_compress':
+                from .model_metadata_db import ModelAvMetadata
+                codec = arg1 if arg1 in ('zstd', 'zlib', 'none') else 'zstd'
+                ModelAvMetadata.start_compress(codec)
+                msg = 'json 압축 해제' if codec == 'none' else f'json 압축 저장({codec}) 변환'
+                return jsonify({'ret': 'success', 'msg': f'{msg} 작업을 백그라운드에서 시작했습니다. 완료 후 VACUUM 까지 자동 진행되며 진행 상황은 로그에서 확인하세요.'})
+
             elif command == 'db_export':
                 from .model_metadata_db import ModelAvMetadata
-                import json, sqlite3
                 from datetime import datetime
-                
+
                 mode = arg1 # 'current' 또는 'all'
+                if self.export_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 Export 작업이 진행 중입니다.'})
                 try:
                     tmp_dir = os.path.join(path_data, 'tmp')
                     os.makedirs(tmp_dir, exist_ok=True)
-                    
+
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     category_suffix = "CEN" if mode == 'current' else "ALL"
-                    filename = f"metadata_av_{category_suffix}_{timestamp}.db"
-                    filepath = os.path.join(tmp_dir, filename)
-
-                    # Export용 새 DB 파일 생성 및 테이블 구조 복사
-                    new_conn = sqlite3.connect(filepath)
-                    new_c = new_conn.cursor()
-                    new_c.execute('''CREATE TABLE av_metadata_cache (
-                        id INTEGER PRIMARY KEY,
-                        category VARCHAR(20) NOT NULL,
-                        code VARCHAR(100) NOT NULL,
-                        originaltitle VARCHAR(255) NOT NULL,
-                        site VARCHAR(50) NOT NULL,
-                        title VARCHAR(255) NOT NULL,
-                        poster_url VARCHAR(500),
-                        json_data JSON NOT NULL,
-                        created_time DATETIME,
-                        updated_time DATETIME
-                    )''')
-
-                    # 데이터 조회
-                    records = ModelAvMetadata.query.filter_by(category=self.category).all() if mode == 'current' else ModelAvMetadata.query.all()
-                    count = 0
-
-                    for r in records:
-                        clean_data = ModelAvMetadata.sanitize_for_export(r.json_data)
-                        
-                        # Datetime 포맷팅 (SQLite 안전성)
-                        c_time = r.created_time.strftime('%Y-%m-%d %H:%M:%S') if r.created_time else None
-                        u_time = r.updated_time.strftime('%Y-%m-%d %H:%M:%S') if r.updated_time else None
-
-                        new_c.execute('''INSERT INTO av_metadata_cache
-                        (category, code, originaltitle, site, title, poster_url, json_data, created_time, updated_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                        (r.category, r.code, r.originaltitle, r.site, r.title, '', json.dumps(clean_data, ensure_ascii=False), c_time, u_time))
-                        count += 1
+                    extension = ModelAvMetadata.export_extension(arg2 or P.ModelSetting.get(f"{self.name}_db_export_format"))
+                    filename = f"metadata_av_{category_suffix}_{timestamp}{extension}"
 
-                    new_conn.commit()
-                    new_conn.close()
-
-                    return jsonify({'ret': 'success', 'msg': f'{count}개의 데이터가 포함된 DB 파일 준비 완료', 'filename': filename})
+                    ModelAvMetadata.start_export(
+                        os.path.join(tmp_dir, filename),
+                        category=self.category if mode == 'current' else None,
+                        status=self.export_status
+                    )
+                    return jsonify({'ret': 'success', 'msg': 'Export 작업을 백그라운드에서 시작했습니다.', 'filename': filename})
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Export Error: {e}")
                     return jsonify({'ret': 'error', 'msg': str(e)})
 
             elif command == 'db_import':
-                from .model_metadata_db import ModelAvMetadata, av_db_session
-                import json, sqlite3
+                from .model_metadata_db import ModelAvMetadata
                 
                 raw_paths = arg1
                 mode = arg2 # 'update' or 'missing'
@@ -597,93 +808,13 @@ class ModuleJavCensored(PluginModuleBase):
                 import_paths = [p.strip() for p in raw_paths.split('\n') if p.strip()]
                 
                 try:
-                    insert_count, update_count, skip_count = 0, 0, 0
-                    batch_size = 500  # 500건 단위 커밋 & 로그 출력 주기
-                    processed_in_batch = 0
-                    
-                    for import_path in import_paths:
-                        if not os.path.exists(import_path):
-                            logger.warning(f"[{self.name}] Import 경로 없음: {import_path}")
-                            continue
-
-                        # Case A: .db 파일 병합
-                        if os.path.isfile(import_path) and import_path.lower().endswith(('.db', '.sqlite')):
-                            try:
-                                conn = sqlite3.connect(import_path)
-                                c = conn.cursor()
-                                c.execute("SELECT category, code, json_data FROM av_metadata_cache WHERE category = ?", (self.category,))
-                                rows = c.fetchall()
-                                total_rows = len(rows)
-                                conn.close()
-
-                                logger.info(f"[{self.name}] DB 파일 내 {total_rows}개 레코드 병합 시작 -> {import_path}")
-
-                                for idx, (r_cat, r_code, r_json) in enumerate(rows, 1):
-                                    try:
-                                        jd = json.loads(r_json) if isinstance(r_json, str) else r_json
-                                        res = ModelAvMetadata.merge_record(self.category, jd, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_rows) * 100 if total_rows > 0 else 100
-                                            logger.info(f"[{self.name}] DB Import 진행 중: {idx}/{total_rows} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                    except Exception as e_row:
-                                        logger.error(f"Row 파싱 에러 ({r_code}): {e_row}")
-
-                                if processed_in_batch > 0:
-                                    av_db_session.commit()
-                                    processed_in_batch = 0
-                                    logger.info(f"[{self.name}] DB Import 진행 중: {total_rows}/{total_rows} (100.0%) | 최종 커밋 완료")
-
-                            except Exception as e_db_file:
-                                logger.error(f"[{self.name}] DB 파일 읽기 실패: {e_db_file}")
-
-                        # Case B: 폴더 내 .json 파일들 병합
-                        else:
-                            json_files = []
-                            if os.path.isfile(import_path) and import_path.lower().endswith('.json'):
-                                json_files.append(import_path)
-                            else:
-                                for root, _, files in os.walk(import_path):
-                                    for f in files:
-                                        if f.lower().endswith('.json'):
-                                            json_files.append(os.path.join(root, f))
-                            
-                            total_files = len(json_files)
-                            logger.info(f"[{self.name}] JSON 파일 {total_files}개 병합 시작 -> {import_path}")
-
-                            for idx, jf in enumerate(json_files, 1):
-                                try:
-                                    with open(jf, 'r', encoding='utf-8') as file:
-                                        data = json.load(file)
-                                        res = ModelAvMetadata.merge_record(self.category, data, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_files) * 100 if total_files > 0 else 100
-                                            logger.info(f"[{self.name}] JSON Import 진행 중: {idx}/{total_files} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                except Exception as e_jf:
-                                    logger.error(f"JSON 파일 파싱 에러 ({jf}): {e_jf}")
-
-                            if processed_in_batch > 0:
-                                av_db_session.commit()
-                                processed_in_batch = 0
-                                logger.info(f"[{self.name}] JSON Import 진행 중: {total_files}/{total_files} (100.0%) | 최종 커밋 완료")
-
-                    # 대용량 작업 완료 후 WAL 파일 청소
-                    ModelAvMetadata.checkpoint_wal()
-
-                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건)"
+                    stats = ModelAvMetadata.bulk_import(self.category, import_paths, mode=mode, log_name=self.name)
+                    insert_count, update_count, skip_count = stats['inserted'], stats['updated'], stats['skipped']
+
+                    # 대용량 작업 완료 후 WAL 파일 청소 (스케줄러가 유휴 시 TRUNCATE)
+                    ModelAvMetadata.request_checkpoint()
+
+                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건, {stats['rows_per_sec']:.0f}건/초)"
                     logger.info(f"[{self.name}] {final_msg}")
 
                     if auto_enrich:
@@ -698,7 +829,6 @@ class ModuleJavCensored(PluginModuleBase):
 
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Import 치명적 오류: {e}")
-                    av_db_session.rollback()
                     return jsonify({'ret': 'error', 'msg': str(e)})
 
             elif command == 'db_enrich_start':
@@ -787,13 +917,20 @@ class ModuleJavCensored(PluginModuleBase):
                 if not code or (not crop_data and not p_base64):
                     return jsonify({'ret': 'error', 'msg': 'code 또는 크롭/업로드 데이터가 누락되었습니다.'}), 400
 
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(
+                success, result = ModelAvMetadata.start_user_crop(
                     code, crop_data or "{}", pl_image_base64_data=pl_base64, p_image_base64_data=p_base64
                 )
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터가 저장되었습니다.', 'new_url': result_msg}), 200
+                    return jsonify(dict(result, ret='success', msg='포스터 처리를 시작했습니다.')), 200
                 else:
-                    return jsonify({'ret': 'error', 'msg': result_msg}), 500
+                    return jsonify({'ret': 'error', 'msg': result}), 500
+
+            if sub == "crop_status":
+                from .model_metadata_db import ModelAvMetadata
+                job = ModelAvMetadata.get_crop_job(req.args.get("job_id") or req.form.get("job_id"))
+                if not job:
+                    return jsonify({'ret': 'error', 'msg': '작업을 찾을 수 없습니다.'}), 404
+                return jsonify({'ret': 'success', 'data': job}), 200
 
             if sub == "user_image_update":
                 return self._api_user_image_update(req)
@@ -919,7 +1056,7 @@ class ModuleJavCensored(PluginModuleBase):
             'updated_items': [], 'not_found_files': [], 'errors': []
         }
         try:
-            from .model_metadata_db import ModelAvMetadata, av_db_session
+            from .model_metadata_db import ModelAvMetadata
             import json, re
 
             files = []
@@ -944,19 +1081,10 @@ class ModuleJavCensored(PluginModuleBase):
                 return jsonify(ret), 200
 
             ret['total_input'] = len(files)
-            batch_size = 100
-            processed_in_batch = 0
-            total_modified = 0
-
-            for filename in files:
-                if not filename or not isinstance(filename, str): continue
-                res, code, detail = ModelAvMetadata.update_user_image_by_filename(filename)
-                
+            for filename, res, code, detail in ModelAvMetadata.update_user_images_by_filenames(files):
                 if res == 'updated':
                     ret['updated_count'] += 1
                     ret['updated_items'].append(detail)
-                    processed_in_batch += 1
-                    total_modified += 1
                 elif res == 'already':
                     ret['already_count'] += 1
                 elif res == 'not_found':
@@ -967,15 +1095,8 @@ class ModuleJavCensored(PluginModuleBase):
                 elif res == 'error':
                     ret['errors'].append({'file': filename, 'error': detail})
 
-                if processed_in_batch >= batch_size:
-                    av_db_session.commit()
-                    processed_in_batch = 0
-
-            if processed_in_batch > 0:
-                av_db_session.commit()
-
-            if total_modified > 0:
-                ModelAvMetadata.checkpoint_wal()
+            if ret['updated_count'] > 0:
+                ModelAvMetadata.request_checkpoint()
 
             ret['msg'] = f"총 {len(files)}개 중 갱신: {ret['updated_count']}개, 기적용(유지): {ret['already_count']}개, 미등록: {ret['not_found_count']}개"
             logger.info(f"[{self.name}] User Image API: {ret['msg']}")
@@ -1086,6 +1207,205 @@ class ModuleJavCensored(PluginModuleBase):
         return all_results
 
 
+    def _get_search_executor(self):
+        """사이트 동시 검색용 스레드 풀 (설정된 스레드 수가 바뀌면 새로 생성)"""
+        from concurrent.futures import ThreadPoolExecutor
+        workers = self._get_setting_snapshot()['search_fanout_workers']
+        with self._search_fanout_lock:
+            if self._search_executor is None or self._search_executor_workers != workers:
+                if self._search_executor is not None:
+                    self._search_executor.shutdown(wait=False)
+                self._search_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}_search")
+                self._search_executor_workers = workers
+            return self._search_executor
+
+
+    def _submit_site_search(self, site_key, fn):
+        """
+        사이트별 동시 요청 상한(설정에 없는 사이트는 2) 안에서만 스레드 풀에 제출하고 Future 를 반환.
+        상한에 걸린 요청은 대기열에 두었다가 같은 사이트의 앞선 요청이 끝나면 제출 (풀 스레드가 사이트 대기로 막히지 않음).
+        반환된 Future 를 cancel 하면 대기열/풀에서 시작 전인 요청은 실행되지 않음
+        """
+        from concurrent.futures import Future
+        cap = self._get_setting_snapshot()['search_site_concurrency'].get(site_key, 2)
+        proxy = Future()
+        with self._search_fanout_lock:
+            gate = self._site_gates.setdefault(site_key, {'cap': cap, 'running': 0, 'pending': deque()})
+            gate['cap'] = cap
+            start = gate['running'] < cap
+            if start:
+                gate['running'] += 1
+            else:
+                gate['pending'].append((proxy, fn))
+        if start:
+            self._start_site_search(site_key, proxy, fn)
+        return proxy
+
+
+    def _start_site_search(self, site_key, proxy, fn):
+        """사이트 슬롯을 확보한 요청을 풀에 제출. 실행이 끝나거나 취소/제출 실패 시 슬롯을 다음 대기 요청에 넘김"""
+        def task():
+            try:
+                if not proxy.set_running_or_notify_cancel():
+                    return
+                try:
+                    result = fn()
+                except BaseException as e:
+                    proxy.set_exception(e)
+                else:
+                    proxy.set_result(result)
+            finally:
+                self._release_site_slot(site_key)
+
+        try:
+            self._get_search_executor().submit(task)
+        except RuntimeError as e:
+            # 종료된 풀 (플러그인 언로드 중)
+            if proxy.set_running_or_notify_cancel():
+                proxy.set_exception(e)
+            self._release_site_slot(site_key)
+
+
+    def _release_site_slot(self, site_key):
+        with self._search_fanout_lock:
+            gate = self._site_gates[site_key]
+            next_item = None
+            while gate['pending']:
+                item = gate['pending'].popleft()
+                if not item[0].cancelled():
+                    next_item = item
+                    break
+            if next_item is None or gate['running'] > gate['cap']:
+                # 상한이 줄었으면 슬롯을 반납하고 대기 요청은 남은 슬롯이 넘겨받음
+                gate['running'] -= 1
+                if next_item is not None:
+                    gate['pending'].appendleft(next_item)
+                    next_item = None
+        if next_item is not None:
+            self._start_site_search(site_key, *next_item)
+
+
+    def _iter_site_search(self, keyword, site_list, manual=False, timings=None, failed_sites=None):
+        """
+        site_list 순서대로 (site_key, search2 결과) 를 생성.
+        동시 검색 설정 시 모든 사이트 요청을 스레드 풀에 먼저 제출하고 순서대로 결과를 기다림.
+        호출부가 조기 종료(close)하면 시작 전인 요청은 취소하고 진행 중인 요청의 결과는 버림.
+        timings 가 주어지면 사이트별 search2 소요 시간(ms)을, failed_sites 가 주어지면 응답하지 못한(예외/오류) 사이트를 기록
+        """
+        site_list = [site_key for site_key in site_list if site_key in self.site_map]
+        if timings is None:
+            timings = {}
+        if not self._get_setting_snapshot()['search_fanout'] or len(site_list) < 2:
+            for site_key in site_list:
+                logger.debug(f"--- Searching on site: {site_key} ---")
+                started = time.monotonic()
+                data = self.search2(keyword, site_key, manual=manual, failed_sites=failed_sites)
+                timings[site_key] = int((time.monotonic() - started) * 1000)
+                yield site_key, data
+            return
+
+        cancel_event = threading.Event()
+
+        def fetch(site_key):
+            if cancel_event.is_set():
+                return None
+            logger.debug(f"--- Searching on site (fan-out): {site_key} ---")
+            started = time.monotonic()
+            try:
+                return self.search2(keyword, site_key, manual=manual, failed_sites=failed_sites)
+            finally:
+                timings[site_key] = int((time.monotonic() - started) * 1000)
+
+        futures = [(site_key, self._submit_site_search(site_key, lambda site_key=site_key: fetch(site_key))) for site_key in site_list]
+        try:
+            for site_key, future in futures:
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.error(f"[{self.name}] fan-out search error on '{site_key}': {e}")
+                    if failed_sites is not None:
+                        failed_sites.add(site_key)
+                    data = None
+                yield site_key, data
+        finally:
+            cancel_event.set()
+            cancelled = sum(1 for _, future in futures if future.cancel())
+            if cancelled:
+                logger.debug(f"[{self.name}] fan-out: 대기 중인 사이트 요청 {cancelled}건 취소")
+
+
+    def _search_cache_setting_keys(self):
+        """검색 결과(사이트 순서/최종 정렬)에 영향을 주는 설정 키"""
+        return [
+            f"{self.name}_order", "jav_censored_result_priority_order",
+            f"{self.name}_mgs_label_priority", f"{self.name}_mgs_label_priority_exclude",
+            f"{self.name}_label_route_use", f"{self.name}_label_route_prune_attempts",
+        ] + [f"{self.name}_{site}_priority_search_labels" for site in self.site_map]
+
+
+    def _load_search_cache(self, keyword, manual):
+        """
+        (캐시 키, 설정 fingerprint, 캐시된 결과 | None).
+        적중 시 실제 검색과 같은 부수 효과(keyword_cache 의 code -> keyword, 수동 검색 BYPASS 플래그)를 재현
+        """
+        from .model_metadata_db import ModelAvMetadata, ModelAvSearchCache
+        cache_key = ModelAvMetadata.normalize_code(SiteAvBase._parse_ui_code(keyword)[0] or keyword)
+        fingerprint = self._get_setting_snapshot()['search_cache_fingerprint']
+        if not cache_key:
+            return None, fingerprint, None
+
+        cached_results = ModelAvSearchCache.get(self.name, cache_key, manual, fingerprint)
+        if cached_results is None:
+            return cache_key, fingerprint, None
+
+        for item in cached_results:
+            if not item.get('code'):
+                continue
+            try:
+                self.keyword_cache.set(item['code'], keyword)
+                if manual: self.keyword_cache.set(f"BYPASS_{item['code']}", "1")
+            except AttributeError:
+                self.keyword_cache[item['code']] = keyword
+                if manual: self.keyword_cache[f"BYPASS_{item['code']}"] = "1"
+        logger.info(f"[{self.name}] Search Cache Hit: '{keyword}' -> {len(cached_results)}건{' (결과 없음 캐시)' if not cached_results else ''}")
+        return cache_key, fingerprint, cached_results
+
+
+    def _store_search_cache(self, cache_key, fingerprint, manual, results, partial=False):
+        """partial: 일부 사이트가 응답하지 못한 검색. 결과 없음은 저장하지 않고, 결과는 짧은(결과 없음) TTL 로 저장"""
+        try:
+            from .model_metadata_db import ModelAvSearchCache
+            snapshot = self._get_setting_snapshot()
+            if not results:
+                if partial:
+                    return
+                ttl_seconds = snapshot['search_cache_negative_ttl']
+            elif partial:
+                ttl_seconds = min(snapshot['search_cache_ttl'], snapshot['search_cache_negative_ttl'])
+            else:
+                ttl_seconds = snapshot['search_cache_ttl']
+            ModelAvSearchCache.put(self.name, cache_key, manual, fingerprint, results, ttl_seconds)
+        except Exception as e:
+            logger.error(f"[{self.name}] Search Cache Store Error: {e}")
+
+
+    def _record_label_route(self, label, searched_sites, site_timings, results_sorted, failed_sites=None):
+        """
+        조회한 사이트별 100점 여부/채택(최종 1순위 100점) 여부/소요 시간을 레이블 경로 통계에 누적.
+        failed_sites(예외/시간 초과/비정상 응답) 는 '100점 없음'으로 셀 수 없으므로 기록하지 않음 (장애 중 제외 방지)
+        """
+        try:
+            from .model_metadata_db import ModelAvLabelRoute
+            hit_sites = {item.get('site_key') for item in results_sorted if item.get('original_score', 0) >= 100}
+            accepted_site = results_sorted[0].get('site_key') if results_sorted and results_sorted[0].get('original_score', 0) >= 100 else None
+            ModelAvLabelRoute.record(self.name, label, [
+                (site_key, site_key in hit_sites, site_key == accepted_site, site_timings.get(site_key, 0))
+                for site_key in searched_sites if not failed_sites or site_key not in failed_sites
+            ])
+        except Exception as e:
+            logger.error(f"[{self.name}] Label Route Record Error: {e}")
+
+
     def search(self, keyword, manual=False):
         logger.info(f"======= jav censored search START - keyword:[{keyword}] manual:[{manual}] =======")
         
@@ -1100,25 +1420,29 @@ class ModuleJavCensored(PluginModuleBase):
                 return []
 
         all_results = []
+        settings = self._get_setting_snapshot()
         
         # --- DB 사용 옵션 켜져있을 시 DB 선행 검색 로직 ---
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
+        use_db = settings['db_use']
         if use_db and not manual:
             try:
                 from .model_metadata_db import ModelAvMetadata, av_db_session
                 
-                kw_ui_code, kw_label, kw_num = SiteAvBase._parse_ui_code(keyword)
-                search_query_num = f"%{kw_num}%" if kw_num else f"%{keyword}%"
-
+                # 정규화 품번 일치 또는 (레이블, 넘버) 일치 후보만 인덱스로 조회
+                kw_norm = ModelAvMetadata.normalize_code(SiteAvBase._parse_ui_code(keyword)[0] or keyword)
+                kw_label, kw_number = ModelAvMetadata.parse_code_parts('CEN', keyword)
+                code_filters = [ModelAvMetadata.code_norm == kw_norm]
+                if kw_number:
+                    code_filters.append(and_(ModelAvMetadata.code_label == kw_label, ModelAvMetadata.code_number == kw_number))
                 db_records = av_db_session.query(ModelAvMetadata).filter(
                     ModelAvMetadata.category == 'CEN',
-                    ModelAvMetadata.originaltitle.ilike(search_query_num)
+                    or_(*code_filters)
                 ).all()
 
+                # 정규화 품번이 다른 후보(접두사 차이 등)만 점수 검증
                 valid_db_records = []
                 for record in db_records:
-                    match_score = SiteAvBase._calculate_score(keyword, record.originaltitle)
-                    if match_score >= 99:
+                    if record.code_norm == kw_norm or SiteAvBase._calculate_score(keyword, record.originaltitle) >= 99:
                         valid_db_records.append(record)
 
                 for record in valid_db_records:
@@ -1163,7 +1487,18 @@ class ModuleJavCensored(PluginModuleBase):
             except Exception as e_db:
                 logger.error(f"[{self.name}] DB Search Error: {e_db}")
 
-        original_site_order_list = P.ModelSetting.get_list(f"{self.name}_order", ",")
+        # --- 검색 결과 캐시 조회 (정규화 품번 + 수동 여부, 결과 없음도 캐시) ---
+        search_cache_key = None
+        if settings['search_cache_use']:
+            try:
+                search_cache_key, search_cache_fp, cached_results = self._load_search_cache(keyword, manual)
+                if cached_results is not None:
+                    return cached_results
+            except Exception as e_cache:
+                logger.error(f"[{self.name}] Search Cache Error: {e_cache}")
+                search_cache_key = None
+
+        original_site_order_list = settings['order']
 
         # --- 1. 현재 검색어의 대표 레이블 추출 및 특수 품번 처리 ---
         current_keyword_label = ""
@@ -1187,13 +1522,8 @@ class ModuleJavCensored(PluginModuleBase):
 
         # MGS 레이블 강제 우선 처리 체크
         is_mgs_forced_priority = False
-        if current_keyword_label and P.ModelSetting.get_bool(f"{self.name}_mgs_label_priority"):
-            exclude_raw_str = P.ModelSetting.get(f"{self.name}_mgs_label_priority_exclude")
-            exclude_labels_set = set()
-            if exclude_raw_str:
-                exclude_labels_set = {x.strip().upper() for x in re.split(r'[\s,\n]', exclude_raw_str) if x.strip()}
-            
-            if current_keyword_label.upper() not in exclude_labels_set:
+        if current_keyword_label and settings['mgs_label_priority']:
+            if current_keyword_label.upper() not in settings['mgs_label_priority_exclude']:
                 try:
                     from support_site.constants import MGS_LABEL_MAP
                     if current_keyword_label.upper() in MGS_LABEL_MAP:
@@ -1208,15 +1538,11 @@ class ModuleJavCensored(PluginModuleBase):
         is_keyword_potentially_priority_for_any_site = False
         if current_keyword_label:
             # 사용자가 직접 지정한 '지정 레이블 최우선' 조건이 하나라도 있는지 먼저 확인
-            for site_key_for_potential_check in self.site_map.keys():
-                db_prefix_potential = f"{self.name}_{site_key_for_potential_check}"
-                priority_labels_str_potential = P.ModelSetting.get(f"{db_prefix_potential}_priority_search_labels")
-                if priority_labels_str_potential:
-                    site_priority_labels_set_potential = {lbl.strip().upper() for lbl in priority_labels_str_potential.split(',') if lbl.strip()}
-                    if current_keyword_label in site_priority_labels_set_potential:
-                        is_keyword_potentially_priority_for_any_site = True
-                        logger.debug(f"  Potential Priority: Keyword label '{current_keyword_label}' is a user-specified priority for site '{site_key_for_potential_check}'.")
-                        break
+            for site_key_for_potential_check, site_priority_labels_set_potential in settings['site_priority_labels'].items():
+                if current_keyword_label in site_priority_labels_set_potential:
+                    is_keyword_potentially_priority_for_any_site = True
+                    logger.debug(f"  Potential Priority: Keyword label '{current_keyword_label}' is a user-specified priority for site '{site_key_for_potential_check}'.")
+                    break
                         
         # 사용자의 직접 지정이 없고, MGS 자동 최우선 조건에 매칭되는 경우
         if not is_keyword_potentially_priority_for_any_site and is_mgs_forced_priority:
@@ -1230,17 +1556,9 @@ class ModuleJavCensored(PluginModuleBase):
         
         # [1순위] 사용자가 각 사이트 설정창에 직접 명시해 둔 '지정 레이블 최우선 검색' 대조
         if current_keyword_label:
-            for site_key_check_priority in original_site_order_list:
-                if site_key_check_priority not in self.site_map: continue
-                
-                db_prefix_check = f"{self.name}_{site_key_check_priority}"
-                priority_labels_str = P.ModelSetting.get(f"{db_prefix_check}_priority_search_labels")
-                if priority_labels_str:
-                    site_priority_labels_set = {lbl.strip().upper() for lbl in priority_labels_str.split(',') if lbl.strip()}
-                    if current_keyword_label in site_priority_labels_set:
-                        special_priority_site = site_key_check_priority
-                        logger.debug(f"User Specified Priority: Label '{current_keyword_label}' is assigned to '{special_priority_site}' by user.")
-                        break
+            special_priority_site = settings['priority_label_site'].get(current_keyword_label)
+            if special_priority_site:
+                logger.debug(f"User Specified Priority: Label '{current_keyword_label}' is assigned to '{special_priority_site}' by user.")
 
         # [2순위] 사용자가 명시한 우선권이 없고, MGS 자동 맵핑 최우선 조건에 매칭되는 경우
         if not special_priority_site and is_mgs_forced_priority:
@@ -1257,14 +1575,20 @@ class ModuleJavCensored(PluginModuleBase):
         else:
             logger.debug(f"Using default site search order: {site_list_for_current_search}")
 
-        # [헬퍼] 단일 사이트 검색 및 결과 처리 함수
-        def process_site_search(site_key):
+        # 학습된 레이블 경로로 순서 재조정 / 가망 없는 사이트 제외 (자동 검색만, 우선 사이트는 맨 앞 유지)
+        use_label_route = not manual and bool(current_keyword_label) and settings['label_route_use']
+        if use_label_route:
+            from .model_metadata_db import ModelAvLabelRoute
+            site_list_for_current_search, pruned_sites = ModelAvLabelRoute.plan(
+                self.name, current_keyword_label, site_list_for_current_search,
+                min_attempts=settings['label_route_prune_attempts'],
+                pinned=special_priority_site,
+            )
+            logger.debug(f"Label route order for '{current_keyword_label}': {site_list_for_current_search}{f' (제외: {pruned_sites})' if pruned_sites else ''}")
+
+        # [헬퍼] 단일 사이트 검색 결과 처리 함수
+        def process_site_results(site_key, data_from_search2):
             results = []
-            if site_key not in self.site_map: return results
-            
-            logger.debug(f"--- Searching on site: {site_key} ---")
-            data_from_search2 = self.search2(keyword, site_key, manual=manual)
-            
             if data_from_search2:
                 logger.debug(f"  Got {len(data_from_search2)} result(s) from {site_key}")
                 for item in data_from_search2:
@@ -1282,35 +1606,43 @@ class ModuleJavCensored(PluginModuleBase):
             return results
 
         # --- 3. 각 사이트 검색 실행 (100점 매칭 시 즉시 조기 종료) ---
-        early_exit_triggered = False
-
-        for site_key in site_list_for_current_search:
-            if early_exit_triggered: break
-            
-            site_results = process_site_search(site_key)
-            if site_results:
+        # 동시 검색 모드에서도 결과는 사이트 순서대로 소비하므로 순차 검색과 같은 결과 집합/순서를 유지
+        site_timings = {}
+        searched_sites = []
+        failed_sites = set()
+        site_search_iter = self._iter_site_search(keyword, site_list_for_current_search, manual=manual, timings=site_timings, failed_sites=failed_sites)
+        try:
+            for site_key, data_from_search2 in site_search_iter:
+                searched_sites.append(site_key)
+                site_results = process_site_results(site_key, data_from_search2)
+                if not site_results:
+                    continue
                 all_results.extend(site_results)
-                
-                if not manual:
-                    for item in site_results:
-                        if site_key in ['dmm', 'mgstage'] and item.get('original_score', 0) >= 100:
-                            logger.debug(f"[{self.name}] Early Exit: 공식 사이트 '{site_key}'에서 100점 매칭 확정. 검색 중단: {keyword}")
-                            early_exit_triggered = True
-                            break
+
+                if not manual and site_key in ['dmm', 'mgstage'] and any(item.get('original_score', 0) >= 100 for item in site_results):
+                    logger.debug(f"[{self.name}] Early Exit: 공식 사이트 '{site_key}'에서 100점 매칭 확정. 검색 중단: {keyword}")
+                    break
+        finally:
+            site_search_iter.close()
 
         # --- 4. 1차 정렬 (점수 및 사이트 우선순위 기반) ---
         logger.info(f"--- 검색 완료. 결과: {len(all_results)} ---")
         if not all_results:
+            if use_label_route:
+                self._record_label_route(current_keyword_label, searched_sites, site_timings, [], failed_sites)
+            if search_cache_key:
+                # 오류/시간 초과로 응답하지 못한 사이트가 있으면 '결과 없음'으로 확정할 수 없으므로 저장하지 않음
+                if failed_sites:
+                    logger.debug(f"[{self.name}] Search Cache: 응답 실패 사이트 {sorted(failed_sites)} -> 결과 없음 캐시 생략")
+                self._store_search_cache(search_cache_key, search_cache_fp, manual, [], partial=bool(failed_sites))
             logger.debug("======= jav censored search END - No results found. =======")
             return []
 
         # 공식 사이트(DMM/MGS)와 타 사이트 간의 품번 접두사 차이 검증 및 100점 승격 처리
         all_results = self._reconcile_official_results(all_results)
 
-        priority_string = P.ModelSetting.get('jav_censored_result_priority_order')
-        priority_list = [x.strip() for x in priority_string.split(',') if x.strip()]
-        dynamic_priority_map = {key: index for index, key in enumerate(priority_list)}
-        lowest_priority = len(priority_list)
+        dynamic_priority_map = settings['result_priority_map']
+        lowest_priority = len(dynamic_priority_map)
 
         def get_priority_value_for_sort(item_to_sort):
             site_key_prio = item_to_sort.get('site_key')
@@ -1372,11 +1704,17 @@ class ModuleJavCensored(PluginModuleBase):
                 
                 logger.info(f"  {i+1}. [{site_key}] 점수={score}(원점수={orig_score}) | 품번={ui_code} | Code={code} | {type_str}{prio_str}DB_Cache={db_cache} | Title='{title_preview}'")
 
+        if use_label_route:
+            self._record_label_route(current_keyword_label, searched_sites, site_timings, all_results_sorted, failed_sites)
+        if search_cache_key:
+            self._store_search_cache(search_cache_key, search_cache_fp, manual, all_results_sorted, partial=bool(failed_sites))
+
         logger.info(f"======= jav censored search END - Returning {len(all_results_sorted)} results. =======")
         return all_results_sorted
 
 
-    def search2(self, keyword, site, manual=False, site_settings_override=None):
+    def search2(self, keyword, site, manual=False, site_settings_override=None, failed_sites=None):
+        """failed_sites 가 주어지면 응답하지 못한 사이트(예외 또는 success/no_match 가 아닌 응답)를 추가"""
         SiteClass = self.site_map.get(site, None)
         if SiteClass is None:
             return None
@@ -1384,6 +1722,10 @@ class ModuleJavCensored(PluginModuleBase):
         try:
             data = SiteClass.search(keyword, do_trans=manual, manual=manual) 
 
+            if failed_sites is not None and not (isinstance(data, dict) and data.get("ret") in ("success", "no_match")):
+                logger.debug(f"search2: Site '{site}' did not answer normally: {data.get('ret') if isinstance(data, dict) else type(data)}")
+                failed_sites.add(site)
+
             if data and data.get("ret") == "success" and data.get("data"):
                 if isinstance(data["data"], list) and data["data"]:
                     return data["data"]
@@ -1393,6 +1735,8 @@ class ModuleJavCensored(PluginModuleBase):
             #    logger.debug(f"No valid results from {site} for '{keyword}'. Response: {data.get('ret') if data else 'None'}")
         except Exception as e_site_search:
             logger.error(f"Error during search on site '{site}' for keyword '{keyword}': {e_site_search}")
+            if failed_sites is not None:
+                failed_sites.add(site)
         return None
 
 
@@ -1523,8 +1867,8 @@ class ModuleJavCensored(PluginModuleBase):
                 self.enrich_status['status'] = '완료'
                 logger.info(f"[{self.name}] 일괄 작업 완료 (성공: {self.enrich_status['success']}, 실패: {self.enrich_status['fail']})")
 
-            # 작업 완료 후 부풀어 오른 WAL 파일 즉시 청소
-            ModelAvMetadata.checkpoint_wal()
+            # 작업 완료 후 부풀어 오른 WAL 파일 청소 예약 (스케줄러가 유휴 시 TRUNCATE)
+            ModelAvMetadata.request_checkpoint()
 
         except Exception as e_main:
             logger.error(f"[{self.name}] 일괄 작업 치명적 오류: {e_main}")
@@ -1541,6 +1885,12 @@ class ModuleJavCensored(PluginModuleBase):
     # region INFO
 
     def info(self, code, keyword=None, fp_meta_mode=False, skip_trans=False):
+        # 같은 품번(및 skip_trans 등 인자)의 동시 요청은 첫 요청 결과를 공유 (중복 스크래핑/번역/배우 처리/DB 저장 방지)
+        from .model_metadata_db import ModelAvMetadata
+        return ModelAvMetadata.run_info_single_flight(self.name, (code, bool(skip_trans), keyword, bool(fp_meta_mode)), lambda: self._info(code, keyword=keyword, fp_meta_mode=fp_meta_mode, skip_trans=skip_trans))
+
+
+    def _info(self, code, keyword=None, fp_meta_mode=False, skip_trans=False):
         bypass_cache = False
         try:
             if self.keyword_cache.get(f"BYPASS_{code}") == "1":
@@ -1574,8 +1924,9 @@ class ModuleJavCensored(PluginModuleBase):
                 logger.debug(f"info: Found keyword '{keyword}' in cache for code '{code}'.")
 
         # --- DB에서 데이터 가져오기 & 빈 데이터 보완(Enrichment) ---
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
-        save_db = P.ModelSetting.get_bool(f"{self.name}_db_save")
+        settings = self._get_setting_snapshot()
+        use_db = settings['db_use']
+        save_db = settings['db_save']
         
         if use_db and not bypass_cache:
             from .model_metadata_db import ModelAvMetadata
@@ -1626,7 +1977,7 @@ class ModuleJavCensored(PluginModuleBase):
             return ret
 
         # 가짜/플레이스홀더 이미지 감지 시 사용자 우선순위 순서대로 즉시 구출
-        use_hq_poster_check = P.ModelSetting.get_bool(f"{self.name}_use_hq_poster_check")
+        use_hq_poster_check = settings['use_hq_poster_check']
         if use_hq_poster_check and ret and site in ['jav321', 'javbus']:
             target_poster_url = None
             for thumb in ret.get('thumb', []):
@@ -1651,7 +2002,7 @@ class ModuleJavCensored(PluginModuleBase):
                 logger.info(f"[{self.name}] 가짜/플레이스홀더 이미지 감지 ({site}). 후순위 사이트 검색 시작: {ui_code}")
                 
                 # 1. 사용자가 설정한 사이트 순서(jav_censored_order) 가져오기
-                user_order_list = [s.strip() for s in P.ModelSetting.get_list(f"{self.name}_order", ",") if s.strip()]
+                user_order_list = list(settings['order'])
                 for s_key in self.site_map.keys():
                     if s_key not in user_order_list:
                         user_order_list.append(s_key)
@@ -1701,18 +2052,19 @@ class ModuleJavCensored(PluginModuleBase):
         actor_names_for_log = []
 
         if actors:
-            for item in actors:
-                self.process_actor(item)
-                actor_names_for_log.append(item.get("name", item.get("originalname", "?")))
+            self.process_actors(actors)
+            actor_names_for_log = [item.get("name", item.get("originalname", "?")) for item in actors]
 
         if not fp_meta_mode:
             instance = self.site_map.get(site, None)
             if instance:
+                # 서로 다른 일본어 이름만 한 번씩 번역한 뒤, 치환은 기존처럼 배우 순서대로 적용
+                trans_map = self._translate_actor_names(instance, [item.get("originalname") for item in actors if item.get("originalname") and item.get("name")])
                 for item in actors:
                     try:
                         name_ja, name_ko = item.get("originalname"), item.get("name")
-                        if name_ja and name_ko:
-                            name_trans = instance.trans(name_ja)
+                        if name_ja and name_ko and name_ja in trans_map:
+                            name_trans = trans_map[name_ja]
                             if name_trans != name_ko:
                                 if ret.get("plot"): 
                                     ret["plot"] = ret["plot"].replace(name_trans, name_ko)
@@ -1731,7 +2083,7 @@ class ModuleJavCensored(PluginModuleBase):
         original_calculated_title = ret.get("title", "")
 
         try: # 타이틀 포맷팅
-            title_format = P.ModelSetting.get(f"{self.name}_title_format") if hasattr(self, 'name') and 'western' not in self.name else P.ModelSetting.get('jav_censored_title_format')
+            title_format = settings['title_format']
 
             format_dict = {
                 'originaltitle': ret.get("originaltitle", ""),
@@ -1764,7 +2116,7 @@ class ModuleJavCensored(PluginModuleBase):
             ret["title"] = original_calculated_title
 
         if "tag" in ret:
-            tag_option = P.ModelSetting.get(f"{self.name}_tag_option")
+            tag_option = settings['tag_option']
             if tag_option == "not_using":
                 ret["tag"] = []
             elif tag_option == "label":
@@ -1793,7 +2145,7 @@ class ModuleJavCensored(PluginModuleBase):
             logger.info(f"[{site.upper()} Success] Code: {code}, Title: {title_log} ({year_log})")
 
         # DB 자동 저장
-        save_only_trans = P.ModelSetting.get_bool(f"{self.name}_db_save_only_translated")
+        save_only_trans = settings['db_save_only_translated']
         should_save = save_db and ret
         
         if should_save and save_only_trans:
@@ -1803,7 +2155,7 @@ class ModuleJavCensored(PluginModuleBase):
 
         if should_save:
             from .model_metadata_db import ModelAvMetadata
-            ModelAvMetadata.save_metadata(self.category, ret)
+            ModelAvMetadata.save_metadata(self.category, ret, defer=settings['db_save_write_behind'])
 
         return ret
 
@@ -1937,8 +2289,59 @@ class ModuleJavCensored(PluginModuleBase):
     ################################################
     # region ACTOR
 
+    def _get_actor_executor(self, workers):
+        """배우 정보 조회용 스레드 풀 (모든 info 요청이 공유, 설정된 스레드 수가 바뀌면 새로 생성)"""
+        from concurrent.futures import ThreadPoolExecutor
+        with self._actor_executor_lock:
+            if self._actor_executor is None or self._actor_executor_workers != workers:
+                if self._actor_executor is not None:
+                    self._actor_executor.shutdown(wait=False)
+                self._actor_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}_actor")
+                self._actor_executor_workers = workers
+            return self._actor_executor
+
+
+    def process_actors(self, actors):
+        """
+        배우 목록을 process_actor 로 제자리 처리 (순서 유지). 내용이 같은 항목은 한 번만 조회하고 결과를 복사하며,
+        서로 다른 배우는 공유 스레드 풀에서 동시에 조회
+        """
+        groups = {}
+        for item in actors:
+            try: key = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+            except Exception: key = id(item)
+            groups.setdefault(key, []).append(item)
+        leaders = [items[0] for items in groups.values()]
+
+        workers = self._get_setting_snapshot()['actor_resolve_workers']
+        if workers <= 1 or len(leaders) <= 1:
+            for item in leaders:
+                self.process_actor(item)
+        else:
+            executor = self._get_actor_executor(workers)
+            for future in [executor.submit(self.process_actor, item) for item in leaders]:
+                future.result()
+
+        for items in groups.values():
+            for item in items[1:]:
+                item.clear()
+                item.update(copy.deepcopy(items[0]))
+        if len(leaders) < len(actors):
+            logger.debug(f"[{self.name}] 배우 {len(actors)}명 중 중복 {len(actors) - len(leaders)}명은 조회 생략")
+
+
+    def _translate_actor_names(self, instance, names):
+        """서로 다른 이름만 instance.trans 로 번역 -> {원문: 번역}. 번역 실패한 이름은 제외. 번역 메모리 사용"""
+        from .trans_batch import trans_batch
+        names = list(dict.fromkeys(names))
+        # JAV 번역 엔진(LLM 등)은 줄 단위 묶음 응답을 보장하지 않으므로 개별 요청만 동시 처리
+        translated = trans_batch(names, source='ja', trans_func=instance.trans, pack=False, keep_failed=False,
+                                 engine=self._get_setting_snapshot()['trans_engine'], module=self.name)
+        return {name: name_trans or name for name, name_trans in zip(names, translated) if name_trans is not None}
+
+
     def process_actor(self, entity_actor):
-        actor_site_list = P.ModelSetting.get_list(f"{self.name}_actor_order", ",")
+        actor_site_list = self._get_setting_snapshot()['actor_order']
         for site in actor_site_list:
             is_avdbs = site == 'avdbs'
             if self.process_actor2(entity_actor, site, is_avdbs=is_avdbs):
@@ -1965,7 +2368,7 @@ class ModuleJavCensored(PluginModuleBase):
                 get_info_success = SiteClass.get_actor_info(entity_actor)
                 
                 if get_info_success and entity_actor.get('site') == 'avdbs_web':
-                    image_mode = P.ModelSetting.get('jav_censored_image_mode')
+                    image_mode = self._get_setting_snapshot()['image_mode']
                     if image_mode == 'image_server':
                         try:
                             SiteClass.save_actor_image(entity_actor)
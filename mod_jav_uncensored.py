@@ -2,6 +2,7 @@ import os
 import re
 import shutil
 import traceback
+from types import MappingProxyType
 
 from urllib.parse import urlparse
 from flask import send_from_directory, send_file, jsonify
@@ -20,6 +21,7 @@ from support_site import (
     UtilNfo,
 )
 from support_site.entity_av import EntityAVSearch
+from sqlalchemy import or_
 from .setup import *
 
 class ModuleJavUncensored(PluginModuleBase):
@@ -70,11 +72,14 @@ class ModuleJavUncensored(PluginModuleBase):
             f"{self.name}_db_use": "False",
             f"{self.name}_db_save": "False",
             f"{self.name}_db_save_only_translated": "True",
+            f"{self.name}_db_save_write_behind": "False",
             f"{self.name}_db_auto_enrich": "True",
             f"{self.name}_db_delete_user_images": "False",
             f"{self.name}_enrich_delay": "2.0",
             f"{self.name}_db_import_path": "",
+            f"{self.name}_db_export_format": "db",
             f"{self.name}_db_image_url_mapping": "",
+            f"{self.name}_image_manifest_time": "",
 
             f'{self.name}_1pondo_use_proxy' : 'False',
             f'{self.name}_1pondo_proxy_url' : '',
@@ -110,6 +115,18 @@ class ModuleJavUncensored(PluginModuleBase):
             'is_running': False, 'status': '대기 중', 'total': 0,
             'current': 0, 'success': 0, 'fail': 0, 'current_code': '', 'stop_flag': False
         }
+        self.export_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0,
+            'current': 0, 'filename': '', 'msg': ''
+        }
+        self.clear_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0, 'current': 0,
+            'count': 0, 'deleted': 0, 'skipped_user': 0, 'msg': ''
+        }
+        self.manifest_status = {
+            'is_running': False, 'status': '대기 중', 'current': 0, 'indexed': 0, 'msg': ''
+        }
+        self.setting_snapshot = None
 
         try:
             self.keyword_cache = F.get_cache(f"{P.package_name}_{self.name}_keyword_cache")
@@ -122,18 +139,31 @@ class ModuleJavUncensored(PluginModuleBase):
 
     def plugin_load(self):
         try:
-            from .model_metadata_db import engine, Base, ModelAvMetadata
+            from .model_metadata_db import engine, Base, ModelAvMetadata, migrate_db
             Base.metadata.create_all(bind=engine)
+            migrate_db()
             self.web_list_model = ModelAvMetadata
         except Exception as e:
             logger.error(f"[{self.name}] DB Init Error: {e}")
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
+
+    def plugin_unload(self):
+        # write-behind 큐에 남은 메타데이터 저장
+        try:
+            from .model_metadata_db import ModelAvMetadata
+            ModelAvMetadata.flush_write_behind()
+        except Exception as e:
+            logger.error(f"[{self.name}] write-behind flush error: {e}")
+
 
     def plugin_load_celery(self):
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
 
     def setting_save_after(self, change_list):
         ins_list = []
+        self._rebuild_setting_snapshot()
 
         # 공통 설정(jav_censored_)이 변경된 경우, 모든 Uncensored 사이트도 다시 로드
         if any(key.startswith('jav_censored_') for key in change_list):
@@ -177,6 +207,42 @@ class ModuleJavUncensored(PluginModuleBase):
                 P.logger.error(traceback.format_exc())
 
 
+    def _build_setting_snapshot(self):
+        """
+        search/info/web_list 요청 경로에서 쓰는 설정의 읽기 전용 스냅샷 (타이틀 포맷/태그/부가영상은 jav_censored 공통 설정).
+        설정 저장/플러그인 로드 시 새로 만들어 교체
+        """
+        from .model_metadata_db import ModelAvMetadata
+        MS = P.ModelSetting
+        return MappingProxyType({
+            # 직결 라우팅용 (사이트, 키워드, 컴파일된 정규식)
+            'site_patterns': tuple((site_name, tuple(site_info['keyword']), re.compile(site_info['regex'])) for site_name, site_info in self.site_map.items()),
+            'db_use': MS.get_bool(f"{self.name}_db_use"),
+            'db_save': MS.get_bool(f"{self.name}_db_save"),
+            'db_save_only_translated': MS.get_bool(f"{self.name}_db_save_only_translated"),
+            'db_save_write_behind': MS.get_bool(f"{self.name}_db_save_write_behind"),
+            'db_image_url_mappings': ModelAvMetadata.parse_url_mappings(MS.get(f"{self.name}_db_image_url_mapping")),
+            'title_format': MS.get('jav_censored_title_format'),
+            'tag_option': MS.get('jav_censored_tag_option'),
+            'use_extras': MS.get_bool('jav_censored_use_extras'),
+        })
+
+
+    def _rebuild_setting_snapshot(self):
+        try:
+            self.setting_snapshot = self._build_setting_snapshot()
+        except Exception as e:
+            logger.error(f"[{self.name}] setting snapshot build error: {e}")
+            logger.error(traceback.format_exc())
+
+
+    def _get_setting_snapshot(self):
+        snapshot = self.setting_snapshot
+        if snapshot is None:
+            snapshot = self.setting_snapshot = self._build_setting_snapshot()
+        return snapshot
+
+
     def process_ajax(self, sub, req):
         try:
             command = req.form.get('command')
@@ -185,17 +251,41 @@ class ModuleJavUncensored(PluginModuleBase):
             # 1. 폼 검색 목록 요청(command가 없거나 db_list인 경우)
             if not command or command == 'db_list' or req.form.get('page_size') is not None:
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             # 2. 백그라운드 미디어 채우기 상태 조회 (최우선 즉시 반환)
             if command == 'db_enrich_status':
                 return jsonify({'ret': 'success', 'data': self.enrich_status})
+            if command == 'db_export_status':
+                return jsonify({'ret': 'success', 'data': self.export_status})
+            if command == 'db_clear_status':
+                return jsonify({'ret': 'success', 'data': self.clear_status})
+            if command == 'db_image_reconcile_status':
+                return jsonify({'ret': 'success', 'data': self.manifest_status})
+            if command == 'db_write_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_write_behind_status()})
+            if command == 'db_cache_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_metadata_cache_status()})
+            if command == 'db_info_flight_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_info_flight_status(self.name)})
+            if command == 'db_wal_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_wal_status()})
+            if command == 'db_trans_memory_status':
+                from .model_metadata_db import ModelAvTransMemory
+                return jsonify({'ret': 'success', 'data': ModelAvTransMemory.get_status()})
+            if command == 'db_crop_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_crop_job(req.form.get('arg1'))})
 
             logger.debug(f"[{self.name}] process_ajax 요청됨 - command: {command}")
             
             # 3. 기타 커스텀 명령 처리
             custom_commands = [
-                'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum', 'db_import', 'db_export',
+                'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum', 'db_compress', 'db_detail', 'db_image_reconcile', 'db_import', 'db_export',
                 'db_enrich_start', 'db_enrich_stop', 'db_enrich_status', 'db_refresh_image', 'db_crop_save'
             ]
             if command in custom_commands:
@@ -217,11 +307,11 @@ class ModuleJavUncensored(PluginModuleBase):
                 code = arg1
                 crop_data = arg2
                 pl_base64 = arg3
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(code, crop_data, pl_image_base64_data=pl_base64)
+                success, result = ModelAvMetadata.start_user_crop(code, crop_data, pl_image_base64_data=pl_base64)
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터(_p_user)가 성공적으로 저장되었습니다.', 'new_url': result_msg})
+                    return jsonify(dict(result, ret='success', msg='포스터(_p_user) 처리를 시작했습니다.'))
                 else:
-                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result_msg}'})
+                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result}'})
 
             elif command == "test":
                 code = arg2
@@ -266,7 +356,7 @@ class ModuleJavUncensored(PluginModuleBase):
 
             elif command == 'db_list':
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             elif command == 'db_edit_save':
                 from .model_metadata_db import ModelAvMetadata
@@ -297,17 +387,39 @@ class ModuleJavUncensored(PluginModuleBase):
 
             elif command == 'db_clear':
                 from .model_metadata_db import ModelAvMetadata
-                success, count = ModelAvMetadata.clear_db(self.category)
-                return jsonify({'ret': 'success', 'msg': f'{count}건의 메타데이터가 삭제되었습니다.'} if success else {'ret': 'error', 'msg': '초기화 실패'})
+                if self.clear_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 DB 초기화 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_clear(self.category, status=self.clear_status)
+                return jsonify({'ret': 'success', 'msg': 'DB 초기화 작업을 백그라운드에서 시작했습니다.'})
+
+            elif command == 'db_image_reconcile':
+                from .model_metadata_db import ModelAvMetadata
+                if self.manifest_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 이미지 인덱스 재구성 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_image_reconcile(self.category, status=self.manifest_status)
+                return jsonify({'ret': 'success', 'msg': '이미지 인덱스 재구성을 백그라운드에서 시작했습니다.'})
 
             elif command == 'db_vacuum':
                 from .model_metadata_db import ModelAvMetadata
                 success = ModelAvMetadata.vacuum_db()
                 return jsonify({'ret': 'success', 'msg': 'DB 최적화(VACUUM) 완료'} if success else {'ret': 'error', 'msg': '최적화 실패'})
 
+            elif command == 'db_detail':
+                from .model_metadata_db import ModelAvMetadata
+                data = ModelAvMetadata.get_detail(arg1)
+                if data is None:
+                    return jsonify({'ret': 'warning', 'msg': f'DB 레코드 없음: {arg1}'})
+                return jsonify({'ret': 'success', 'data': data})
+
+            elif command == 'db_compress':
+                from .model_metadata_db import ModelAvMetadata
+                codec = arg1 if arg1 in ('zstd', 'zlib', 'none') else 'zstd'
+                ModelAvMetadata.start_compress(codec)
+                msg = 'json 압축 해제' if codec == 'none' else f'json 압축 저장({codec}) 변환'
+                return jsonify({'ret': 'success', 'msg': f'{msg} 작업을 백그라운드에서 시작했습니다. 완료 후 VACUUM 까지 자동 진행되며 진행 상황은 로그에서 확인하세요.'})
+
             elif command == 'db_import':
-                from .model_metadata_db import ModelAvMetadata, av_db_session
-                import json, sqlite3
+                from .model_metadata_db import ModelAvMetadata
                 
                 raw_paths = arg1
                 mode = arg2 # 'update' or 'missing'
@@ -317,93 +429,13 @@ class ModuleJavUncensored(PluginModuleBase):
                 import_paths = [p.strip() for p in raw_paths.split('\n') if p.strip()]
                 
                 try:
-                    insert_count, update_count, skip_count = 0, 0, 0
-                    batch_size = 500  # 500건 단위 커밋 & 로그 출력 주기
-                    processed_in_batch = 0
-                    
-                    for import_path in import_paths:
-                        if not os.path.exists(import_path):
-                            logger.warning(f"[{self.name}] Import 경로 없음: {import_path}")
-                            continue
-
-                        # Case A: .db 파일 병합
-                        if os.path.isfile(import_path) and import_path.lower().endswith(('.db', '.sqlite')):
-                            try:
-                                conn = sqlite3.connect(import_path)
-                                c = conn.cursor()
-                                c.execute("SELECT category, code, json_data FROM av_metadata_cache WHERE category = ?", (self.category,))
-                                rows = c.fetchall()
-                                total_rows = len(rows)
-                                conn.close()
-
-                                logger.info(f"[{self.name}] DB 파일 내 {total_rows}개 레코드 병합 시작 -> {import_path}")
-
-                                for idx, (r_cat, r_code, r_json) in enumerate(rows, 1):
-                                    try:
-                                        jd = json.loads(r_json) if isinstance(r_json, str) else r_json
-                                        res = ModelAvMetadata.merge_record(self.category, jd, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_rows) * 100 if total_rows > 0 else 100
-                                            logger.info(f"[{self.name}] DB Import 진행 중: {idx}/{total_rows} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                    except Exception as e_row:
-                                        logger.error(f"Row 파싱 에러 ({r_code}): {e_row}")
-
-                                if processed_in_batch > 0:
-                                    av_db_session.commit()
-                                    processed_in_batch = 0
-                                    logger.info(f"[{self.name}] DB Import 진행 중: {total_rows}/{total_rows} (100.0%) | 최종 커밋 완료")
-
-                            except Exception as e_db_file:
-                                logger.error(f"[{self.name}] DB 파일 읽기 실패: {e_db_file}")
-
-                        # Case B: 폴더 내 .json 파일들 병합
-                        else:
-                            json_files = []
-                            if os.path.isfile(import_path) and import_path.lower().endswith('.json'):
-                                json_files.append(import_path)
-                            else:
-                                for root, _, files in os.walk(import_path):
-                                    for f in files:
-                                        if f.lower().endswith('.json'):
-                                            json_files.append(os.path.join(root, f))
-                            
-                            total_files = len(json_files)
-                            logger.info(f"[{self.name}] JSON 파일 {total_files}개 병합 시작 -> {import_path}")
-
-                            for idx, jf in enumerate(json_files, 1):
-                                try:
-                                    with open(jf, 'r', encoding='utf-8') as file:
-                                        data = json.load(file)
-                                        res = ModelAvMetadata.merge_record(self.category, data, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_files) * 100 if total_files > 0 else 100
-                                            logger.info(f"[{self.name}] JSON Import 진행 중: {idx}/{total_files} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                except Exception as e_jf:
-                                    logger.error(f"JSON 파일 파싱 에러 ({jf}): {e_jf}")
-
-                            if processed_in_batch > 0:
-                                av_db_session.commit()
-                                processed_in_batch = 0
-                                logger.info(f"[{self.name}] JSON Import 진행 중: {total_files}/{total_files} (100.0%) | 최종 커밋 완료")
-
-                    # 대용량 작업 완료 후 WAL 파일 청소
-                    ModelAvMetadata.checkpoint_wal()
-
-                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건)"
+                    stats = ModelAvMetadata.bulk_import(self.category, import_paths, mode=mode, log_name=self.name)
+                    insert_count, update_count, skip_count = stats['inserted'], stats['updated'], stats['skipped']
+
+                    # 대용량 작업 완료 후 WAL 파일 청소 (스케줄러가 유휴 시 TRUNCATE)
+                    ModelAvMetadata.request_checkpoint()
+
+                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건, {stats['rows_per_sec']:.0f}건/초)"
                     logger.info(f"[{self.name}] {final_msg}")
 
                     if auto_enrich:
@@ -418,53 +450,30 @@ class ModuleJavUncensored(PluginModuleBase):
 
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Import 치명적 오류: {e}")
-                    av_db_session.rollback()
                     return jsonify({'ret': 'error', 'msg': str(e)})
 
             elif command == 'db_export':
                 from .model_metadata_db import ModelAvMetadata
-                import json, sqlite3
                 from datetime import datetime
 
-                mode = arg1 # 'current' or 'all'
+                mode = arg1 # 'current' 또는 'all'
+                if self.export_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 Export 작업이 진행 중입니다.'})
                 try:
                     tmp_dir = os.path.join(path_data, 'tmp')
                     os.makedirs(tmp_dir, exist_ok=True)
+
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     category_suffix = "UNCEN" if mode == 'current' else "ALL"
-                    filename = f"metadata_av_{category_suffix}_{timestamp}.db"
-                    filepath = os.path.join(tmp_dir, filename)
-
-                    new_conn = sqlite3.connect(filepath)
-                    new_c = new_conn.cursor()
-                    new_c.execute('''CREATE TABLE av_metadata_cache (
-                        id INTEGER PRIMARY KEY,
-                        category VARCHAR(20) NOT NULL,
-                        code VARCHAR(100) NOT NULL,
-                        originaltitle VARCHAR(255) NOT NULL,
-                        site VARCHAR(50) NOT NULL,
-                        title VARCHAR(255) NOT NULL,
-                        poster_url VARCHAR(500),
-                        json_data JSON NOT NULL,
-                        created_time DATETIME,
-                        updated_time DATETIME
-                    )''')
-
-                    records = ModelAvMetadata.query.filter_by(category=self.category).all() if mode == 'current' else ModelAvMetadata.query.all()
-                    count = 0
-                    for r in records:
-                        clean_data = ModelAvMetadata.sanitize_for_export(r.json_data)
-                        c_time = r.created_time.strftime('%Y-%m-%d %H:%M:%S') if r.created_time else None
-                        u_time = r.updated_time.strftime('%Y-%m-%d %H:%M:%S') if r.updated_time else None
-                        new_c.execute('''INSERT INTO av_metadata_cache
-                        (category, code, originaltitle, site, title, poster_url, json_data, created_time, updated_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                        (r.category, r.code, r.originaltitle, r.site, r.title, '', json.dumps(clean_data, ensure_ascii=False), c_time, u_time))
-                        count += 1
-
-                    new_conn.commit()
-                    new_conn.close()
-                    return jsonify({'ret': 'success', 'msg': f'{count}개의 데이터가 포함된 DB 파일 준비 완료', 'filename': filename})
+                    extension = ModelAvMetadata.export_extension(arg2 or P.ModelSetting.get(f"{self.name}_db_export_format"))
+                    filename = f"metadata_av_{category_suffix}_{timestamp}{extension}"
+
+                    ModelAvMetadata.start_export(
+                        os.path.join(tmp_dir, filename),
+                        category=self.category if mode == 'current' else None,
+                        status=self.export_status
+                    )
+                    return jsonify({'ret': 'success', 'msg': 'Export 작업을 백그라운드에서 시작했습니다.', 'filename': filename})
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Export Error: {e}")
                     return jsonify({'ret': 'error', 'msg': str(e)})
@@ -566,13 +575,20 @@ class ModuleJavUncensored(PluginModuleBase):
                 if not code or (not crop_data and not p_base64):
                     return jsonify({'ret': 'error', 'msg': 'code 또는 크롭/업로드 데이터가 누락되었습니다.'}), 400
 
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(
+                success, result = ModelAvMetadata.start_user_crop(
                     code, crop_data or "{}", pl_image_base64_data=pl_base64, p_image_base64_data=p_base64
                 )
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터가 저장되었습니다.', 'new_url': result_msg}), 200
+                    return jsonify(dict(result, ret='success', msg='포스터 처리를 시작했습니다.')), 200
                 else:
-                    return jsonify({'ret': 'error', 'msg': result_msg}), 500
+                    return jsonify({'ret': 'error', 'msg': result}), 500
+
+            if sub == "crop_status":
+                from .model_metadata_db import ModelAvMetadata
+                job = ModelAvMetadata.get_crop_job(req.args.get("job_id") or req.form.get("job_id"))
+                if not job:
+                    return jsonify({'ret': 'error', 'msg': '작업을 찾을 수 없습니다.'}), 404
+                return jsonify({'ret': 'success', 'data': job}), 200
 
             if sub == "user_image_update":
                 return self._api_user_image_update(req)
@@ -701,7 +717,7 @@ class ModuleJavUncensored(PluginModuleBase):
             'not_found_files': [], 'errors': []
         }
         try:
-            from .model_metadata_db import ModelAvMetadata, av_db_session
+            from .model_metadata_db import ModelAvMetadata
             import json, re
 
             files = []
@@ -726,17 +742,10 @@ class ModuleJavUncensored(PluginModuleBase):
                 return jsonify(ret), 200
 
             ret['total_input'] = len(files)
-            batch_size = 100
-            processed_in_batch = 0
-
-            for filename in files:
-                if not filename or not isinstance(filename, str): continue
-                res, code, detail = ModelAvMetadata.update_user_image_by_filename(filename)
-                
+            for filename, res, code, detail in ModelAvMetadata.update_user_images_by_filenames(files):
                 if res == 'updated':
                     ret['updated_count'] += 1
                     ret['updated_items'].append(detail)
-                    processed_in_batch += 1
                 elif res == 'not_found':
                     ret['not_found_count'] += 1
                     ret['not_found_files'].append(filename)
@@ -745,14 +754,7 @@ class ModuleJavUncensored(PluginModuleBase):
                 elif res == 'error':
                     ret['errors'].append({'file': filename, 'error': detail})
 
-                if processed_in_batch >= batch_size:
-                    av_db_session.commit()
-                    processed_in_batch = 0
-
-            if processed_in_batch > 0:
-                av_db_session.commit()
-
-            ModelAvMetadata.checkpoint_wal()
+            ModelAvMetadata.request_checkpoint()
 
             ret['msg'] = f"총 {len(files)}개 중 {ret['updated_count']}개 DB 레코드 업데이트 완료"
             logger.info(f"[{self.name}] User Image API: {ret['msg']}")
@@ -776,36 +778,23 @@ class ModuleJavUncensored(PluginModuleBase):
     def search(self, keyword, manual=False):
         logger.info(f'======= jav uncensored search START - keyword:[{keyword}] manual:[{manual}] =======')
         all_results = []
+        settings = self._get_setting_snapshot()
         
         # 1. DB 선행 검색
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
+        use_db = settings['db_use']
         if use_db and not manual:
             try:
                 from .model_metadata_db import ModelAvMetadata, av_db_session
                 
                 parsed_ui = SiteAvBase._parse_ui_code_uncensored(keyword)
-                norm_kw = re.sub(r'[^a-zA-Z0-9]', '', parsed_ui or keyword).lower()
-                
-                # 숫자 파트 기반 1차 쿼리
-                match_num = re.search(r'\d+', keyword)
-                search_query = f"%{match_num.group()}%" if match_num else f"%{keyword}%"
+                norm_kw = ModelAvMetadata.normalize_code(parsed_ui or keyword)
 
-                db_records = av_db_session.query(ModelAvMetadata).filter(
+                # 정규화 품번 (사이트 접두사 변형 포함) 인덱스 일치 조회
+                norm_candidates = [norm_kw] + [f"{prefix}{norm_kw}" for prefix in ['1pon', '10mu', 'paco', 'heyzo', 'carib', 'fc2']]
+                valid_db_records = av_db_session.query(ModelAvMetadata).filter(
                     ModelAvMetadata.category == 'UNCEN',
-                    ModelAvMetadata.originaltitle.ilike(search_query)
-                ).all()
-
-                valid_db_records = []
-                for record in db_records:
-                    norm_orig = re.sub(r'[^a-zA-Z0-9]', '', record.originaltitle).lower()
-                    norm_code = re.sub(r'[^a-zA-Z0-9]', '', record.code).lower()
-
-                    if norm_kw == norm_orig or norm_kw == norm_code:
-                        valid_db_records.append(record)
-                    elif len(norm_orig) > len(norm_kw) and norm_orig.endswith(norm_kw):
-                        prefix = norm_orig[:-len(norm_kw)]
-                        if prefix in ['1pon', '10mu', 'paco', 'heyzo', 'carib', 'fc2']:
-                            valid_db_records.append(record)
+                    or_(ModelAvMetadata.code_norm.in_(norm_candidates), ModelAvMetadata.code == keyword)
+                ).all() if norm_kw else []
 
                 for record in valid_db_records:
                     jd = record.json_data if isinstance(record.json_data, dict) else {}
@@ -850,9 +839,10 @@ class ModuleJavUncensored(PluginModuleBase):
                 logger.error(f"[{self.name}] DB Search Error: {e_db}")
 
         # 2. 직결 라우팅 (Uncensored 고유 방식: 일치하는 단일 사이트 1곳만 즉시 조회)
-        for site_name, site_info in self.site_map.items():
-            if any(k in keyword.lower() for k in site_info['keyword']) or re.search(site_info['regex'], keyword.lower()):
-                instance = site_info['instance']
+        keyword_lower = keyword.lower()
+        for site_name, site_keywords, site_regex in settings['site_patterns']:
+            if any(k in keyword_lower for k in site_keywords) or site_regex.search(keyword_lower):
+                instance = self.site_map[site_name]['instance']
                 data = instance.search(keyword, manual=manual)
                 if data and data.get('ret') == 'success' and data.get('data'):
                     all_results = data['data']
@@ -915,6 +905,15 @@ class ModuleJavUncensored(PluginModuleBase):
     # endregion SEARCH
     ################################################
 
+    def process_actors(self, actors):
+        censored_module = P.get_module('jav_censored')
+        if censored_module:
+            censored_module.process_actors(actors)
+        else:
+            for item in actors:
+                self.process_actor(item)
+
+
     def process_actor(self, entity_actor):
         censored_module = P.get_module('jav_censored')
         if censored_module:
@@ -928,6 +927,12 @@ class ModuleJavUncensored(PluginModuleBase):
     # region INFO
 
     def info(self, code, fp_meta_mode=False, skip_trans=False):
+        # 같은 품번(및 skip_trans 등 인자)의 동시 요청은 첫 요청 결과를 공유 (중복 스크래핑/번역/배우 처리/DB 저장 방지)
+        from .model_metadata_db import ModelAvMetadata
+        return ModelAvMetadata.run_info_single_flight(self.name, (code, bool(skip_trans), bool(fp_meta_mode)), lambda: self._info(code, fp_meta_mode=fp_meta_mode, skip_trans=skip_trans))
+
+
+    def _info(self, code, fp_meta_mode=False, skip_trans=False):
         bypass_cache = False
         try:
             if self.keyword_cache.get(f"BYPASS_{code}") == "1":
@@ -951,8 +956,9 @@ class ModuleJavUncensored(PluginModuleBase):
             logger.error(f"No site found for site_char '{code[1]}' in code '{code}'")
             return None
 
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
-        save_db = P.ModelSetting.get_bool(f"{self.name}_db_save")
+        settings = self._get_setting_snapshot()
+        use_db = settings['db_use']
+        save_db = settings['db_save']
         
         if use_db and not bypass_cache:
             from .model_metadata_db import ModelAvMetadata
@@ -1012,14 +1018,13 @@ class ModuleJavUncensored(PluginModuleBase):
         actor_names_for_log = []
         if not fp_meta_mode:
             if ret.get('actor'):
-                for item in ret['actor']:
-                    self.process_actor(item)
-                    actor_names_for_log.append(item.get("name", item.get("originalname", "?")))
+                self.process_actors(ret['actor'])
+                actor_names_for_log = [item.get("name", item.get("originalname", "?")) for item in ret['actor']]
 
         original_calculated_title = ret.get("title", "")
 
         try: # 타이틀 포맷팅
-            title_format = P.ModelSetting.get('jav_censored_title_format')
+            title_format = settings['title_format']
 
             format_dict = {
                 'originaltitle': ret.get("originaltitle", ""),
@@ -1052,7 +1057,7 @@ class ModuleJavUncensored(PluginModuleBase):
 
         # 태그 옵션
         if "tag" in ret:
-            tag_option = P.ModelSetting.get("jav_censored_tag_option")
+            tag_option = settings['tag_option']
             if tag_option == "not_using":
                 ret["tag"] = []
             elif tag_option == "label":
@@ -1068,7 +1073,7 @@ class ModuleJavUncensored(PluginModuleBase):
                 ret["tag"] = tmp
 
         # 부가 영상 사용 여부 (jav_censored 설정값 사용)
-        if not P.ModelSetting.get_bool('jav_censored_use_extras'):
+        if not settings['use_extras']:
             ret['extras'] = []
 
         if ret:
@@ -1077,7 +1082,7 @@ class ModuleJavUncensored(PluginModuleBase):
             logger.info(f"[{target_instance.site_name.upper()} Success] Code: {code}, Title: {title_log} ({year_log})")
 
         # DB 자동 저장
-        save_only_trans = P.ModelSetting.get_bool(f"{self.name}_db_save_only_translated")
+        save_only_trans = settings['db_save_only_translated']
         should_save = save_db and ret
         
         if should_save and save_only_trans:
@@ -1087,7 +1092,7 @@ class ModuleJavUncensored(PluginModuleBase):
 
         if should_save:
             from .model_metadata_db import ModelAvMetadata
-            ModelAvMetadata.save_metadata(self.category, ret)
+            ModelAvMetadata.save_metadata(self.category, ret, defer=settings['db_save_write_behind'])
 
         return ret
 
@@ -1141,8 +1146,8 @@ class ModuleJavUncensored(PluginModuleBase):
                 self.enrich_status['status'] = '완료'
                 logger.info(f"[{self.name}] 일괄 작업 완료 (성공: {self.enrich_status['success']}, 실패: {self.enrich_status['fail']})")
 
-            # 작업 완료 후 부풀어 오른 WAL 파일 즉시 청소
-            ModelAvMetadata.checkpoint_wal()
+            # 작업 완료 후 부풀어 오른 WAL 파일 청소 예약 (스케줄러가 유휴 시 TRUNCATE)
+            ModelAvMetadata.request_checkpoint()
 
         except Exception as e_main:
             logger.error(f"[{self.name}] 일괄 작업 치명적 오류: {e_main}")
@@ -410,19 +410,21 @@ class ModuleMovie(PluginModuleBase):
         if mode == 'none':
             return
 
+        # 번역 대상 (dict, key) 를 모아 한 번에 일괄 번역한 뒤 제자리에 반영
+        targets = []
         if SiteUtil.is_include_hangul(data['plot']) == False:
-            data['plot'] = SiteUtil.trans(data['plot'], source='en')
+            targets.append((data, 'plot'))
         if mode == 'all':
             for actor in data['actor']:
-                #logger.debug(actor['name'])e
                 if SiteUtil.is_include_hangul(actor['name']) == False:
-                    actor['name'] = SiteUtil.trans(actor['name'], source='en')
-                    #logger.info(f"{actor['name']}")
+                    targets.append((actor, 'name'))
                 if actor['role'].strip() == '': continue
-                #logger.debug(f"{actor['role']}")                    
                 if actor['role'].strip() != '' and SiteUtil.is_include_hangul(actor['role']) == False:
-                    actor['role'] = SiteUtil.trans(actor['role'], source='en')
-                    #logger.info(f"{actor['role']}")
+                    targets.append((actor, 'role'))
+
+        from .trans_batch import trans_batch
+        for (target, key), value in zip(targets, trans_batch([target[key] for target, key in targets], source='en', module=self.name)):
+            target[key] = value
         return data
 
 
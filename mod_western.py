@@ -6,6 +6,7 @@ import json
 import sqlite3
 from datetime import datetime
 import requests
+from types import MappingProxyType
 
 from flask import jsonify, send_file
 from io import BytesIO
@@ -76,17 +77,32 @@ class ModuleWestern(PluginModuleBase):
             f"{self.name}_db_use": "False",
             f"{self.name}_db_save": "False",
             f"{self.name}_db_save_only_translated": "True",
+            f"{self.name}_db_save_write_behind": "False",
             f"{self.name}_db_auto_enrich": "True",
             f"{self.name}_db_delete_user_images": "False",
             f"{self.name}_enrich_delay": "2.0",
             f"{self.name}_db_import_path": "",
+            f"{self.name}_db_export_format": "db",
             f"{self.name}_db_image_url_mapping": "",
+            f"{self.name}_image_manifest_time": "",
         }
 
         self.enrich_status = {
             'is_running': False, 'status': '대기 중', 'total': 0,
             'current': 0, 'success': 0, 'fail': 0, 'current_code': '', 'stop_flag': False
         }
+        self.export_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0,
+            'current': 0, 'filename': '', 'msg': ''
+        }
+        self.clear_status = {
+            'is_running': False, 'status': '대기 중', 'total': 0, 'current': 0,
+            'count': 0, 'deleted': 0, 'skipped_user': 0, 'msg': ''
+        }
+        self.manifest_status = {
+            'is_running': False, 'status': '대기 중', 'current': 0, 'indexed': 0, 'msg': ''
+        }
+        self.setting_snapshot = None
 
         try:
             self.keyword_cache = F.get_cache(f"{P.package_name}_{self.name}_keyword_cache")
@@ -99,20 +115,33 @@ class ModuleWestern(PluginModuleBase):
 
     def plugin_load(self):
         try:
-            from .model_metadata_db import engine, Base, ModelAvMetadata
+            from .model_metadata_db import engine, Base, ModelAvMetadata, migrate_db
             Base.metadata.create_all(bind=engine)
+            migrate_db()
             self.web_list_model = ModelAvMetadata
         except Exception as e:
             logger.error(f"[{self.name}] DB Init Error: {e}")
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
+
+
+    def plugin_unload(self):
+        # write-behind 큐에 남은 메타데이터 저장
+        try:
+            from .model_metadata_db import ModelAvMetadata
+            ModelAvMetadata.flush_write_behind()
+        except Exception as e:
+            logger.error(f"[{self.name}] write-behind flush error: {e}")
 
 
     def plugin_load_celery(self):
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
 
 
     def setting_save_after(self, change_list):
         self._set_site_setting()
+        self._rebuild_setting_snapshot()
 
 
     def _set_site_setting(self):
@@ -124,6 +153,57 @@ class ModuleWestern(PluginModuleBase):
                 P.logger.error(f"[{self.name}] Error initializing site {site_key}: {e}")
 
 
+
+    def _build_setting_snapshot(self):
+        """
+        search/info/web_list 요청 경로에서 쓰는 설정의 읽기 전용 스냅샷 (검색어 정리 정규식은 컴파일된 상태).
+        설정 저장/플러그인 로드 시 새로 만들어 교체
+        """
+        from .model_metadata_db import ModelAvMetadata
+        MS = P.ModelSetting
+
+        def compile_patterns(key, step_name):
+            patterns = []
+            for pattern in (MS.get(key) or '').split('\n'):
+                pattern = pattern.strip()
+                if not pattern:
+                    continue
+                try: patterns.append(re.compile(pattern, re.IGNORECASE))
+                except Exception as e: logger.error(f"[{self.name}] {step_name} 정규식 오류 '{pattern}': {e}")
+            return tuple(patterns)
+
+        trans_title = MS.get_bool(f"{self.name}_trans_title")
+        return MappingProxyType({
+            'order': tuple(s.strip().lower() for s in MS.get_list(f"{self.name}_order", ",") if s.strip()),
+            'search_regex_removal': compile_patterns(f"{self.name}_search_regex_removal", '1차'),
+            'search_regex_removal_2nd': compile_patterns(f"{self.name}_search_regex_removal_2nd", '2차'),
+            'db_use': MS.get_bool(f"{self.name}_db_use"),
+            'db_save': MS.get_bool(f"{self.name}_db_save"),
+            'db_save_only_translated': MS.get_bool(f"{self.name}_db_save_only_translated"),
+            'db_save_write_behind': MS.get_bool(f"{self.name}_db_save_write_behind"),
+            'db_image_url_mappings': ModelAvMetadata.parse_url_mappings(MS.get(f"{self.name}_db_image_url_mapping")),
+            'trans_title': True if trans_title is None else trans_title,
+            'use_movie_title_format': MS.get_bool(f"{self.name}_use_movie_title_format"),
+            'movie_title_format': MS.get(f"{self.name}_movie_title_format") or "[{studio}] {title}",
+            'title_format': MS.get(f"{self.name}_title_format") or "[{studio}] {actor} - {title}",
+            'tag_option': MS.get(f"{self.name}_tag_option"),
+        })
+
+
+    def _rebuild_setting_snapshot(self):
+        try:
+            self.setting_snapshot = self._build_setting_snapshot()
+        except Exception as e:
+            logger.error(f"[{self.name}] setting snapshot build error: {e}")
+            logger.error(traceback.format_exc())
+
+
+    def _get_setting_snapshot(self):
+        snapshot = self.setting_snapshot
+        if snapshot is None:
+            snapshot = self.setting_snapshot = self._build_setting_snapshot()
+        return snapshot
+
     def process_ajax(self, sub, req):
         try:
             command = req.form.get('command')
@@ -131,17 +211,41 @@ class ModuleWestern(PluginModuleBase):
             # 1. 폼 검색 목록 요청(command가 없거나 db_list인 경우)
             if not command or command == 'db_list' or req.form.get('page_size') is not None:
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             # 2. 백그라운드 미디어 채우기 상태 조회 (최우선 즉시 반환)
             if command == 'db_enrich_status':
                 return jsonify({'ret': 'success', 'data': self.enrich_status})
+            if command == 'db_export_status':
+                return jsonify({'ret': 'success', 'data': self.export_status})
+            if command == 'db_clear_status':
+                return jsonify({'ret': 'success', 'data': self.clear_status})
+            if command == 'db_image_reconcile_status':
+                return jsonify({'ret': 'success', 'data': self.manifest_status})
+            if command == 'db_write_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_write_behind_status()})
+            if command == 'db_cache_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_metadata_cache_status()})
+            if command == 'db_info_flight_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_info_flight_status(self.name)})
+            if command == 'db_wal_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_wal_status()})
+            if command == 'db_trans_memory_status':
+                from .model_metadata_db import ModelAvTransMemory
+                return jsonify({'ret': 'success', 'data': ModelAvTransMemory.get_status()})
+            if command == 'db_crop_status':
+                from .model_metadata_db import ModelAvMetadata
+                return jsonify({'ret': 'success', 'data': ModelAvMetadata.get_crop_job(req.form.get('arg1'))})
 
             logger.debug(f"[{self.name}] process_ajax 요청됨 - command: {command}")
             
             # 3. 기타 커스텀 명령 처리
             custom_commands = [
-                'test', 'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum',
+                'test', 'db_edit_save', 'db_delete', 'db_clear', 'db_vacuum', 'db_compress', 'db_detail', 'db_image_reconcile',
                 'db_import', 'db_export', 'db_enrich_start', 'db_enrich_stop',
                 'db_refresh_image', 'db_crop_save'
             ]
@@ -185,13 +289,13 @@ class ModuleWestern(PluginModuleBase):
                     except Exception:
                         pl_base64 = upload_payload
 
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(
+                success, result = ModelAvMetadata.start_user_crop(
                     code, crop_data, pl_image_base64_data=pl_base64, p_image_base64_data=p_base64
                 )
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터(_p_user)가 성공적으로 저장되었습니다.', 'new_url': result_msg})
+                    return jsonify(dict(result, ret='success', msg='포스터(_p_user) 처리를 시작했습니다.'))
                 else:
-                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result_msg}'})
+                    return jsonify({'ret': 'error', 'msg': f'저장 실패: {result}'})
 
             # --- 1. 웹 UI 검색 테스트 ---
             elif command == "test":
@@ -216,7 +320,7 @@ class ModuleWestern(PluginModuleBase):
             # --- 2. 로컬 DB 리스트 조회 ---
             elif command == 'db_list':
                 from .model_metadata_db import ModelAvMetadata
-                return jsonify(ModelAvMetadata.web_list(req, category=self.category))
+                return jsonify(ModelAvMetadata.web_list(req, category=self.category, url_mappings=self._get_setting_snapshot()['db_image_url_mappings']))
 
             # --- 3. 로컬 DB JSON 직접 수정 저장 ---
             elif command == 'db_edit_save':
@@ -250,8 +354,18 @@ class ModuleWestern(PluginModuleBase):
             # --- 5. 로컬 DB 전체 초기화 ---
             elif command == 'db_clear':
                 from .model_metadata_db import ModelAvMetadata
-                success, count = ModelAvMetadata.clear_db(self.category)
-                return jsonify({'ret': 'success', 'msg': f'{count}건의 메타데이터가 삭제되었습니다.'} if success else {'ret': 'error', 'msg': '초기화 실패'})
+                if self.clear_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 DB 초기화 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_clear(self.category, status=self.clear_status)
+                return jsonify({'ret': 'success', 'msg': 'DB 초기화 작업을 백그라운드에서 시작했습니다.'})
+
+            # --- 이미지 매니페스트 재구성 ---
+            elif command == 'db_image_reconcile':
+                from .model_metadata_db import ModelAvMetadata
+                if self.manifest_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 이미지 인덱스 재구성 작업이 진행 중입니다.'})
+                ModelAvMetadata.start_image_reconcile(self.category, status=self.manifest_status)
+                return jsonify({'ret': 'success', 'msg': '이미지 인덱스 재구성을 백그라운드에서 시작했습니다.'})
 
             # --- 6. 로컬 DB VACUUM 최적화 ---
             elif command == 'db_vacuum':
@@ -259,9 +373,23 @@ class ModuleWestern(PluginModuleBase):
                 success = ModelAvMetadata.vacuum_db()
                 return jsonify({'ret': 'success', 'msg': 'DB 최적화(VACUUM) 완료'} if success else {'ret': 'error', 'msg': '최적화 실패'})
 
+            elif command == 'db_detail':
+                from .model_metadata_db import ModelAvMetadata
+                data = ModelAvMetadata.get_detail(arg1)
+                if data is None:
+                    return jsonify({'ret': 'warning', 'msg': f'DB 레코드 없음: {arg1}'})
+                return jsonify({'ret': 'success', 'data': data})
+
+            elif command == 'db_compress':
+                from .model_metadata_db import ModelAvMetadata
+                codec = arg1 if arg1 in ('zstd', 'zlib', 'none') else 'zstd'
+                ModelAvMetadata.start_compress(codec)
+                msg = 'json 압축 해제' if codec == 'none' else f'json 압축 저장({codec}) 변환'
+                return jsonify({'ret': 'success', 'msg': f'{msg} 작업을 백그라운드에서 시작했습니다. 완료 후 VACUUM 까지 자동 진행되며 진행 상황은 로그에서 확인하세요.'})
+
             # --- 7. 스마트 병합 / 누락분 Import ---
             elif command == 'db_import':
-                from .model_metadata_db import ModelAvMetadata, av_db_session
+                from .model_metadata_db import ModelAvMetadata
                 raw_paths = arg1
                 mode = arg2 # 'update' or 'missing'
                 auto_enrich = (arg3 == 'true')
@@ -270,92 +398,12 @@ class ModuleWestern(PluginModuleBase):
                 import_paths = [p.strip() for p in raw_paths.split('\n') if p.strip()]
                 
                 try:
-                    insert_count, update_count, skip_count = 0, 0, 0
-                    batch_size = 500
-                    processed_in_batch = 0
-                    
-                    for import_path in import_paths:
-                        if not os.path.exists(import_path):
-                            logger.warning(f"[{self.name}] Import 경로 없음: {import_path}")
-                            continue
-
-                        # Case A: .db 파일 병합
-                        if os.path.isfile(import_path) and import_path.lower().endswith(('.db', '.sqlite')):
-                            try:
-                                conn = sqlite3.connect(import_path)
-                                c = conn.cursor()
-                                c.execute("SELECT category, code, json_data FROM av_metadata_cache WHERE category = ?", (self.category,))
-                                rows = c.fetchall()
-                                total_rows = len(rows)
-                                conn.close()
-
-                                logger.info(f"[{self.name}] DB 파일 내 {total_rows}개 레코드 병합 시작 -> {import_path}")
-
-                                for idx, (r_cat, r_code, r_json) in enumerate(rows, 1):
-                                    try:
-                                        jd = json.loads(r_json) if isinstance(r_json, str) else r_json
-                                        res = ModelAvMetadata.merge_record(self.category, jd, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_rows) * 100 if total_rows > 0 else 100
-                                            logger.info(f"[{self.name}] DB Import 진행 중: {idx}/{total_rows} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                    except Exception as e_row:
-                                        logger.error(f"Row 파싱 에러 ({r_code}): {e_row}")
-
-                                if processed_in_batch > 0:
-                                    av_db_session.commit()
-                                    processed_in_batch = 0
-                                    logger.info(f"[{self.name}] DB Import 진행 중: {total_rows}/{total_rows} (100.0%) | 최종 커밋 완료")
-
-                            except Exception as e_db_file:
-                                logger.error(f"[{self.name}] DB 파일 읽기 실패: {e_db_file}")
-
-                        # Case B: 폴더 내 .json 파일들 병합
-                        else:
-                            json_files = []
-                            if os.path.isfile(import_path) and import_path.lower().endswith('.json'):
-                                json_files.append(import_path)
-                            else:
-                                for root, _, files in os.walk(import_path):
-                                    for f in files:
-                                        if f.lower().endswith('.json'):
-                                            json_files.append(os.path.join(root, f))
-                            
-                            total_files = len(json_files)
-                            logger.info(f"[{self.name}] JSON 파일 {total_files}개 병합 시작 -> {import_path}")
-
-                            for idx, jf in enumerate(json_files, 1):
-                                try:
-                                    with open(jf, 'r', encoding='utf-8') as file:
-                                        data = json.load(file)
-                                        res = ModelAvMetadata.merge_record(self.category, data, mode=mode)
-                                        if res == 'inserted': insert_count += 1
-                                        elif res == 'updated': update_count += 1
-                                        else: skip_count += 1
-
-                                        processed_in_batch += 1
-                                        if processed_in_batch >= batch_size:
-                                            av_db_session.commit()
-                                            processed_in_batch = 0
-                                            percent = (idx / total_files) * 100 if total_files > 0 else 100
-                                            logger.info(f"[{self.name}] JSON Import 진행 중: {idx}/{total_files} ({percent:.1f}%) | 신규: {insert_count}, 갱신: {update_count}, 스킵: {skip_count}")
-                                except Exception as e_jf:
-                                    logger.error(f"JSON 파일 파싱 에러 ({jf}): {e_jf}")
-
-                            if processed_in_batch > 0:
-                                av_db_session.commit()
-                                processed_in_batch = 0
-                                logger.info(f"[{self.name}] JSON Import 진행 중: {total_files}/{total_files} (100.0%) | 최종 커밋 완료")
-
-                    ModelAvMetadata.checkpoint_wal()
-
-                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건)"
+                    stats = ModelAvMetadata.bulk_import(self.category, import_paths, mode=mode, log_name=self.name)
+                    insert_count, update_count, skip_count = stats['inserted'], stats['updated'], stats['skipped']
+
+                    ModelAvMetadata.request_checkpoint()
+
+                    final_msg = f"병합 완료! (신규 등록: {insert_count}건, 번역/메타 갱신: {update_count}건, 건너뜀: {skip_count}건, {stats['rows_per_sec']:.0f}건/초)"
                     logger.info(f"[{self.name}] {final_msg}")
 
                     if auto_enrich:
@@ -370,51 +418,31 @@ class ModuleWestern(PluginModuleBase):
 
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Import 치명적 오류: {e}")
-                    av_db_session.rollback()
                     return jsonify({'ret': 'error', 'msg': str(e)})
 
             # --- 8. 로컬 DB Export ---
             elif command == 'db_export':
                 from .model_metadata_db import ModelAvMetadata
-                mode = arg1 # 'current' or 'all'
+                from datetime import datetime
+
+                mode = arg1 # 'current' 또는 'all'
+                if self.export_status['is_running']:
+                    return jsonify({'ret': 'warning', 'msg': '이미 Export 작업이 진행 중입니다.'})
                 try:
                     tmp_dir = os.path.join(path_data, 'tmp')
                     os.makedirs(tmp_dir, exist_ok=True)
+
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     category_suffix = "WEST" if mode == 'current' else "ALL"
-                    filename = f"metadata_av_{category_suffix}_{timestamp}.db"
-                    filepath = os.path.join(tmp_dir, filename)
-
-                    new_conn = sqlite3.connect(filepath)
-                    new_c = new_conn.cursor()
-                    new_c.execute('''CREATE TABLE av_metadata_cache (
-                        id INTEGER PRIMARY KEY,
-                        category VARCHAR(20) NOT NULL,
-                        code VARCHAR(100) NOT NULL,
-                        originaltitle VARCHAR(255) NOT NULL,
-                        site VARCHAR(50) NOT NULL,
-                        title VARCHAR(255) NOT NULL,
-                        poster_url VARCHAR(500),
-                        json_data JSON NOT NULL,
-                        created_time DATETIME,
-                        updated_time DATETIME
-                    )''')
-
-                    records = ModelAvMetadata.query.filter_by(category=self.category).all() if mode == 'current' else ModelAvMetadata.query.all()
-                    count = 0
-                    for r in records:
-                        clean_data = ModelAvMetadata.sanitize_for_export(r.json_data)
-                        c_time = r.created_time.strftime('%Y-%m-%d %H:%M:%S') if r.created_time else None
-                        u_time = r.updated_time.strftime('%Y-%m-%d %H:%M:%S') if r.updated_time else None
-                        new_c.execute('''INSERT INTO av_metadata_cache
-                        (category, code, originaltitle, site, title, poster_url, json_data, created_time, updated_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                        (r.category, r.code, r.originaltitle, r.site, r.title, '', json.dumps(clean_data, ensure_ascii=False), c_time, u_time))
-                        count += 1
-
-                    new_conn.commit()
-                    new_conn.close()
-                    return jsonify({'ret': 'success', 'msg': f'{count}개의 데이터가 포함된 DB 파일 준비 완료', 'filename': filename})
+                    extension = ModelAvMetadata.export_extension(arg2 or P.ModelSetting.get(f"{self.name}_db_export_format"))
+                    filename = f"metadata_av_{category_suffix}_{timestamp}{extension}"
+
+                    ModelAvMetadata.start_export(
+                        os.path.join(tmp_dir, filename),
+                        category=self.category if mode == 'current' else None,
+                        status=self.export_status
+                    )
+                    return jsonify({'ret': 'success', 'msg': 'Export 작업을 백그라운드에서 시작했습니다.', 'filename': filename})
                 except Exception as e:
                     logger.error(f"[{self.name}] DB Export Error: {e}")
                     return jsonify({'ret': 'error', 'msg': str(e)})
@@ -491,9 +519,10 @@ class ModuleWestern(PluginModuleBase):
 
         logger.info(f"======= Western search START - keyword:[{cleaned_keyword}] video:[{target_video_file}] manual:[{manual}] =======")
         all_results = []
+        settings = self._get_setting_snapshot()
         
         # 1. Local DB 캐시 선행 검색
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
+        use_db = settings['db_use']
         if use_db and not manual:
             try:
                 from .model_metadata_db import ModelAvMetadata, av_db_session
@@ -508,13 +537,13 @@ class ModuleWestern(PluginModuleBase):
                 if target_hash:
                     db_hash_record = av_db_session.query(ModelAvMetadata).filter(
                         ModelAvMetadata.category == 'WEST',
-                        func.json_extract(ModelAvMetadata.json_data, '$.extra_info.oshash') == target_hash
+                        ModelAvMetadata.oshash == target_hash
                     ).first()
                     
                     if not db_hash_record:
                         db_hash_record = av_db_session.query(ModelAvMetadata).filter(
                             ModelAvMetadata.category == 'WEST',
-                            func.json_extract(ModelAvMetadata.json_data, '$.extra_info.phash') == target_hash
+                            ModelAvMetadata.phash == target_hash
                         ).first()
 
                     if db_hash_record:
@@ -525,20 +554,17 @@ class ModuleWestern(PluginModuleBase):
                         return [item_dict]
 
                 # (2) 텍스트 기반 로컬 DB 검색
-                kw_norm = re.sub(r'[^a-zA-Z0-9]', '', cleaned_keyword).lower()
-                query_kw = f"%{cleaned_keyword.replace('-', '%')}%"
+                kw_norm = ModelAvMetadata.normalize_code(cleaned_keyword)
                 db_records = av_db_session.query(ModelAvMetadata).filter(
                     ModelAvMetadata.category == 'WEST',
-                    ModelAvMetadata.originaltitle.ilike(query_kw)
-                ).all()
+                    ModelAvMetadata.code_norm == kw_norm
+                ).all() if kw_norm else []
 
                 for record in db_records:
-                    record_orig_norm = re.sub(r'[^a-zA-Z0-9]', '', record.originaltitle).lower()
-                    if kw_norm == record_orig_norm:
-                        db_item = self._create_search_item_from_record(record, 105)
-                        item_dict = db_item.as_dict()
-                        item_dict['score'] = 100
-                        all_results.append(item_dict)
+                    db_item = self._create_search_item_from_record(record, 105)
+                    item_dict = db_item.as_dict()
+                    item_dict['score'] = 100
+                    all_results.append(item_dict)
 
                 if all_results:
                     return all_results
@@ -546,7 +572,7 @@ class ModuleWestern(PluginModuleBase):
                 logger.error(f"[{self.name}] DB Search Error: {e_db}")
 
         # 2. 사이트 순환 검색 (western_order: "stashdb, tpdb")
-        site_order_list = [s.strip().lower() for s in P.ModelSetting.get_list(f"{self.name}_order", ",") if s.strip()]
+        site_order_list = settings['order']
         early_exit_triggered = False
 
         for idx, site_key in enumerate(site_order_list):
@@ -648,19 +674,10 @@ class ModuleWestern(PluginModuleBase):
         cleaned = re.sub(r'^\[[^\]]+\]\s*', '', cleaned)
         cleaned = re.sub(r'[\-_.]', ' ', cleaned)
 
-        regex_string_1st = P.ModelSetting.get(f"{self.name}_search_regex_removal")
-        if regex_string_1st and regex_string_1st.strip():
-            patterns = [p.strip() for p in regex_string_1st.split('\n') if p.strip()]
-            for pattern in patterns:
-                try: cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE).strip()
-                except Exception as e: logger.error(f"[{self.name}] 1차 정규식 오류 '{pattern}': {e}")
-                    
-        regex_string_2nd = P.ModelSetting.get(f"{self.name}_search_regex_removal_2nd")
-        if regex_string_2nd and regex_string_2nd.strip():
-            patterns = [p.strip() for p in regex_string_2nd.split('\n') if p.strip()]
-            for pattern in patterns:
-                try: cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE).strip()
-                except Exception as e: logger.error(f"[{self.name}] 2차 정규식 오류 '{pattern}': {e}")
+        # 1차/2차 제거 정규식 (설정 스냅샷에서 컴파일된 패턴, 잘못된 패턴은 스냅샷 생성 시 로그 후 제외)
+        settings = self._get_setting_snapshot()
+        for pattern in settings['search_regex_removal'] + settings['search_regex_removal_2nd']:
+            cleaned = pattern.sub(' ', cleaned).strip()
 
         return re.sub(r'\s+', ' ', cleaned).strip()
 
@@ -676,6 +693,13 @@ class ModuleWestern(PluginModuleBase):
 
 
     def info(self, code, keyword=None, fp_meta_mode=False, skip_trans=False, media_path=None):
+        # 같은 품번(및 skip_trans 등 인자)의 동시 요청은 첫 요청 결과를 공유 (중복 스크래핑/번역/배우 처리/DB 저장 방지).
+        # keyword 는 _info 가 사용하지 않으므로 키에 넣지 않음
+        from .model_metadata_db import ModelAvMetadata
+        return ModelAvMetadata.run_info_single_flight(self.name, (code, bool(skip_trans), bool(fp_meta_mode), media_path), lambda: self._info(code, keyword=keyword, fp_meta_mode=fp_meta_mode, skip_trans=skip_trans, media_path=media_path))
+
+
+    def _info(self, code, keyword=None, fp_meta_mode=False, skip_trans=False, media_path=None):
         if len(code) < 3 or code[0] != 'W':
             logger.error(f"[{self.name}] 처리할 수 없는 코드: {code}")
             return None
@@ -696,8 +720,9 @@ class ModuleWestern(PluginModuleBase):
         except Exception:
             pass
 
-        use_db = P.ModelSetting.get_bool(f"{self.name}_db_use")
-        save_db = P.ModelSetting.get_bool(f"{self.name}_db_save")
+        settings = self._get_setting_snapshot()
+        use_db = settings['db_use']
+        save_db = settings['db_save']
         
         if use_db and not bypass_cache:
             from .model_metadata_db import ModelAvMetadata
@@ -773,19 +798,17 @@ class ModuleWestern(PluginModuleBase):
                 else:
                     studio_code = uncen_parsed.upper() if uncen_parsed else raw_code_candidate.upper()
 
-        # JAV 표준 장르 번역 (av_tags.json 사전 및 trans 엔진 적용)
+        # JAV 표준 장르 번역 (av_tags.json 사전 및 trans 엔진 적용). 번역 메모리에 있는 태그는 엔진 호출 생략
         if ret.get('genre'):
+            from .trans_batch import trans_batch
             translated_genres = []
-            for g in ret['genre']:
-                t_g = SiteAvBase.get_translated_tag(g)
+            for t_g in trans_batch(ret['genre'], trans_func=SiteAvBase.get_translated_tag, pack=False, keep_failed=False, engine='av_tag', module=self.name):
                 if t_g and t_g not in translated_genres:
                     translated_genres.append(t_g)
             ret['genre'] = translated_genres
 
         # 제목 번역 옵션(western_trans_title)에 따른 포맷팅 대상 제목 결정
-        trans_title_enabled = P.ModelSetting.get_bool(f"{self.name}_trans_title")
-        if trans_title_enabled is None:
-            trans_title_enabled = True
+        trans_title_enabled = settings['trans_title']
 
         translated_title = ret.get("tagline") if trans_title_enabled else original_calculated_title
         effective_title = translated_title or original_calculated_title
@@ -803,11 +826,10 @@ class ModuleWestern(PluginModuleBase):
         }
 
         # Movie 포맷은 TPDB 전용으로만 분기 적용
-        use_movie_format = P.ModelSetting.get_bool(f"{self.name}_use_movie_title_format")
-        if site_key == 'tpdb' and content_type == 'movie' and use_movie_format:
-            title_format = P.ModelSetting.get(f"{self.name}_movie_title_format") or "[{studio}] {title}"
+        if site_key == 'tpdb' and content_type == 'movie' and settings['use_movie_title_format']:
+            title_format = settings['movie_title_format']
         else:
-            title_format = P.ModelSetting.get(f"{self.name}_title_format") or "[{studio}] {actor} - {title}"
+            title_format = settings['title_format']
 
         try:
             final_title = title_format.format(**format_dict)
@@ -832,7 +854,7 @@ class ModuleWestern(PluginModuleBase):
             ret["title"] = original_calculated_title
 
         # 태그(컬렉션) 옵션 처리
-        tag_option = P.ModelSetting.get(f"{self.name}_tag_option")
+        tag_option = settings['tag_option']
         ret["tag"] = []
         if tag_option != "not_using":
             safe_studio = ret.get("original", {}).get("studio", "")
@@ -848,14 +870,14 @@ class ModuleWestern(PluginModuleBase):
         logger.info(f"[{self.name}] Info Success: {code} -> {ret['title']} ({ret.get('year', '')})")
 
         # DB 저장
-        save_only_trans = P.ModelSetting.get_bool(f"{self.name}_db_save_only_translated")
+        save_only_trans = settings['db_save_only_translated']
         should_save = save_db and ret
         if should_save and save_only_trans and skip_trans:
             should_save = False
 
         if should_save:
             from .model_metadata_db import ModelAvMetadata
-            ModelAvMetadata.save_metadata(self.category, ret)
+            ModelAvMetadata.save_metadata(self.category, ret, defer=settings['db_save_write_behind'])
 
         return ret
 
@@ -901,13 +923,20 @@ class ModuleWestern(PluginModuleBase):
                 if not code or (not crop_data and not p_base64):
                     return jsonify({'ret': 'error', 'msg': 'code 또는 크롭/업로드 데이터가 누락되었습니다.'}), 400
 
-                success, result_msg = ModelAvMetadata.save_user_cropped_poster(
+                success, result = ModelAvMetadata.start_user_crop(
                     code, crop_data or "{}", pl_image_base64_data=pl_base64, p_image_base64_data=p_base64
                 )
                 if success:
-                    return jsonify({'ret': 'success', 'msg': '포스터가 저장되었습니다.', 'new_url': result_msg}), 200
+                    return jsonify(dict(result, ret='success', msg='포스터 처리를 시작했습니다.')), 200
                 else:
-                    return jsonify({'ret': 'error', 'msg': result_msg}), 500
+                    return jsonify({'ret': 'error', 'msg': result}), 500
+
+            if sub == "crop_status":
+                from .model_metadata_db import ModelAvMetadata
+                job = ModelAvMetadata.get_crop_job(req.args.get("job_id") or req.form.get("job_id"))
+                if not job:
+                    return jsonify({'ret': 'error', 'msg': '작업을 찾을 수 없습니다.'}), 404
+                return jsonify({'ret': 'success', 'data': job}), 200
 
             if sub == "user_image_update":
                 return self._api_user_image_update(req)
@@ -1046,7 +1075,7 @@ class ModuleWestern(PluginModuleBase):
             'not_found_files': [], 'errors': []
         }
         try:
-            from .model_metadata_db import ModelAvMetadata, av_db_session
+            from .model_metadata_db import ModelAvMetadata
             files = []
             if req.is_json:
                 json_body = req.get_json(silent=True) or {}
@@ -1069,17 +1098,10 @@ class ModuleWestern(PluginModuleBase):
                 return jsonify(ret), 200
 
             ret['total_input'] = len(files)
-            batch_size = 100
-            processed_in_batch = 0
-
-            for filename in files:
-                if not filename or not isinstance(filename, str): continue
-                res, code, detail = ModelAvMetadata.update_user_image_by_filename(filename)
-                
+            for filename, res, code, detail in ModelAvMetadata.update_user_images_by_filenames(files):
                 if res == 'updated':
                     ret['updated_count'] += 1
                     ret['updated_items'].append(detail)
-                    processed_in_batch += 1
                 elif res == 'not_found':
                     ret['not_found_count'] += 1
                     ret['not_found_files'].append(filename)
@@ -1088,14 +1110,7 @@ class ModuleWestern(PluginModuleBase):
                 elif res == 'error':
                     ret['errors'].append({'file': filename, 'error': detail})
 
-                if processed_in_batch >= batch_size:
-                    av_db_session.commit()
-                    processed_in_batch = 0
-
-            if processed_in_batch > 0:
-                av_db_session.commit()
-
-            ModelAvMetadata.checkpoint_wal()
+            ModelAvMetadata.request_checkpoint()
 
             ret['msg'] = f"총 {len(files)}개 중 {ret['updated_count']}개 DB 레코드 업데이트 완료"
             logger.info(f"[{self.name}] User Image API: {ret['msg']}")
@@ -1154,7 +1169,7 @@ class ModuleWestern(PluginModuleBase):
                 self.enrich_status['status'] = '완료'
                 logger.info(f"[{self.name}] 일괄 작업 완료 (성공: {self.enrich_status['success']}, 실패: {self.enrich_status['fail']})")
 
-            ModelAvMetadata.checkpoint_wal()
+            ModelAvMetadata.request_checkpoint()
 
         except Exception as e_main:
             logger.error(f"[{self.name}] 일괄 작업 치명적 오류: {e_main}")
@@ -1,31 +1,44 @@
+import io
 import os
 import re
+import gzip
 import json
 import copy
+import time
+import base64
+import hashlib
+import threading
 import traceback
 import math
+import zlib
+import struct
+import sqlite3
+import atexit
+from collections import Counter, OrderedDict
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import create_engine, Column, Integer, String, JSON, DateTime, or_, func, text
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import create_engine, Column, Integer, String, Text, JSON, DateTime, LargeBinary, Index, Computed, or_, and_, func, text, bindparam, select, tuple_
+from sqlalchemy.orm import Session, sessionmaker, scoped_session, load_only
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy import event
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import TextClause
 
 from .setup import *
 
 db_path = os.path.join(path_data, 'db', 'metadata_av.db')
 
-engine = create_engine(
-    f"sqlite:///{db_path}",
-    connect_args={'check_same_thread': False, 'timeout': 15},
-    poolclass=NullPool
-)
+# 연결 모드: 'pooled' = 조회용 연결 풀 + 쓰기용 연결 풀 (PRAGMA/페이지 캐시 유지), 'null' = 기존 방식 (매 요청 새 연결)
+DB_POOL_MODE = os.environ.get('METADATA_AV_DB_POOL', 'pooled').lower()
+DB_READER_POOL_SIZE = 4
+
 
-@event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
+    # 물리 연결당 한 번 실행 (pooled 모드에서는 연결이 재사용되므로 cache_size/mmap 이 유지됨)
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA synchronous=NORMAL")
@@ -34,14 +47,384 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     cursor.execute("PRAGMA mmap_size=268435456")
     cursor.close()
 
-av_db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+
+def _create_db_engine(**pool_kwargs):
+    db_engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={'check_same_thread': False, 'timeout': 15},
+        **pool_kwargs
+    )
+    event.listen(db_engine, "connect", set_sqlite_pragma)
+    return db_engine
+
+
+if DB_POOL_MODE == 'pooled':
+    # 조회: pool_size 개 연결을 유지하고 초과분(max_overflow=-1, 무제한)은 반환 시 닫음 -> NullPool 처럼 대기 없음
+    # 쓰기: 연결 1개를 유지하고 동시 쓰기는 초과 연결로 처리 (직렬화는 SQLite 쓰기 락/busy timeout).
+    # 개수를 1개로 제한하면 커밋/롤백하지 않은 세션 하나가 다른 모든 쓰기를 풀 대기로 막으므로 제한하지 않음
+    engine = _create_db_engine(poolclass=QueuePool, pool_size=DB_READER_POOL_SIZE, max_overflow=-1)
+    writer_engine = _create_db_engine(poolclass=QueuePool, pool_size=1, max_overflow=-1)
+else:
+    engine = writer_engine = _create_db_engine(poolclass=NullPool)
+
+
+class AvDbSession(Session):
+    """
+    조회(SELECT)는 reader 풀, 쓰기가 시작된 트랜잭션(flush/DML/원시 SQL/connection())은 커밋/롤백까지 writer 연결 사용.
+    쓰기 이후의 조회도 writer 로 보내 같은 트랜잭션의 변경 내용이 보이도록 함
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get('av_writer') or self._flushing or not _is_read_clause(clause):
+            if not self.info.get('av_writer'):
+                self.info['av_writer'] = True
+                _wal_touch()
+            return writer_engine
+        return engine
+
+
+def _is_read_clause(clause):
+    if isinstance(clause, Select):
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return False
+
+
+av_db_session = scoped_session(sessionmaker(class_=AvDbSession, autocommit=False, autoflush=False))
+
+
+@event.listens_for(av_db_session, 'after_transaction_end')
+def _on_av_transaction_end(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('av_writer', None)
+
+
+@event.listens_for(av_db_session, 'after_commit')
+def _on_av_commit(session):
+    # 호출부 트랜잭션에 실어 보낸 write-behind 항목 (flush_write_behind) 기록 확정
+    batch = session.info.pop('av_write_behind_pending', None)
+    if batch:
+        _release_write_inflight(batch)
+
+
+@event.listens_for(av_db_session, 'after_rollback')
+def _on_av_rollback(session):
+    # 호출부 트랜잭션이 롤백되면 실어 보낸 write-behind 항목을 다시 대기열로 (그 사이 더 새 값이 들어왔으면 그대로 둠)
+    batch = session.info.pop('av_write_behind_pending', None)
+    if batch:
+        with _write_lock:
+            for code, item in batch.items():
+                if code not in _write_queue:
+                    _write_queue[code] = item
+        _release_write_inflight(batch)
+        _write_event.set()
+
+
+def _release_write_inflight(batch):
+    with _write_lock:
+        for code, item in batch.items():
+            if _write_inflight.get(code) is item:
+                del _write_inflight[code]
+
+
+# WAL 체크포인트 스케줄러. 쓰기 중에는 WAL 이 WAL_PASSIVE_BYTES 를 넘을 때 PASSIVE(리더/라이터 대기 없음),
+# 마지막 쓰기 후 WAL_IDLE_SECONDS 동안 조용하면 TRUNCATE 로 파일까지 정리. 수동 정리는 checkpoint_wal() (TRUNCATE)
+WAL_CHECK_INTERVAL = 5
+WAL_PASSIVE_BYTES = 16 * 1024 * 1024
+WAL_IDLE_SECONDS = 30
+_wal_lock = threading.Lock()
+_wal_event = threading.Event()
+_wal_thread = None
+_wal_state = {'last_write': 0.0, 'dirty': False}
+_wal_stats = {
+    'wal_bytes': 0, 'passive': 0, 'truncate': 0, 'busy': 0, 'last_mode': '', 'last_time': '',
+    'last_duration_ms': 0.0, 'max_duration_ms': 0.0, 'total_duration_ms': 0.0, 'last_log_pages': 0, 'last_checkpointed_pages': 0,
+}
+
+
+def _wal_touch():
+    """쓰기 트랜잭션 시작 시 호출. 스케줄러가 없으면 시작"""
+    global _wal_thread
+    _wal_state['last_write'] = time.time()
+    _wal_state['dirty'] = True
+    if _wal_thread is None:
+        with _wal_lock:
+            if _wal_thread is None:
+                _wal_thread = threading.Thread(target=_wal_checkpoint_worker, name='MetaDBCheckpoint')
+                _wal_thread.daemon = True
+                _wal_thread.start()
+
+
+def _wal_size():
+    try:
+        return os.path.getsize(db_path + '-wal')
+    except OSError:
+        return 0
+
+
+def _run_wal_checkpoint(mode, conn=None):
+    """
+    PRAGMA wal_checkpoint 실행 후 지표 기록. PASSIVE 는 조회 풀 연결(쓰기 대기 없음), TRUNCATE/RESTART 는 쓰기 연결 사용.
+    conn 이 주어지면 해당 연결에서 실행. 반환: (busy, log, checkpointed)
+    """
+    start = time.perf_counter()
+    if conn is not None:
+        result = tuple(conn.exec_driver_sql(f'PRAGMA wal_checkpoint({mode})').first() or (0, 0, 0))
+    else:
+        with (engine if mode == 'PASSIVE' else writer_engine).connect() as conn:
+            result = tuple(conn.exec_driver_sql(f'PRAGMA wal_checkpoint({mode})').first() or (0, 0, 0))
+    duration_ms = (time.perf_counter() - start) * 1000
+    busy, log_pages, checkpointed = result
+    with _wal_lock:
+        _wal_stats['passive' if mode == 'PASSIVE' else 'truncate'] += 1
+        _wal_stats['busy'] += 1 if busy else 0
+        _wal_stats['last_mode'] = mode
+        _wal_stats['last_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        _wal_stats['last_duration_ms'] = round(duration_ms, 2)
+        _wal_stats['max_duration_ms'] = max(_wal_stats['max_duration_ms'], round(duration_ms, 2))
+        _wal_stats['total_duration_ms'] = round(_wal_stats['total_duration_ms'] + duration_ms, 2)
+        _wal_stats['last_log_pages'] = log_pages
+        _wal_stats['last_checkpointed_pages'] = checkpointed
+        _wal_stats['wal_bytes'] = _wal_size()
+    return busy, log_pages, checkpointed
+
+
+def _wal_checkpoint_worker():
+    while True:
+        _wal_event.wait(WAL_CHECK_INTERVAL)
+        _wal_event.clear()
+        try:
+            size = _wal_size()
+            _wal_stats['wal_bytes'] = size
+            if not _wal_state['dirty'] and size == 0:
+                continue
+            idle = time.time() - _wal_state['last_write'] >= WAL_IDLE_SECONDS
+            if idle:
+                _wal_state['dirty'] = False
+                busy, log_pages, checkpointed = _run_wal_checkpoint('TRUNCATE')
+                if busy or checkpointed < log_pages:
+                    _wal_state['dirty'] = True
+                logger.debug(f"[MetaDB] 유휴 WAL 체크포인트(TRUNCATE): {size / 1048576:.1f}MB, {_wal_stats['last_duration_ms']}ms")
+            elif size >= WAL_PASSIVE_BYTES:
+                _run_wal_checkpoint('PASSIVE')
+                logger.debug(f"[MetaDB] WAL 체크포인트(PASSIVE): {size / 1048576:.1f}MB -> {_wal_stats['last_checkpointed_pages']}/{_wal_stats['last_log_pages']} pages, {_wal_stats['last_duration_ms']}ms")
+        except Exception as e:
+            logger.error(f"[MetaDB] WAL 체크포인트 스케줄러 오류: {e}")
 
 Base = declarative_base()
 Base.query = av_db_session.query_property()
 
 
+def _json_field_expr(path, template='{value}', default='NULL'):
+    """생성 컬럼용 json_extract 식. 올바른 JSON 이 아닌 행은 default 값을 가짐"""
+    value = f"json_extract(json_data, '$.{path}')"
+    return f"CASE WHEN json_valid(json_data) THEN {template.format(value=value)} ELSE {default} END"
+
+
+# 코드/제목/줄거리/배우/스튜디오/장르 전문 검색용 FTS5 섀도 테이블 (rowid = av_metadata_cache.id)
+FTS_TABLE = 'av_metadata_fts'
+FTS_COLUMNS = ['code', 'originaltitle', 'title', 'plot', 'actor', 'studio', 'genre']
+FTS_INSERT_SQL = (
+    f"INSERT INTO {FTS_TABLE} (rowid, category, {', '.join(FTS_COLUMNS)}) "
+    f"VALUES (:rowid, :category, {', '.join(':' + c for c in FTS_COLUMNS)})"
+)
+# 품번/제목 컬럼만 검색할 검색어 (영숫자 조각 + 숫자 포함, 예: abp-012, FC2-PPV-123456)
+FTS_CODE_COLUMNS = ['code', 'originaltitle', 'title']
+FTS_CODE_QUERY_RE = re.compile(r'^(?=.*\d)[A-Za-z0-9]+(?:[-_ ][A-Za-z0-9]+)*$')
+# _fts_enabled: FTS 테이블 존재 (쓰기 경로 동기화), _fts_ready: 기존 레코드 색인 완료 (조회 경로 사용). 색인 전까지 조회는 LIKE
+# _fts_stale_ids: 내용이 바뀌어 다시 색인할 행 (bulk_import 가 배치 중 FTS 갱신을 생략하고 백그라운드 색인에 넘김)
+_fts_enabled = False
+_fts_ready = False
+_fts_backfill_thread = None
+_fts_stale_ids = set()
+_fts_backfill_lock = threading.Lock()
+FTS_DELETE_IDS_SQL = text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(bindparam('ids', expanding=True))
+
+# json_data 압축 저장 모드. json_zip = 헤더(코덱 1바이트 + 사전 id 4바이트) + 압축 본문,
+# 이때 json_data 에는 생성 컬럼/인덱스가 참조하는 요약(stub)만 남긴다. 사전은 av_metadata_dict 테이블에 보관
+JSON_CODECS = {'zlib': 1, 'zstd': 2}
+JSON_ZIP_HEADER = struct.Struct('>BI')
+JSON_STUB_KEYS = ('code', 'ui_code', 'originaltitle', 'year', 'studio')
+JSON_DICT_SIZE = {'zlib': 32 * 1024, 'zstd': 112 * 1024}
+JSON_ZSTD_LEVEL = 10
+_json_codec = {'name': None, 'dict_id': 0}
+_json_dicts = {}
+_zstd_dicts = {}
+
+# web_list 요약 프로젝션 (json_data 를 읽지 않는 컬럼만 로드)
+LIST_PLOT_PREVIEW_LEN = 320
+LIST_SUMMARY_COLUMNS = [
+    'id', 'category', 'code', 'originaltitle', 'site', 'title', 'poster_url', 'created_time', 'updated_time',
+    'sort_key', 'year', 'has_plot', 'has_thumb', 'actor_count', 'plot_preview', 'list_year',
+]
+
+# web_list 전체 건수 캐시 (필터 조건 -> {'count', 'time', 'refreshing'})
+LIST_COUNT_CACHE_TTL = 60
+_list_count_cache = {}
+_list_count_lock = threading.Lock()
+
+# web_list 페이지 경계 키 캐시 (목록 조건 signature -> {'keys', 'time', 'refreshing'}). keys[i] = (i+1) 페이지 마지막 행의 (정렬 값, id).
+# 번호 페이지 이동은 OFFSET 대신 경계 키로 바로 탐색. 건수 캐시와 같이 TTL 이 지나거나 무효화되면 기존 값을 쓰면서 백그라운드에서 다시 계산
+LIST_ANCHOR_CACHE_SIZE = 16
+_list_anchor_cache = OrderedDict()
+
+# get_metadata 읽기 캐시 (code -> (저장 시각, json_data | None)). 반환 시 복사본을 주므로 호출부 수정은 캐시에 영향 없음.
+# ORM 커밋 시 변경된 품번은 자동 무효화되고, 원시 SQL 경로(bulk_import/clear_db)는 직접 무효화. 조회 중 무효화가 일어나면 generation 으로 저장 생략
+METADATA_CACHE_SIZE = 2000
+METADATA_CACHE_TTL = 600
+_meta_cache = OrderedDict()
+_meta_cache_lock = threading.Lock()
+_meta_cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'generation': 0}
+
+# 이미지 파일 정리 (clear_db / delete_record 공용). 파일 수가 IMAGE_DELETE_POOL_MIN 이상이면 스레드 풀로 삭제
+IMAGE_DELETE_WORKERS = 8
+IMAGE_DELETE_POOL_MIN = 16
+
+# 유저 포스터 크롭 작업 풀 (start_user_crop). 대기+실행 작업이 USER_CROP_MAX_PENDING 이상이면 거절, 완료 작업은 최근 USER_CROP_JOB_KEEP 건만 보관
+# _p_user / _pl_user 는 원본 해상도 그대로 저장하고, 목록 UI 용 썸네일(_p_user_thumb.jpg)만 USER_POSTER_THUMB_SIZE 이내로 축소
+USER_CROP_WORKERS = 2
+USER_CROP_MAX_PENDING = 8
+USER_CROP_JOB_KEEP = 50
+USER_POSTER_THUMB_SIZE = (240, 360)
+_crop_executor = None
+_crop_jobs = OrderedDict()
+_crop_lock = threading.Lock()
+
+# 모듈 info() 동시 요청 합치기 (single-flight). (모듈, 키) 가 처리 중이면 뒤따르는 요청은 첫 요청의 결과(복사본)를 기다려 공유.
+# INFO_FLIGHT_WAIT 초 안에 끝나지 않으면 직접 처리. 통계는 모듈별 calls / coalesced
+INFO_FLIGHT_WAIT = 300
+_info_flights = {}
+_info_flight_lock = threading.Lock()
+_info_flight_stats = {}
+
+# 이미지 파일 매니페스트 (av_image_file). 파일명 접미사로 aspect 판별: _p -> poster, _pl -> landscape, _art_N -> fanart
+# 유저 포스터 목록용 썸네일(_p_user_thumb) 은 유저 파일(is_user=1)이지만 크롭 소스 후보가 되지 않도록 별도 aspect (poster_thumb)
+IMAGE_FILE_RE = re.compile(r'^(?P<stem>.+?)_(?P<kind>pl|p|art_?\d+)(?P<user>_user(?P<thumb>_thumb)?)?\.(?P<ext>[a-z0-9]+)$', re.I)
+IMAGE_ASPECTS = {'p': 'poster', 'pl': 'landscape'}
+# 이전 버전이 aspect='other', is_user=0 으로 기록한 썸네일 행 보정 (migrate_db)
+IMAGE_USER_THUMB_FIX_SQL = (
+    "UPDATE av_image_file SET aspect = 'poster_thumb', is_user = 1 "
+    "WHERE aspect = 'other' AND lower(path) LIKE '%\\_p\\_user\\_thumb.%' ESCAPE '\\'"
+)
+IMAGE_MANIFEST_BATCH_SIZE = 2000
+IMAGE_MANIFEST_COLUMNS = ['category', 'code', 'aspect', 'path', 'size', 'mtime', 'is_user', 'updated_time']
+IMAGE_MANIFEST_UPSERT_SQL = (
+    f"INSERT INTO av_image_file ({', '.join(IMAGE_MANIFEST_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + c for c in IMAGE_MANIFEST_COLUMNS)}) "
+    f"ON CONFLICT(path) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in IMAGE_MANIFEST_COLUMNS if c != 'path')
+)
+
+# 모듈 search() 결과 캐시 (av_search_cache). 만료 행은 저장 시 SEARCH_CACHE_PURGE_INTERVAL 마다 정리, 적중 통계는 메모리
+SEARCH_CACHE_COLUMNS = ['module', 'cache_key', 'manual', 'fingerprint', 'result_count', 'results', 'expires_time', 'created_time']
+SEARCH_CACHE_UPSERT_SQL = (
+    f"INSERT INTO av_search_cache ({', '.join(SEARCH_CACHE_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + c for c in SEARCH_CACHE_COLUMNS)}) "
+    f"ON CONFLICT(module, cache_key, manual) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in SEARCH_CACHE_COLUMNS if c not in ('module', 'cache_key', 'manual'))
+)
+SEARCH_CACHE_PURGE_INTERVAL = 3600
+_search_cache_last_purge = 0
+_search_cache_stats = {}
+_search_cache_stats_lock = threading.Lock()
+
+# 레이블 -> 사이트 검색 경로 학습 (av_label_route). (모듈, 레이블, 사이트) 별 조회/100점/채택 횟수와 응답 시간 누적
+LABEL_ROUTE_UPSERT_SQL = (
+    "INSERT INTO av_label_route (module, label, site, attempts, hits, accepts, latency_total, last_hit_time, updated_time) "
+    "VALUES (:module, :label, :site, 1, :hit, :accept, :latency, :last_hit_time, :updated_time) "
+    "ON CONFLICT(module, label, site) DO UPDATE SET "
+    "attempts = attempts + 1, hits = hits + excluded.hits, accepts = accepts + excluded.accepts, "
+    "latency_total = latency_total + excluded.latency_total, "
+    "last_hit_time = COALESCE(excluded.last_hit_time, last_hit_time), updated_time = excluded.updated_time"
+)
+LABEL_ROUTE_TABLE_LIMIT = 2000
+# 제외된 사이트라도 마지막 조회 후 LABEL_ROUTE_REPROBE_DAYS 일이 지나면 한 번 다시 조회 (일시 장애로 쌓인 제외가 풀리도록)
+LABEL_ROUTE_REPROBE_DAYS = 7
+
+# 번역 메모리 (av_trans_memory). (엔진, 원문 언어, 대상 언어, sha1(원문)) -> 번역문. 행 수가 TRANS_MEMORY_MAX_ROWS 를 넘으면
+# 최근 사용 시각이 오래된 순으로 정리(LRU, 점검은 TRANS_MEMORY_EVICT_INTERVAL 마다). 적중 시 최근 사용 시각은 TRANS_MEMORY_TOUCH_INTERVAL 이 지난 행만
+# _trans_memory_touch 에 모아 두었다가 다음 store() 트랜잭션에서 갱신 (조회 경로는 쓰기/커밋 없음). 조회/저장은 호출부 세션과 별도 연결 사용
+TRANS_MEMORY_MAX_ROWS = 200000
+TRANS_MEMORY_EVICT_INTERVAL = 600
+TRANS_MEMORY_TOUCH_INTERVAL = 86400
+TRANS_MEMORY_UPSERT_SQL = (
+    "INSERT INTO av_trans_memory (engine, source_lang, target_lang, text_hash, source_text, translated, last_used_time, created_time) "
+    "VALUES (:engine, :source_lang, :target_lang, :text_hash, :source_text, :translated, :last_used_time, :created_time) "
+    "ON CONFLICT(engine, source_lang, target_lang, text_hash) DO UPDATE SET "
+    "source_text = excluded.source_text, translated = excluded.translated, last_used_time = excluded.last_used_time"
+)
+TRANS_MEMORY_EVICT_SQL = (
+    "DELETE FROM av_trans_memory WHERE id IN "
+    "(SELECT id FROM av_trans_memory ORDER BY last_used_time, id LIMIT :limit)"
+)
+TRANS_MEMORY_TOUCH_SQL = text("UPDATE av_trans_memory SET last_used_time = :now WHERE id IN :ids").bindparams(bindparam('ids', expanding=True))
+_trans_memory_last_evict = 0
+_trans_memory_touch = set()
+_trans_memory_stats = {}
+_trans_memory_lock = threading.Lock()
+
+# save_metadata write-behind 큐 (code -> (category, entity_dict)). 같은 품번은 최신 값으로 병합되고
+# 전용 스레드가 WRITE_BEHIND_INTERVAL 마다 한 트랜잭션으로 그룹 커밋. 커밋 중인 항목은 _write_inflight 에 보관
+WRITE_BEHIND_INTERVAL = 1.0
+WRITE_BEHIND_MAX_BATCH = 500
+_write_queue = {}
+_write_inflight = {}
+_write_lock = threading.Lock()
+_write_flush_lock = threading.Lock()
+_write_event = threading.Event()
+_write_thread = None
+_write_stats = {'enqueued': 0, 'coalesced': 0, 'written': 0, 'failed': 0, 'commits': 0, 'last_batch': 0, 'last_flush': ''}
+
+# db_import 일괄 병합 설정 (배치 단위 커밋, IN 절 청크 크기, 기존 값 보존 키)
+IMPORT_BATCH_SIZE = 2000
+IMPORT_IN_CHUNK_SIZE = 500
+IMPORT_PRESERVE_KEYS = ('thumb', 'fanart', 'extras')
+IMPORT_UPSERT_COLUMNS = [
+    'category', 'code', 'originaltitle', 'site', 'title', 'poster_url', 'json_data',
+    'created_time', 'updated_time', 'sort_key', 'code_norm', 'code_label', 'code_number', 'json_zip',
+    'has_thumb', 'actor_count', 'plot_preview', 'list_year',
+]
+# NDJSON 공유 파일 확장자 (gzip/zstd 압축은 확장자로 판별, zstd 는 zstandard 패키지 필요)
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl', '.ndjson.gz', '.jsonl.gz', '.ndjson.zst', '.jsonl.zst')
+EXPORT_EXTENSIONS = {'db': '.db', 'gzip': '.ndjson.gz', 'zstd': '.ndjson.zst'}
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ['category', 'code', 'originaltitle', 'site', 'title', 'poster_url', 'json_data', 'created_time', 'updated_time']
+EXPORT_TABLE_SQL = '''CREATE TABLE av_metadata_cache (
+    id INTEGER PRIMARY KEY,
+    category VARCHAR(20) NOT NULL,
+    code VARCHAR(100) NOT NULL,
+    originaltitle VARCHAR(255) NOT NULL,
+    site VARCHAR(50) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    poster_url VARCHAR(500),
+    json_data JSON NOT NULL,
+    created_time DATETIME,
+    updated_time DATETIME
+)'''
+# 기존 행은 category/created_time 을 유지하고 나머지만 갱신
+IMPORT_UPSERT_SQL = (
+    f"INSERT INTO av_metadata_cache ({', '.join(IMPORT_UPSERT_COLUMNS)}) "
+    f"VALUES ({', '.join(':' + c for c in IMPORT_UPSERT_COLUMNS)}) "
+    f"ON CONFLICT(code) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in IMPORT_UPSERT_COLUMNS if c not in ('category', 'code', 'created_time'))
+)
+
+
 class ModelAvMetadata(Base):
     __tablename__ = 'av_metadata_cache'
+    __table_args__ = (
+        Index('ix_av_metadata_cache_category_sort_key', 'category', 'sort_key', 'id'),
+        Index('ix_av_metadata_cache_category_code_norm', 'category', 'code_norm'),
+        Index('ix_av_metadata_cache_category_label_number', 'category', 'code_label', 'code_number'),
+        Index('ix_av_metadata_cache_category_created_time', 'category', 'created_time', 'id'),
+        Index('ix_av_metadata_cache_category_has_plot', 'category', 'has_plot', 'created_time', 'id'),
+        Index('ix_av_metadata_cache_oshash', 'oshash'),
+        Index('ix_av_metadata_cache_phash', 'phash'),
+        Index('ix_av_metadata_cache_ui_code', 'ui_code'),
+        Index('ix_av_metadata_cache_category_year', 'category', 'year'),
+        Index('ix_av_metadata_cache_category_studio', 'category', 'studio'),
+        Index('ix_av_metadata_cache_poster_file', 'poster_file'),
+    )
 
     id = Column(Integer, primary_key=True)
     category = Column(String(20), nullable=False, index=True)
@@ -53,18 +436,138 @@ class ModelAvMetadata(Base):
     json_data = Column(JSON, nullable=False)
     created_time = Column(DateTime, default=datetime.now)
     updated_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # 품번순 정렬용 자연 정렬 키 (레이블 소문자 + 숫자 0 패딩, 예: abp-0000000123)
+    sort_key = Column(String(255))
+    # DB 선행 검색용 정규화 품번 (영숫자 소문자) 및 파싱된 레이블/넘버 (넘버는 앞자리 0 제거)
+    code_norm = Column(String(100))
+    code_label = Column(String(50))
+    code_number = Column(String(30))
+    # 압축 저장 모드에서의 json_data 원본 (NULL 이면 json_data 가 원본 JSON)
+    json_zip = Column(LargeBinary)
+    # web_list 요약 프로젝션용 사전 계산 값 (json_data 변경 시 flush 이벤트에서 갱신)
+    has_thumb = Column(Integer)
+    actor_count = Column(Integer)
+    plot_preview = Column(String(LIST_PLOT_PREVIEW_LEN))
+    # 목록 표시 연도: year, 없으면 premiered 앞 4자리 (압축 행의 json_data 요약에는 premiered 가 없어 저장). 없으면 0
+    list_year = Column(Integer)
+
+    # json_data 에서 파생되는 가상 생성 컬럼 (저장 공간 없이 인덱스로만 유지, json_extract 전체 스캔 방지)
+    has_plot = Column(Integer, Computed(_json_field_expr('plot', "CASE WHEN coalesce({value}, '') != '' THEN 1 ELSE 0 END", default='0'), persisted=False))
+    oshash = Column(String(64), Computed(_json_field_expr('extra_info.oshash'), persisted=False))
+    phash = Column(String(64), Computed(_json_field_expr('extra_info.phash'), persisted=False))
+    ui_code = Column(String(100), Computed(_json_field_expr('ui_code'), persisted=False))
+    year = Column(Integer, Computed(_json_field_expr('year', "CAST({value} AS INTEGER)"), persisted=False))
+    studio = Column(String(255), Computed(_json_field_expr('studio'), persisted=False))
+    # poster_url 의 파일명 (소문자). rtrim 으로 마지막 '/' 까지의 접두사를 구해 잘라냄 (유저 이미지 API 의 파일명 역조회용)
+    poster_file = Column(String(255), Computed("lower(substr(poster_url, length(rtrim(poster_url, replace(poster_url, '/', ''))) + 1))", persisted=False))
 
 
     def __init__(self, category, code, originaltitle, site, title, poster_url, json_data):
         self.category = category
         self.code = code
         self.originaltitle = originaltitle
+        self.update_code_columns()
         self.site = site
         self.title = title
         self.poster_url = poster_url
         self.json_data = json_data
 
 
+    def update_code_columns(self):
+        """originaltitle 로부터 정렬/검색용 파생 컬럼 갱신. originaltitle 변경 시마다 호출"""
+        for key, value in self.code_columns(self.category, self.originaltitle or self.code).items():
+            setattr(self, key, value)
+
+
+    @classmethod
+    def code_columns(cls, category, value):
+        code_label, code_number = cls.parse_code_parts(category, value)
+        return {
+            'sort_key': cls.make_sort_key(value),
+            'code_norm': cls.normalize_code(value),
+            'code_label': code_label,
+            'code_number': code_number,
+        }
+
+
+    @staticmethod
+    def normalize_code(value):
+        return re.sub(r'[^a-zA-Z0-9]', '', str(value or '')).lower()[:100]
+
+
+    @staticmethod
+    def parse_code_parts(category, value):
+        """
+        품번을 (레이블, 넘버) 로 분해. CEN 은 _parse_ui_code, UNCEN 은 _parse_ui_code_uncensored 결과 기준.
+        레이블은 숫자 접두사(300MIUM -> mium)를 뗀 영문 소문자, 넘버는 앞자리 0 을 제거한 값.
+        """
+        if not value or category == 'WEST':
+            return '', ''
+        ui_code = str(value)
+        try:
+            from support_site import SiteAvBase
+            if category == 'CEN':
+                ui_code = SiteAvBase._parse_ui_code(ui_code)[0] or ui_code
+            else:
+                ui_code = SiteAvBase._parse_ui_code_uncensored(ui_code) or ui_code
+        except Exception:
+            pass
+        match = re.match(r'^\d*([a-zA-Z]*)[^a-zA-Z0-9]*(\d+)', str(ui_code))
+        if not match:
+            return '', ''
+        return match.group(1).lower()[:50], (match.group(2).lstrip('0') or '0')[:30]
+
+
+    @staticmethod
+    def make_sort_key(value):
+        """web_list 의 기존 natural sort 와 동일한 순서를 내는 문자열 정렬 키"""
+        if not value:
+            return ''
+        return re.sub(r'\d+', lambda m: m.group().lstrip('0').zfill(10), str(value).lower())[:255]
+
+
+    @staticmethod
+    def summary_columns(data):
+        data = data if isinstance(data, dict) else {}
+        return {
+            'has_thumb': 1 if data.get('thumb') else 0,
+            'actor_count': len(data.get('actor') or []),
+            'plot_preview': str(data.get('plot') or '')[:LIST_PLOT_PREVIEW_LEN],
+            'list_year': ModelAvMetadata.list_year_of(data),
+        }
+
+
+    @staticmethod
+    def list_year_of(data):
+        for value in (data.get('year'), str(data.get('premiered') or '')[:4]):
+            try:
+                if int(value):
+                    return int(value)
+            except (TypeError, ValueError):
+                pass
+        return 0
+
+
+    def as_summary_dict(self):
+        """web_list 용 요약 (json_data 제외). 상세는 get_detail 로 개별 조회"""
+        return {
+            'id': self.id,
+            'category': self.category,
+            'code': self.code,
+            'originaltitle': self.originaltitle,
+            'site': self.site,
+            'title': self.title,
+            'poster_url': self.poster_url,
+            'created_time': self.created_time.strftime('%Y-%m-%d %H:%M:%S') if self.created_time else '',
+            'updated_time': self.updated_time.strftime('%Y-%m-%d %H:%M:%S') if self.updated_time else '',
+            'year': self.list_year if self.list_year is not None else self.year,
+            'has_plot': bool(self.has_plot),
+            'has_thumb': bool(self.has_thumb),
+            'actor_count': self.actor_count or 0,
+            'plot_preview': self.plot_preview or '',
+        }
+
+
     def as_dict(self):
         return {
             'id': self.id,
@@ -81,63 +584,232 @@ class ModelAvMetadata(Base):
 
 
     @classmethod
-    def save_metadata(cls, category, entity_dict):
+    def save_metadata(cls, category, entity_dict, defer=False):
+        """
+        메타데이터 저장. defer=True 면 write-behind 큐에 넣고 즉시 반환 (커밋은 백그라운드 스레드가 묶어서 처리)
+        """
+        code = entity_dict.get('code') if entity_dict else None
+        if not code:
+            logger.warning("[MetaDB] save_metadata: 'code' 필드가 없어 저장할 수 없습니다.")
+            return False
+        if defer:
+            return cls.enqueue_metadata(category, entity_dict)
         try:
-            code = entity_dict.get('code')
-            if not code:
-                logger.warning("[MetaDB] save_metadata: 'code' 필드가 없어 저장할 수 없습니다.")
-                return False
-
-            originaltitle = entity_dict.get('originaltitle', '') or code
-            site = entity_dict.get('site', 'unknown')
-            title = entity_dict.get('title', '')
-
-            poster_url = ""
-            for thumb in entity_dict.get('thumb', []):
-                if isinstance(thumb, dict) and thumb.get('aspect') == 'poster':
-                    poster_url = thumb.get('value', '')
-                    break
-
-            record = av_db_session.query(cls).filter_by(code=code).first()
-            if record:
-                record.originaltitle = originaltitle
-                record.site = site
-                record.title = title
-                record.poster_url = poster_url
-                record.json_data = copy.deepcopy(entity_dict)
-                flag_modified(record, "json_data")
-                record.updated_time = datetime.now()
-                logger.info(f"[MetaDB] 레코드 업데이트 완료: [{category}] {code} ({originaltitle})")
-            else:
-                record = cls(
-                    category=category,
-                    code=code,
-                    originaltitle=originaltitle,
-                    site=site,
-                    title=title,
-                    poster_url=poster_url,
-                    json_data=copy.deepcopy(entity_dict)
-                )
-                av_db_session.add(record)
-                logger.info(f"[MetaDB] 신규 레코드 저장 완료: [{category}] {code} ({originaltitle})")
-
+            cls.flush_write_behind()
+            cls._write_metadata(category, copy.deepcopy(entity_dict))
             av_db_session.commit()
+            cls.invalidate_list_count()
             return True
         except Exception as e:
-            logger.error(f"[MetaDB] save_metadata 실패 ({entity_dict.get('code')}): {e}")
+            logger.error(f"[MetaDB] save_metadata 실패 ({code}): {e}")
             logger.error(traceback.format_exc())
             av_db_session.rollback()
             return False
 
 
+    @classmethod
+    def _write_metadata(cls, category, entity_dict):
+        """save_metadata 본체. 호출부 트랜잭션 안에서 upsert + FTS 갱신까지 수행 (커밋은 호출부 책임, entity_dict 는 복사본)"""
+        code = entity_dict.get('code')
+        originaltitle = entity_dict.get('originaltitle', '') or code
+        site = entity_dict.get('site', 'unknown')
+        title = entity_dict.get('title', '')
+
+        poster_url = ""
+        for thumb in entity_dict.get('thumb', []):
+            if isinstance(thumb, dict) and thumb.get('aspect') == 'poster':
+                poster_url = thumb.get('value', '')
+                break
+
+        record = av_db_session.query(cls).filter_by(code=code).first()
+        if record:
+            record.originaltitle = originaltitle
+            record.update_code_columns()
+            record.site = site
+            record.title = title
+            record.poster_url = poster_url
+            record.json_data = entity_dict
+            flag_modified(record, "json_data")
+            record.updated_time = datetime.now()
+            logger.info(f"[MetaDB] 레코드 업데이트 완료: [{category}] {code} ({originaltitle})")
+        else:
+            record = cls(
+                category=category,
+                code=code,
+                originaltitle=originaltitle,
+                site=site,
+                title=title,
+                poster_url=poster_url,
+                json_data=entity_dict
+            )
+            av_db_session.add(record)
+            logger.info(f"[MetaDB] 신규 레코드 저장 완료: [{category}] {code} ({originaltitle})")
+
+        av_db_session.flush()
+        cls._fts_sync(record)
+        cls._manifest_sync(record)
+        return record
+
+
+    @classmethod
+    def _manifest_sync(cls, record):
+        """레코드가 가리키는 이미지 서버 파일(포스터/랜드스케이프/팬아트)을 매니페스트에 기록 (알려진 경로만 stat)"""
+        try:
+            config = cls._image_cleanup_config(record.category)
+            if not config or not config['server_url']:
+                return
+            jd = record.json_data if isinstance(record.json_data, dict) else {}
+            urls = [record.poster_url]
+            urls += [t.get('value') for t in (jd.get('thumb') or []) if isinstance(t, dict)]
+            urls += [u for u in (jd.get('fanart') or []) if isinstance(u, str)]
+            paths = {ModelAvImageFile.url_to_path(u, config) for u in urls}
+            ModelAvImageFile.record_files(record.category, record.code, [x for x in paths if x])
+        except Exception as e:
+            logger.debug(f"[MetaDB] 이미지 매니페스트 기록 실패 ({record.code}): {e}")
+
+
+    @classmethod
+    def enqueue_metadata(cls, category, entity_dict):
+        """write-behind 큐 등록. 같은 품번이 이미 대기 중이면 최신 값으로 교체 (병합)"""
+        global _write_thread
+        code = entity_dict.get('code')
+        data = copy.deepcopy(entity_dict)
+        with _write_lock:
+            if code in _write_queue:
+                _write_stats['coalesced'] += 1
+            _write_queue[code] = (category, data)
+            _write_stats['enqueued'] += 1
+            if _write_thread is None or not _write_thread.is_alive():
+                _write_thread = threading.Thread(target=_write_behind_worker, name='MetaDBWriteBehind')
+                _write_thread.daemon = True
+                _write_thread.start()
+        _write_event.set()
+        return True
+
+
+    @classmethod
+    def _pending_metadata(cls, code):
+        """아직 커밋되지 않은 write-behind 항목 (없으면 None)"""
+        with _write_lock:
+            item = _write_queue.get(code) or _write_inflight.get(code)
+        return item
+
+
+    @classmethod
+    def flush_write_behind(cls):
+        """
+        대기 중인 write-behind 항목을 WRITE_BEHIND_MAX_BATCH 단위 트랜잭션으로 커밋.
+        배치 커밋이 실패하면 롤백 후 해당 배치만 한 건씩 재시도한다. 반환: 기록 건수.
+        호출부 세션이 이미 쓰기 중이면 그 트랜잭션 안에서 기록만 하고 커밋은 호출부에 맡김
+        """
+        session = av_db_session()
+        if session.info.get('av_writer') or session.new or session.dirty or session.deleted:
+            return cls._flush_write_behind_in_transaction(session)
+        written = 0
+        with _write_flush_lock:
+            while True:
+                with _write_lock:
+                    if not _write_queue:
+                        break
+                    codes = list(_write_queue)[:WRITE_BEHIND_MAX_BATCH]
+                    batch = {code: _write_queue.pop(code) for code in codes}
+                    _write_inflight.update(batch)
+                try:
+                    try:
+                        for category, data in batch.values():
+                            cls._write_metadata(category, data)
+                        av_db_session.commit()
+                        count, failed = len(batch), 0
+                    except Exception as e:
+                        logger.warning(f"[MetaDB] write-behind 그룹 커밋 실패, 개별 재시도 ({len(batch)}건): {e}")
+                        av_db_session.rollback()
+                        count, failed = 0, 0
+                        for code, (category, data) in batch.items():
+                            try:
+                                cls._write_metadata(category, data)
+                                av_db_session.commit()
+                                count += 1
+                            except Exception as e_item:
+                                logger.error(f"[MetaDB] write-behind 저장 실패 ({code}): {e_item}")
+                                av_db_session.rollback()
+                                failed += 1
+                finally:
+                    _release_write_inflight(batch)
+                written += count
+                with _write_lock:
+                    _write_stats['written'] += count
+                    _write_stats['failed'] += failed
+                    _write_stats['commits'] += 1
+                    _write_stats['last_batch'] = len(batch)
+                    _write_stats['last_flush'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                if count:
+                    cls.invalidate_list_count()
+        if written:
+            logger.debug(f"[MetaDB] write-behind 플러시 완료: {written}건")
+        return written
+
+
+    @classmethod
+    def _flush_write_behind_in_transaction(cls, session):
+        """
+        호출부 쓰기 트랜잭션에 대기 항목을 실어 기록 (같은 연결이므로 쓰기 락 대기/교착 없음).
+        호출부가 커밋하면 확정되고, 롤백하면 after_rollback 에서 다시 대기열로 돌아감
+        """
+        with _write_lock:
+            if not _write_queue:
+                return 0
+            batch = dict(_write_queue)
+            _write_queue.clear()
+            _write_inflight.update(batch)
+        session.info.setdefault('av_write_behind_pending', {}).update(batch)
+        for category, data in batch.values():
+            cls._write_metadata(category, data)
+        with _write_lock:
+            _write_stats['written'] += len(batch)
+            _write_stats['last_batch'] = len(batch)
+        logger.debug(f"[MetaDB] write-behind 플러시 (호출부 트랜잭션): {len(batch)}건")
+        return len(batch)
+
+
+    @classmethod
+    def get_write_behind_status(cls):
+        with _write_lock:
+            status = dict(_write_stats)
+            status['depth'] = len(_write_queue)
+            status['inflight'] = len(_write_inflight)
+        status['is_running'] = _write_thread is not None and _write_thread.is_alive()
+        return status
+
+
     @classmethod
     def get_metadata(cls, code):
         try:
+            pending = cls._pending_metadata(code)
+            if pending:
+                logger.debug(f"[MetaDB] get_metadata write-behind 대기 항목 반환: {code} [{pending[0]}]")
+                return copy.deepcopy(pending[1])
+            now = time.time()
+            with _meta_cache_lock:
+                entry = _meta_cache.get(code)
+                if entry is not None and now - entry[0] <= METADATA_CACHE_TTL:
+                    _meta_cache.move_to_end(code)
+                    _meta_cache_stats['hits'] += 1
+                    return copy.deepcopy(entry[1])
+                _meta_cache_stats['misses'] += 1
+                generation = _meta_cache_stats['generation']
+
             # logger.debug(f"[MetaDB] get_metadata 조회 시도: {code}")
             record = av_db_session.query(cls).filter_by(code=code).first()
+            data = copy.deepcopy(record.json_data) if record else None
+            with _meta_cache_lock:
+                if generation == _meta_cache_stats['generation']:
+                    _meta_cache[code] = (now, data)
+                    _meta_cache.move_to_end(code)
+                    while len(_meta_cache) > METADATA_CACHE_SIZE:
+                        _meta_cache.popitem(last=False)
             if record:
                 logger.debug(f"[MetaDB] get_metadata 캐시 히트: {code} [{record.category}]")
-                return record.json_data
+                return copy.deepcopy(data)
             logger.debug(f"[MetaDB] get_metadata 캐시 미스: {code}")
         except Exception as e:
             logger.error(f"[MetaDB] get_metadata 에러 ({code}): {e}")
@@ -146,11 +818,257 @@ class ModelAvMetadata(Base):
 
 
     @classmethod
-    def web_list(cls, req, category=None):
-        import re
-        from sqlalchemy.orm import load_only
-        import math
+    def invalidate_metadata_cache(cls, codes=None):
+        """get_metadata 캐시 무효화. codes 가 None 이면 전체"""
+        with _meta_cache_lock:
+            if codes is None:
+                _meta_cache.clear()
+            else:
+                for code in codes:
+                    _meta_cache.pop(code, None)
+            _meta_cache_stats['invalidations'] += 1
+            _meta_cache_stats['generation'] += 1
+
+
+    @classmethod
+    def get_metadata_cache_status(cls):
+        with _meta_cache_lock:
+            status = dict(_meta_cache_stats)
+            status['size'] = len(_meta_cache)
+        lookups = status['hits'] + status['misses']
+        status['hit_rate'] = round(status['hits'] / lookups * 100, 1) if lookups else 0.0
+        return status
+
+
+    @classmethod
+    def run_info_single_flight(cls, module, key, func):
+        """
+        같은 (module, key) 의 info() 가 이미 처리 중이면 그 결과를 기다려 복사본을 반환하고, 아니면 func() 를 실행.
+        중복 사이트 요청/번역/배우 처리/DB 저장을 막기 위한 것으로, 예외도 대기 중인 요청에 그대로 전달
+        """
+        flight_key = (module, key)
+        with _info_flight_lock:
+            stats = _info_flight_stats.setdefault(module, {'calls': 0, 'coalesced': 0, 'wait_timeouts': 0})
+            stats['calls'] += 1
+            flight = _info_flights.get(flight_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _info_flights[flight_key] = {'event': threading.Event(), 'result': None, 'error': None, 'waiters': 0}
+            else:
+                flight['waiters'] += 1
+                stats['coalesced'] += 1
+
+        if not is_leader:
+            if flight['event'].wait(INFO_FLIGHT_WAIT):
+                if flight['error'] is not None:
+                    raise flight['error']
+                return copy.deepcopy(flight['result'])
+            with _info_flight_lock:
+                stats['wait_timeouts'] += 1
+            logger.warning(f"[MetaDB] info 대기 시간 초과 -> 직접 처리: {module} {key}")
+            return func()
+
+        result = None
+        try:
+            result = func()
+            return result
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            # 등록 해제 후에는 새 대기자가 없으므로, 대기자가 있을 때만 호출부가 수정하기 전의 복사본을 넘김
+            with _info_flight_lock:
+                _info_flights.pop(flight_key, None)
+                waiters = flight['waiters']
+            if waiters and result is not None:
+                flight['result'] = copy.deepcopy(result)
+            flight['event'].set()
+
+
+    @classmethod
+    def get_info_flight_status(cls, module):
+        with _info_flight_lock:
+            status = dict(_info_flight_stats.get(module) or {'calls': 0, 'coalesced': 0, 'wait_timeouts': 0})
+            status['in_flight'] = sum(1 for flight_module, _ in _info_flights if flight_module == module)
+        status['dedup_ratio'] = round(status['coalesced'] / status['calls'] * 100, 1) if status['calls'] else 0.0
+        return status
+
+
+    @classmethod
+    def get_detail(cls, code):
+        """DB 편집기용 단건 상세 (json_data 포함)"""
+        try:
+            cls.flush_write_behind()
+            record = av_db_session.query(cls).filter_by(code=code).first()
+            return record.as_dict() if record else None
+        except Exception as e:
+            logger.error(f"[MetaDB] get_detail 에러 ({code}): {e}")
+            logger.error(traceback.format_exc())
+        return None
+
+
+    @classmethod
+    def _build_list_query(cls, category, search_site='all', search_status='all', search_word=''):
+        query = av_db_session.query(cls).filter_by(category=category)
+
+        # 사이트 필터
+        if search_site != 'all':
+            query = query.filter_by(site=search_site)
+
+        # 상태별 필터
+        if search_status == 'no_poster':
+            query = query.filter(or_(
+                cls.poster_url == '',
+                cls.poster_url == None,
+                cls.poster_url.like('%_pl.jpg'),
+                cls.poster_url.like('%_pl.png'),
+                cls.poster_url.like('%_pl.webp')
+            ))
+        elif search_status == 'no_plot':
+            query = query.filter(cls.has_plot == 0)
+        elif search_status == 'complete':
+            query = query.filter(
+                cls.poster_url != '',
+                cls.poster_url != None,
+                cls.has_plot == 1
+            )
+
+        # 검색어 필터 (FTS 인덱스 우선, 3글자 미만 검색어 등 FTS 로 처리할 수 없으면 LIKE 폴백).
+        # 품번 형태 검색어는 기존 LIKE 검색과 같이 품번/제목 컬럼만 대상으로 함 (줄거리/장르의 부분 일치 제외)
+        if search_word:
+            columns = FTS_CODE_COLUMNS if FTS_CODE_QUERY_RE.match(search_word.strip()) else None
+            match_expr, is_exact = cls._fts_match_expr(search_word, columns=columns)
+            if match_expr:
+                query = query.filter(text(
+                    f"av_metadata_cache.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_match)"
+                ).bindparams(fts_match=match_expr))
+            if not is_exact:
+                search_like = f"%{search_word.replace('-', '%')}%"
+                query = query.filter(or_(
+                    cls.originaltitle.ilike(search_like),
+                    cls.code.ilike(search_like),
+                    cls.title.ilike(f'%{search_word}%')
+                ))
+        return query
+
+
+    @classmethod
+    def _get_list_count(cls, filters):
+        """
+        목록 전체 건수를 캐시에서 반환. TTL 이 지난 값은 그대로 반환하면서 백그라운드에서 갱신.
+        반환: (count, is_approx)
+        """
+        now = time.time()
+        with _list_count_lock:
+            entry = _list_count_cache.get(filters)
+            if entry is not None:
+                is_stale = (now - entry['time']) > LIST_COUNT_CACHE_TTL
+                if is_stale and not entry['refreshing']:
+                    entry['refreshing'] = True
+                    t = threading.Thread(target=cls._refresh_list_count, args=(filters,))
+                    t.daemon = True
+                    t.start()
+                return entry['count'], is_stale
+
+        count = cls._build_list_query(*filters).count()
+        with _list_count_lock:
+            if len(_list_count_cache) >= 256:
+                _list_count_cache.clear()
+            _list_count_cache[filters] = {'count': count, 'time': now, 'refreshing': False}
+        return count, False
+
+
+    @classmethod
+    def _refresh_list_count(cls, filters):
+        try:
+            count = cls._build_list_query(*filters).count()
+            with _list_count_lock:
+                _list_count_cache[filters] = {'count': count, 'time': time.time(), 'refreshing': False}
+        except Exception as e:
+            logger.error(f"[MetaDB] 목록 건수 백그라운드 갱신 실패 {filters}: {e}")
+            with _list_count_lock:
+                entry = _list_count_cache.get(filters)
+                if entry: entry['refreshing'] = False
+        finally:
+            av_db_session.remove()
+
+
+    @classmethod
+    def invalidate_list_count(cls):
+        """레코드 추가/삭제 후 호출. 다음 목록 요청 시 백그라운드에서 건수/페이지 경계 키를 다시 계산"""
+        with _list_count_lock:
+            for entry in _list_count_cache.values():
+                entry['time'] = 0
+            for entry in _list_anchor_cache.values():
+                entry['time'] = 0
+
+
+    @classmethod
+    def _get_list_anchor(cls, signature, filters, sort_attr, descending, page_size, page):
+        """
+        page 직전 페이지의 마지막 키 (정렬 값, id). 경계 키가 아직 없거나 범위를 벗어나면 None (호출부 OFFSET 폴백).
+        캐시가 없거나 오래되었으면 백그라운드에서 계산 (건수 계산과 같은 정렬 인덱스 1회 스캔)
+        """
+        now = time.time()
+        with _list_count_lock:
+            entry = _list_anchor_cache.get(signature)
+            if entry is None:
+                entry = _list_anchor_cache[signature] = {'keys': None, 'time': 0, 'refreshing': False}
+                while len(_list_anchor_cache) > LIST_ANCHOR_CACHE_SIZE:
+                    _list_anchor_cache.popitem(last=False)
+            else:
+                _list_anchor_cache.move_to_end(signature)
+            if (now - entry['time']) > LIST_COUNT_CACHE_TTL and not entry['refreshing']:
+                entry['refreshing'] = True
+                t = threading.Thread(target=cls._refresh_list_anchors, args=(signature, filters, sort_attr, descending, page_size))
+                t.daemon = True
+                t.start()
+            keys = entry['keys']
+        if keys and 0 <= page - 2 < len(keys):
+            return keys[page - 2]
+        return None
+
+
+    @classmethod
+    def _refresh_list_anchors(cls, signature, filters, sort_attr, descending, page_size):
+        try:
+            sort_col = getattr(cls, sort_attr)
+            order = (sort_col.desc(), cls.id.desc()) if descending else (sort_col.asc(), cls.id.asc())
+            numbered = cls._build_list_query(*filters).with_entities(
+                sort_col.label('key_value'), cls.id.label('key_id'), func.row_number().over(order_by=order).label('rn')
+            ).subquery()
+            rows = av_db_session.query(numbered.c.key_value, numbered.c.key_id).filter(numbered.c.rn % page_size == 0).order_by(numbered.c.rn).all()
+            # 정렬 값이 NULL 인 경계는 keyset 비교를 할 수 없으므로 None (해당 페이지는 OFFSET)
+            keys = [(r.key_value, r.key_id) if r.key_value is not None else None for r in rows]
+            with _list_count_lock:
+                entry = _list_anchor_cache.get(signature)
+                if entry is not None:
+                    entry.update(keys=keys, time=time.time(), refreshing=False)
+        except Exception as e:
+            logger.error(f"[MetaDB] 목록 페이지 경계 키 계산 실패: {e}")
+            with _list_count_lock:
+                entry = _list_anchor_cache.get(signature)
+                if entry: entry['refreshing'] = False
+        finally:
+            av_db_session.remove()
+
+
+    @staticmethod
+    def _encode_cursor(signature, page, direction, key):
+        raw = json.dumps({'s': signature, 'p': page, 'd': direction, 'k': key})
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
 
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except Exception:
+            return None
+
+
+    @classmethod
+    def web_list(cls, req, category=None, url_mappings=None):
         try:
             if not category:
                 path = req.path.lower()
@@ -164,88 +1082,85 @@ class ModelAvMetadata(Base):
             search_order = req.form.get('search_order', 'desc')
             search_status = req.form.get('search_status', 'all')
             page_size = int(req.form.get('page_size', 10))
+            cursor = req.form.get('cursor', '').strip()
 
             # logger.debug(f"[MetaDB] web_list 요청: [{category}] page={page}, size={page_size}, site={search_site}, status={search_status}, order={search_order}, word='{search_word}'")
 
-            query = av_db_session.query(cls).filter_by(category=category)
-
-            # 사이트 필터
-            if search_site != 'all':
-                query = query.filter_by(site=search_site)
-
-            # 상태별 필터
-            if search_status == 'no_poster':
-                query = query.filter(or_(
-                    cls.poster_url == '',
-                    cls.poster_url == None,
-                    cls.poster_url.like('%_pl.jpg'),
-                    cls.poster_url.like('%_pl.png'),
-                    cls.poster_url.like('%_pl.webp')
-                ))
-            elif search_status == 'no_plot':
-                query = query.filter(or_(
-                    func.json_extract(cls.json_data, '$.plot') == '',
-                    func.json_extract(cls.json_data, '$.plot') == None
-                ))
-            elif search_status == 'complete':
-                query = query.filter(
-                    cls.poster_url != '',
-                    cls.poster_url != None,
-                    func.json_extract(cls.json_data, '$.plot') != '',
-                    func.json_extract(cls.json_data, '$.plot') != None
-                )
-
-            # 검색어 필터
-            if search_word:
-                search_like = f"%{search_word.replace('-', '%')}%"
-                query = query.filter(or_(
-                    cls.originaltitle.ilike(search_like),
-                    cls.code.ilike(search_like),
-                    cls.title.ilike(f'%{search_word}%')
-                ))
+            filters = (category, search_site, search_status, search_word)
+            query = cls._build_list_query(*filters).options(load_only(*[getattr(cls, c) for c in LIST_SUMMARY_COLUMNS]))
 
-            # 정렬
+            # 정렬 키: (정렬 컬럼, id) 복합 키로 keyset 페이징
             if search_order in ['code_asc', 'code_desc']:
-                all_records = query.options(load_only(cls.id, cls.originaltitle)).all()
-                def natural_keys(record):
-                    return [int(c) if c.isdigit() else c.lower() for c in re.split(r'(\d+)', record.originaltitle)]
-                all_records.sort(key=natural_keys, reverse=(search_order == 'code_desc'))
-
-                count = len(all_records)
-                page_records = all_records[(page - 1) * page_size : page * page_size]
-                page_ids = [r.id for r in page_records]
-
-                if page_ids:
-                    items_unordered = av_db_session.query(cls).filter(cls.id.in_(page_ids)).all()
-                    items = sorted(items_unordered, key=lambda x: page_ids.index(x.id))
+                sort_attr = 'sort_key'
+                descending = (search_order == 'code_desc')
+            else:
+                sort_attr = 'created_time'
+                descending = (search_order != 'asc')
+            sort_col = getattr(cls, sort_attr)
+            signature = hashlib.md5(json.dumps([filters, search_order, page_size]).encode('utf-8')).hexdigest()[:12]
+
+            # 커서가 현재 조건/페이지와 일치하면 OFFSET 없이 직전 페이지 경계 키 기준으로 조회.
+            # 번호 페이지 이동(커서 없음)은 캐시된 페이지 경계 키로 탐색하고, 경계 키가 준비되기 전에만 OFFSET
+            cursor_info = cls._decode_cursor(cursor) if cursor else None
+            if cursor_info and (cursor_info.get('s') != signature or cursor_info.get('p') != page):
+                cursor_info = None
+
+            seek = None
+            if cursor_info:
+                key_value, key_id = cursor_info['k']
+                if sort_attr == 'created_time':
+                    key_value = datetime.fromisoformat(key_value)
+                seek = (key_value, key_id, cursor_info.get('d') != 'prev')
+            elif page > 1:
+                anchor = cls._get_list_anchor(signature, filters, sort_attr, descending, page_size, page)
+                if anchor:
+                    seek = (anchor[0], anchor[1], True)
+
+            if seek:
+                key_value, key_id, forward = seek
+                # 행 값 비교 ((정렬값, id) < (?, ?)) 라야 (category, 정렬값, id) 인덱스를 범위 탐색 (OR 형태는 카테고리 전체 스캔)
+                if descending == forward:
+                    query = query.filter(tuple_(sort_col, cls.id) < tuple_(key_value, key_id))
                 else:
-                    items = []
+                    query = query.filter(tuple_(sort_col, cls.id) > tuple_(key_value, key_id))
+                query_desc = descending if forward else not descending
+                if query_desc: query = query.order_by(sort_col.desc(), cls.id.desc())
+                else: query = query.order_by(sort_col.asc(), cls.id.asc())
+                items = query.limit(page_size).all()
+                if not forward:
+                    items.reverse()
             else:
-                if search_order == 'asc': query = query.order_by(cls.created_time.asc())
-                else: query = query.order_by(cls.created_time.desc())
-
-                count = query.count()
+                if descending: query = query.order_by(sort_col.desc(), cls.id.desc())
+                else: query = query.order_by(sort_col.asc(), cls.id.asc())
                 items = query.offset((page - 1) * page_size).limit(page_size).all()
 
+            count, count_is_approx = cls._get_list_count(filters)
+
             total_page = math.ceil(count / page_size) if count > 0 else 1
             start_page = ((page - 1) // 10) * 10 + 1
             end_page = min(start_page + 9, total_page)
 
-            # 실시간 URL 주소 치환
-            module_name = 'jav_censored' if category == 'CEN' else ('jav_uncensored' if category == 'UNCEN' else 'western')
-            url_mapping_str = P.ModelSetting.get(f"{module_name}_db_image_url_mapping") or ""
-            mappings = []
-            if url_mapping_str:
-                for line in url_mapping_str.split('\n'):
-                    line = line.strip()
-                    if '|' in line:
-                        parts = line.split('|', 1)
-                        if parts[0].strip() and parts[1].strip():
-                            mappings.append((parts[0].strip(), parts[1].strip()))
+            next_cursor, prev_cursor = None, None
+            if items:
+                def row_key(row):
+                    value = getattr(row, sort_attr)
+                    if value is None:
+                        return None
+                    return [value.isoformat() if isinstance(value, datetime) else value, row.id]
+                first_key, last_key = row_key(items[0]), row_key(items[-1])
+                if last_key and len(items) == page_size:
+                    next_cursor = cls._encode_cursor(signature, page + 1, 'next', last_key)
+                if first_key and page > 1:
+                    prev_cursor = cls._encode_cursor(signature, page - 1, 'prev', first_key)
+
+            # 실시간 URL 주소 치환 (모듈 설정 스냅샷의 파싱된 목록 우선)
+            mappings = url_mappings
+            if mappings is None:
+                mappings = cls.parse_url_mappings(P.ModelSetting.get(f"{cls._module_name(category)}_db_image_url_mapping"))
 
             item_list = []
             for item in items:
-                d = item.as_dict()
+                d = item.as_summary_dict()
                 if d.get('poster_url') and mappings:
                     for src_url, dst_url in mappings:
                         if d['poster_url'].startswith(src_url):
@@ -260,11 +1175,14 @@ class ModelAvMetadata(Base):
                 'list_step': page_size,
                 'total_page': total_page,
                 'total_count': count,
+                'total_count_is_approx': count_is_approx,
                 'start_page': start_page,
                 'end_page': end_page,
                 'last_page': end_page,
                 'prev_page': start_page - 1 if start_page > 1 else 0,
                 'next_page': end_page + 1 if end_page < total_page else 0,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor,
             }
 
             # logger.debug(f"[MetaDB] web_list 완료: [{category}] {len(item_list)}개 반환 (전체 {count}개, {page}/{total_page} 페이지)")
@@ -275,96 +1193,282 @@ class ModelAvMetadata(Base):
             return {'success': False, 'paging': None, 'list': []}
 
 
+    @staticmethod
+    def _fts_values(record_id, category, code, originaltitle, title, json_data):
+        jd = json_data if isinstance(json_data, dict) else {}
+        actor_names = []
+        for actor in jd.get('actor') or []:
+            if isinstance(actor, dict):
+                actor_names.extend(n for n in (actor.get('name'), actor.get('originalname')) if n)
+            elif actor:
+                actor_names.append(str(actor))
+        return {
+            'rowid': record_id,
+            'category': category,
+            'code': code or '',
+            'originaltitle': originaltitle or '',
+            'title': title or '',
+            'plot': str(jd.get('plot') or ''),
+            'actor': ' '.join(actor_names),
+            'studio': str(jd.get('studio') or ''),
+            'genre': ' '.join(str(g) for g in (jd.get('genre') or []) if g),
+        }
+
+
     @classmethod
-    def _delete_system_images_for_record(cls, record):
-        """이미지 서버에서 해당 레코드의 시스템 생성 이미지 삭제"""
-        try:
-            if not record or not record.code:
-                return
+    def _fts_sync(cls, record):
+        """레코드 저장과 같은 트랜잭션에서 FTS 인덱스 행 갱신 (호출 전 flush 로 id 확보 필요)"""
+        if not _fts_enabled or record.id is None:
+            return
+        values = cls._fts_values(record.id, record.category, record.code, record.originaltitle, record.title, record.json_data)
+        av_db_session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {'rowid': record.id})
+        av_db_session.execute(text(FTS_INSERT_SQL), values)
 
-            module_name = 'western' if record.category == 'WEST' else ('jav_censored' if record.category == 'CEN' else 'jav_uncensored')
 
-            # 1. 이미지 서버(image_server) 모드 사용 여부 확인 (미사용 시 디스크 작업 즉시 중단)
-            image_mode = P.ModelSetting.get(f"{module_name}_image_mode")
-            if module_name == 'jav_uncensored' and not image_mode:
-                image_mode = P.ModelSetting.get('jav_censored_image_mode')
-            if image_mode != 'image_server':
-                return
+    @classmethod
+    def _fts_delete(cls, record_ids):
+        if not _fts_enabled or not record_ids:
+            return
+        av_db_session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), [{'rowid': rid} for rid in record_ids])
 
-            local_root = P.ModelSetting.get(f"{module_name}_image_server_local_path")
-            server_url = P.ModelSetting.get(f"{module_name}_image_server_url")
 
-            if not local_root or not os.path.exists(local_root):
-                return
+    @staticmethod
+    def _fts_match_expr(keyword, columns=None):
+        """
+        검색어를 FTS5 MATCH 식으로 변환. 공백/하이픈으로 나눈 각 조각을 부분 문자열 구문으로 AND 결합.
+        trigram 토크나이저는 3글자 미만 조각을 찾을 수 없으므로 해당 조각은 제외하고,
+        남는 조각이 없거나 기존 레코드 색인(백그라운드)이 끝나지 않았으면 None 반환 (호출부에서 LIKE 폴백).
+        반환: (match_expr, is_exact) - is_exact 가 False 면 결과가 후보 집합이므로 호출부에서 추가 필터 필요
+        """
+        if not _fts_ready or not keyword:
+            return None, False
+        terms = [t for t in re.split(r'[\s\-_]+', str(keyword)) if t]
+        long_terms = [t for t in terms if len(t) >= 3]
+        if not long_terms:
+            return None, False
+        expr = ' AND '.join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        if columns:
+            expr = '{' + ' '.join(columns) + '} : (' + expr + ')'
+        return expr, len(long_terms) == len(terms)
+
+
+    @classmethod
+    def search_fts(cls, category, keyword, columns=None, limit=None):
+        """
+        FTS 인덱스로 레코드 검색 (bm25 랭크순).
+        FTS 를 사용할 수 없는 검색어/환경이면 None 을 반환하므로 호출부에서 기존 LIKE 검색으로 폴백.
+        """
+        match_expr, _ = cls._fts_match_expr(keyword, columns=columns)
+        if not match_expr:
+            return None
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_match AND category = :category ORDER BY rank"
+        params = {'fts_match': match_expr, 'category': category}
+        if limit:
+            sql += " LIMIT :limit"
+            params['limit'] = limit
+        ids = [row[0] for row in av_db_session.execute(text(sql), params)]
+        if not ids:
+            return []
+        records = {r.id: r for r in av_db_session.query(cls).filter(cls.id.in_(ids)).all()}
+        return [records[rid] for rid in ids if rid in records]
+
+
+    @staticmethod
+    def _module_name(category):
+        return 'western' if category == 'WEST' else ('jav_censored' if category == 'CEN' else 'jav_uncensored')
+
+
+    @staticmethod
+    def parse_url_mappings(url_mapping_str):
+        """'원본 URL|치환 URL' 줄 목록 -> ((원본, 치환), ...)"""
+        mappings = []
+        for line in (url_mapping_str or '').split('\n'):
+            line = line.strip()
+            if '|' in line:
+                parts = line.split('|', 1)
+                if parts[0].strip() and parts[1].strip():
+                    mappings.append((parts[0].strip(), parts[1].strip()))
+        return tuple(mappings)
+
+
+    @classmethod
+    def _image_cleanup_config(cls, category):
+        """이미지 서버 모드일 때만 정리 설정 반환 (설정은 작업당 한 번만 읽음). 정리 대상이 아니면 None"""
+        module_name = cls._module_name(category)
+
+        # 이미지 서버(image_server) 모드 사용 여부 확인 (미사용 시 디스크 작업 없음)
+        image_mode = P.ModelSetting.get(f"{module_name}_image_mode")
+        if module_name == 'jav_uncensored' and not image_mode:
+            image_mode = P.ModelSetting.get('jav_censored_image_mode')
+        if image_mode != 'image_server':
+            return None
+
+        local_root = P.ModelSetting.get(f"{module_name}_image_server_local_path")
+        if not local_root or not os.path.exists(local_root):
+            return None
+        return {
+            'module_name': module_name,
+            'local_root': local_root,
+            'server_url': P.ModelSetting.get(f"{module_name}_image_server_url"),
+            'save_format': P.ModelSetting.get(f"{module_name}_image_server_save_format") or '',
+            # reconcile 로 한 번이라도 재구성되었으면 매니페스트를 신뢰 (이후 디렉터리 조회 없음)
+            'manifest_ready': bool(P.ModelSetting.get(f"{module_name}_image_manifest_time")),
+            # 옵션에 따라 유저 이미지 포함 여부 결정
+            'delete_user_images': P.ModelSetting.get_bool(f"{module_name}_db_delete_user_images"),
+        }
 
-            # 2. 대상 폴더 추출
-            target_folders = set()
-            sample_urls = [record.poster_url] + (record.json_data.get('fanart', []) if isinstance(record.json_data, dict) else [])
-            for u in sample_urls:
-                if u and server_url and server_url in u:
+
+    @staticmethod
+    def _match_image_prefix(fname_lower, prefixes):
+        """파일명이 '{접두어}_' 또는 '{접두어}.' 로 시작하면 해당 접두어 반환 (구분자 위치마다 집합 조회), 아니면 None"""
+        for idx, ch in enumerate(fname_lower):
+            if (ch == '_' or ch == '.') and fname_lower[:idx] in prefixes:
+                return fname_lower[:idx]
+        return None
+
+
+    @classmethod
+    def plan_image_deletion(cls, records, config):
+        """
+        시스템 이미지 삭제 계획. 레코드의 이미지 URL 로 대상 폴더를 구한 뒤 폴더별로 품번 접두어를 모아
+        폴더당 한 번만 scandir 한다. records: (code, originaltitle, poster_url, json_data) 반복자
+        반환: (삭제할 파일 경로 목록, 보존한 유저 이미지 수)
+        """
+        local_root, server_url = config['local_root'], config['server_url']
+        folders = {}
+        for code, originaltitle, poster_url, json_data in records:
+            if not code:
+                continue
+            jd = json_data if isinstance(json_data, dict) else {}
+            prefixes = {code.lower()}
+            if jd.get('ui_code'): prefixes.add(str(jd['ui_code']).lower())
+            if originaltitle: prefixes.add(originaltitle.lower())
+            for u in [poster_url] + list(jd.get('fanart') or []):
+                if u and server_url and isinstance(u, str) and server_url in u:
                     rel_path = u.split(server_url, 1)[1].lstrip('/')
-                    folder_path = os.path.join(local_root, os.path.dirname(rel_path))
-                    if os.path.exists(folder_path):
-                        target_folders.add(folder_path)
+                    folders.setdefault(os.path.join(local_root, os.path.dirname(rel_path)), set()).update(prefixes)
 
-            # 3. 파일 정리 (옵션에 따라 유저 이미지 포함 여부 결정)
-            delete_user_images = P.ModelSetting.get_bool(f"{module_name}_db_delete_user_images")
+        paths = []
+        skipped_user_count = 0
+        for folder, prefixes in folders.items():
+            try:
+                entries = os.scandir(folder)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    fname_lower = entry.name.lower()
+                    if not cls._match_image_prefix(fname_lower, prefixes) or not entry.is_file():
+                        continue
+                    # 유저 파일 보존 검사
+                    if ('_user.' in fname_lower or '_user_' in fname_lower) and not config['delete_user_images']:
+                        logger.debug(f"[MetaDB] 유저 이미지 보존 (삭제 건너뜀): {entry.name}")
+                        skipped_user_count += 1
+                        continue
+                    paths.append(entry.path)
+        return paths, skipped_user_count
 
-            prefixes = [record.code.lower()]
-            if isinstance(record.json_data, dict):
-                if record.json_data.get('ui_code'): prefixes.append(record.json_data['ui_code'].lower())
-                if record.originaltitle: prefixes.append(record.originaltitle.lower())
-            prefixes = list(set(prefixes))
 
-            deleted_count = 0
-            skipped_user_count = 0
+    @classmethod
+    def plan_image_deletion_from_manifest(cls, config, codes=None, category=None):
+        """
+        plan_image_deletion 의 매니페스트 버전. 디렉터리 조회 없이 av_image_file 인덱스에서 대상 파일을 찾음.
+        codes 또는 category 로 대상 지정. 반환: (삭제할 파일 경로 목록, 보존한 유저 이미지 수)
+        """
+        query = av_db_session.query(ModelAvImageFile.path, ModelAvImageFile.is_user)
+        if codes is not None:
+            query = query.filter(ModelAvImageFile.code.in_(list(codes)))
+        else:
+            query = query.filter(ModelAvImageFile.category == category)
+        paths = []
+        skipped_user_count = 0
+        for path, is_user in query:
+            if is_user and not config['delete_user_images']:
+                skipped_user_count += 1
+                continue
+            paths.append(path)
+        return paths, skipped_user_count
 
-            logger.debug(f"[MetaDB] 이미지 정리 시작 -> 레코드: [{record.code}], 폴더: {list(target_folders)}, 유저삭제옵션: {delete_user_images}")
 
-            for folder in target_folders:
-                if not os.path.exists(folder):
-                    continue
-                for fname in os.listdir(folder):
-                    fname_lower = fname.lower()
-                    is_user_file = ('_user.' in fname_lower or '_user_' in fname_lower)
+    @classmethod
+    def execute_image_deletion(cls, paths, status=None):
+        """삭제 계획의 파일을 IMAGE_DELETE_WORKERS 스레드로 병렬 삭제. status dict 가 주어지면 current 갱신. 반환: 삭제 건수"""
+        def _remove(fpath):
+            try:
+                os.remove(fpath)
+                logger.debug(f"[MetaDB] 시스템 이미지 삭제 완료: {os.path.basename(fpath)}")
+                return True
+            except FileNotFoundError:
+                return False
+            except Exception as e_rm:
+                logger.error(f"[MetaDB] 이미지 삭제 실패 ({fpath}): {e_rm}")
+                return False
 
-                    for pfx in prefixes:
-                        if fname_lower.startswith(f"{pfx}_") or fname_lower.startswith(f"{pfx}."):
-                            fpath = os.path.join(folder, fname)
+        deleted_count = 0
+        if len(paths) < IMAGE_DELETE_POOL_MIN:
+            results = map(_remove, paths)
+            executor = None
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            executor = ThreadPoolExecutor(max_workers=IMAGE_DELETE_WORKERS)
+            results = executor.map(_remove, paths)
+        try:
+            for ok in results:
+                deleted_count += 1 if ok else 0
+                if status is not None:
+                    status['current'] += 1
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+        return deleted_count
 
-                            # 유저 파일 보존 검사
-                            if is_user_file and not delete_user_images:
-                                logger.debug(f"[MetaDB] 유저 이미지 보존 (삭제 건너뜀): {fname}")
-                                skipped_user_count += 1
-                                break
 
-                            try:
-                                os.remove(fpath)
-                                logger.debug(f"[MetaDB] 시스템 이미지 삭제 완료: {fname}")
-                                deleted_count += 1
-                            except Exception as e_rm:
-                                logger.error(f"[MetaDB] 이미지 삭제 실패 ({fpath}): {e_rm}")
-                            break
+    @classmethod
+    def _delete_system_images_for_record(cls, record):
+        """
+        이미지 서버에서 해당 레코드의 시스템 생성 이미지 삭제 (clear_db 와 같은 계획/삭제 경로 사용).
+        반환: 삭제 대상 경로 목록 (매니페스트 정리는 호출부 트랜잭션에서)
+        """
+        try:
+            if not record or not record.code:
+                return []
+            config = cls._image_cleanup_config(record.category)
+            if not config:
+                return []
+            if config['manifest_ready']:
+                paths, skipped_user_count = cls.plan_image_deletion_from_manifest(config, codes=[record.code])
+            else:
+                paths, skipped_user_count = cls.plan_image_deletion(
+                    [(record.code, record.originaltitle, record.poster_url, record.json_data)], config
+                )
+            logger.debug(f"[MetaDB] 이미지 정리 시작 -> 레코드: [{record.code}], 대상: {len(paths)}개, 유저삭제옵션: {config['delete_user_images']}")
+            deleted_count = cls.execute_image_deletion(paths)
             if deleted_count > 0 or skipped_user_count > 0:
                 logger.info(f"[MetaDB] 이미지 파일 정리 완료: [{record.code}] -> 삭제: {deleted_count}개, 보존: {skipped_user_count}개")
+            return paths
         except Exception as e:
             logger.error(f"[MetaDB] _delete_system_images_for_record 오류 ({record.code}): {e}")
+            return []
 
 
     @classmethod
     def delete_record(cls, code):
         try:
+            cls.flush_write_behind()
             record = av_db_session.query(cls).filter_by(code=code).first()
             if not record:
                 logger.warning(f"[MetaDB] delete_record: 삭제 대상 레코드 없음 ({code})")
                 return False
 
-            # 이미지 서버 시스템 이미지 정리
-            cls._delete_system_images_for_record(record)
+            # 이미지 서버 시스템 이미지 정리. 매니페스트/FTS/레코드 삭제는 한 트랜잭션으로 커밋
+            removed_paths = cls._delete_system_images_for_record(record)
+            ModelAvImageFile.remove_paths(removed_paths, commit=False)
 
+            cls._fts_delete([record.id])
             av_db_session.delete(record)
             av_db_session.commit()
-            cls.checkpoint_wal()
+            cls.invalidate_list_count()
+            cls.request_checkpoint()
             logger.info(f"[MetaDB] 레코드 삭제 완료: {code}")
             return True
         except Exception as e:
@@ -377,15 +1481,19 @@ class ModelAvMetadata(Base):
     @classmethod
     def update_json(cls, code, new_json_data):
         try:
+            cls.flush_write_behind()
             logger.debug(f"[MetaDB] update_json 수동 편집 저장 시도: {code}")
             record = av_db_session.query(cls).filter_by(code=code).first()
             if record:
                 record.json_data = copy.deepcopy(new_json_data)
                 record.title = new_json_data.get('title', record.title)
                 record.originaltitle = new_json_data.get('originaltitle', record.originaltitle)
+                record.update_code_columns()
                 flag_modified(record, "json_data")
                 record.updated_time = datetime.now()
+                cls._fts_sync(record)
                 av_db_session.commit()
+                cls.invalidate_list_count()
                 logger.info(f"[MetaDB] update_json 저장 성공: {code} ({record.originaltitle})")
                 return True
             logger.warning(f"[MetaDB] update_json 대상 레코드 없음: {code}")
@@ -398,7 +1506,8 @@ class ModelAvMetadata(Base):
 
     @classmethod
     def sanitize_for_export(cls, json_data):
-        sanitized = copy.deepcopy(json_data)
+        # 최상위 이미지 키만 교체하므로 얕은 복사로 충분 (원본 dict 는 변경하지 않음)
+        sanitized = dict(json_data)
         sanitized['thumb'] = []
         sanitized['fanart'] = []
         sanitized['extras'] = []
@@ -407,44 +1516,331 @@ class ModelAvMetadata(Base):
         return sanitized
 
 
-    @classmethod
-    def clear_db(cls, category='CEN'):
-        try:
-            logger.info(f"[MetaDB] clear_db 실행: Category={category}")
-            records = av_db_session.query(cls).filter_by(category=category).all()
-            count = len(records)
-            
-            # DB 초기화 시 이미지 파일들도 일괄 정리
-            for r in records:
-                cls._delete_system_images_for_record(r)
-
-            av_db_session.query(cls).filter_by(category=category).delete()
-            av_db_session.commit()
-            cls.checkpoint_wal()
-            logger.info(f"[MetaDB] clear_db 완료: [{category}] {count}건 레코드 및 이미지 정리됨")
-            return True, count
-        except Exception as e:
-            logger.error(f"[MetaDB] clear_db 실패 ({category}): {e}")
-            logger.error(traceback.format_exc())
-            av_db_session.rollback()
-            return False, 0
+    @staticmethod
+    def export_extension(export_format):
+        """Export 형식 -> 파일 확장자. zstandard 가 없으면 zstd 는 gzip 으로 대체"""
+        if export_format == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                logger.warning("[MetaDB] zstandard 패키지가 없어 gzip 으로 Export 합니다.")
+                export_format = 'gzip'
+        return EXPORT_EXTENSIONS.get(export_format, '.db')
+
+
+    @staticmethod
+    def _open_ndjson(path, mode='r', format_path=None):
+        """NDJSON 텍스트 스트림 열기. 확장자(format_path 가 있으면 그 확장자)가 .gz/.zst 이면 압축 스트림으로 읽고 쓴다"""
+        lower = (format_path or path).lower()
+        if lower.endswith('.gz'):
+            return gzip.open(path, mode + 't', encoding='utf-8')
+        if lower.endswith('.zst'):
+            import zstandard
+            if mode == 'r':
+                return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+            return io.TextIOWrapper(zstandard.ZstdCompressor(level=10).stream_writer(open(path, 'wb')), encoding='utf-8')
+        return open(path, mode, encoding='utf-8')
 
 
     @classmethod
-    def checkpoint_wal(cls):
+    def export_db(cls, filepath, category=None, status=None):
+        """
+        이미지 정보를 제거한 공유용 파일로 스트리밍 Export. 확장자가 .db 이면 SQLite, NDJSON 확장자면 한 줄당 한 레코드.
+        원본은 yield_per 로 읽고 EXPORT_BATCH_SIZE 단위로 기록하며, 완료 전까지는 .part 파일에 쓴다.
+        status dict 가 주어지면 total/current 를 갱신. 반환: Export 건수
+        """
+        status = status if status is not None else {}
+        cls.flush_write_behind()
+        tmp_path = filepath + '.part'
+        is_db = not filepath.lower().endswith(NDJSON_EXTENSIONS)
+
+        query = av_db_session.query(
+            cls.category, cls.code, cls.originaltitle, cls.site, cls.title,
+            cls.json_data, cls.json_zip, cls.created_time, cls.updated_time
+        )
+        count_query = av_db_session.query(func.count(cls.id))
+        if category:
+            query = query.filter(cls.category == category)
+            count_query = count_query.filter(cls.category == category)
+        status['total'] = count_query.scalar() or 0
+        status['current'] = 0
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if is_db:
+            conn = sqlite3.connect(tmp_path)
+            conn.execute(EXPORT_TABLE_SQL)
+            insert_sql = f"INSERT INTO av_metadata_cache ({', '.join(EXPORT_COLUMNS)}) VALUES ({', '.join('?' * len(EXPORT_COLUMNS))})"
+        else:
+            out = cls._open_ndjson(tmp_path, 'w', format_path=filepath)
+
+        def _write(batch):
+            if is_db:
+                conn.executemany(insert_sql, batch)
+            else:
+                out.writelines(batch)
+
+        count = 0
         try:
-            logger.debug("[MetaDB] checkpoint_wal(TRUNCATE) 실행 중...")
-            av_db_session.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+            batch = []
+            for r in query.order_by(cls.id).yield_per(EXPORT_BATCH_SIZE):
+                clean_data = cls.sanitize_for_export(_load_row_json(r.json_data, r.json_zip))
+                # Datetime 포맷팅 (SQLite 안전성)
+                c_time = r.created_time.strftime('%Y-%m-%d %H:%M:%S') if r.created_time else None
+                u_time = r.updated_time.strftime('%Y-%m-%d %H:%M:%S') if r.updated_time else None
+                if is_db:
+                    batch.append((r.category, r.code, r.originaltitle, r.site, r.title, '', json.dumps(clean_data, ensure_ascii=False), c_time, u_time))
+                else:
+                    batch.append(json.dumps(dict(zip(EXPORT_COLUMNS, (r.category, r.code, r.originaltitle, r.site, r.title, '', clean_data, c_time, u_time))), ensure_ascii=False) + '\n')
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    _write(batch)
+                    count += len(batch)
+                    status['current'] = count
+                    batch = []
+            if batch:
+                _write(batch)
+                count += len(batch)
+                status['current'] = count
+            if is_db:
+                conn.commit()
+        finally:
+            if is_db:
+                conn.close()
+            else:
+                out.close()
+        os.replace(tmp_path, filepath)
+        logger.info(f"[MetaDB] export_db 완료: {count}건 -> {filepath}")
+        return count
+
+
+    @classmethod
+    def start_export(cls, filepath, category=None, status=None):
+        """export_db 를 백그라운드 스레드로 실행. 진행/결과는 status dict (is_running, status, total, current, filename, msg) 로 조회"""
+        status = status if status is not None else {}
+        status.update({
+            'is_running': True, 'status': '작업 중', 'total': 0, 'current': 0,
+            'filename': '', 'msg': ''
+        })
+
+        def _worker():
+            try:
+                count = cls.export_db(filepath, category=category, status=status)
+                status.update({
+                    'is_running': False, 'status': '완료', 'filename': os.path.basename(filepath),
+                    'msg': f'{count}개의 데이터가 포함된 파일 준비 완료'
+                })
+            except Exception as e:
+                logger.error(f"[MetaDB] export_db 실패: {e}")
+                logger.error(traceback.format_exc())
+                status.update({'is_running': False, 'status': '실패', 'msg': str(e)})
+                if os.path.exists(filepath + '.part'):
+                    os.remove(filepath + '.part')
+            finally:
+                av_db_session.remove()
+
+        t = threading.Thread(target=_worker, daemon=True)
+        t.start()
+        return status
+
+
+    @classmethod
+    def clear_db(cls, category='CEN', status=None):
+        """
+        카테고리 전체 삭제. 이미지 삭제 계획을 먼저 세운 뒤 DB 행을 지우고, 이미지 파일은 병렬로 정리.
+        status dict 가 주어지면 단계(status)와 이미지 삭제 진행(total/current)을 갱신. 반환: (성공 여부, 삭제 건수)
+        """
+        status = status if status is not None else {}
+        try:
+            cls.flush_write_behind()
+            logger.info(f"[MetaDB] clear_db 실행: Category={category}")
+            count = av_db_session.query(func.count(cls.id)).filter(cls.category == category).scalar() or 0
+
+            # DB 초기화 시 이미지 파일들도 일괄 정리 (폴더별 한 번만 스캔)
+            paths, skipped_user_count = [], 0
+            config = cls._image_cleanup_config(category)
+            if config and config['manifest_ready']:
+                paths, skipped_user_count = cls.plan_image_deletion_from_manifest(config, category=category)
+            elif config:
+                status['status'] = '이미지 검색 중'
+                rows = av_db_session.query(cls).options(load_only(
+                    cls.category, cls.code, cls.originaltitle, cls.poster_url, cls.json_data, cls.json_zip
+                )).filter_by(category=category).yield_per(EXPORT_BATCH_SIZE)
+                paths, skipped_user_count = cls.plan_image_deletion(
+                    ((r.code, r.originaltitle, r.poster_url, r.json_data) for r in rows), config
+                )
+                av_db_session.expunge_all()
+
+            status['status'] = 'DB 삭제 중'
+            if _fts_enabled:
+                av_db_session.execute(text(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT id FROM av_metadata_cache WHERE category = :category)"
+                ), {'category': category})
+            av_db_session.query(cls).filter_by(category=category).delete()
+            # 매니페스트 정리도 같은 트랜잭션 (파일 삭제는 커밋 이후)
+            ModelAvImageFile.remove_paths(paths, commit=False)
             av_db_session.commit()
-            logger.debug("[MetaDB] checkpoint_wal 완료 (WAL 파일 크기 0바이트 초기화)")
-            return True
+            cls.invalidate_metadata_cache()
+            cls.invalidate_list_count()
+            cls.checkpoint_wal()
+
+            status.update({'status': '이미지 삭제 중', 'total': len(paths), 'current': 0})
+            deleted_count = cls.execute_image_deletion(paths, status=status)
+            status.update({'count': count, 'deleted': deleted_count, 'skipped_user': skipped_user_count})
+            logger.info(f"[MetaDB] clear_db 완료: [{category}] {count}건 레코드 정리, 이미지 삭제: {deleted_count}개, 보존: {skipped_user_count}개")
+            return True, count
         except Exception as e:
-            logger.error(f"[MetaDB] checkpoint_wal 에러: {e}")
+            logger.error(f"[MetaDB] clear_db 실패 ({category}): {e}")
             logger.error(traceback.format_exc())
             av_db_session.rollback()
+            return False, 0
+
+
+    @classmethod
+    def start_clear(cls, category, status=None):
+        """clear_db 를 백그라운드 스레드로 실행. 진행/결과는 status dict (is_running, status, total, current, count, deleted, skipped_user, msg)"""
+        status = status if status is not None else {}
+        status.update({
+            'is_running': True, 'status': '작업 중', 'total': 0, 'current': 0,
+            'count': 0, 'deleted': 0, 'skipped_user': 0, 'msg': ''
+        })
+
+        def _worker():
+            try:
+                success, count = cls.clear_db(category, status=status)
+                if success:
+                    status.update({
+                        'status': '완료',
+                        'msg': f"모든 메타데이터 DB가 초기화되었습니다. ({count}건 삭제됨, 이미지 {status['deleted']}개 정리)"
+                    })
+                else:
+                    status.update({'status': '실패', 'msg': '초기화 실패'})
+            finally:
+                status['is_running'] = False
+                av_db_session.remove()
+
+        t = threading.Thread(target=_worker, daemon=True)
+        t.start()
+        return status
+
+
+    @classmethod
+    def reconcile_image_manifest(cls, category, status=None):
+        """
+        디스크에서 이미지 매니페스트 재구성. 저장 형식의 고정 경로(예: /jav/cen) 아래를 한 번 순회하며
+        품번/ui_code/원제 접두어로 레코드를 찾아 카테고리의 매니페스트를 통째로 교체한다. 반환: (성공 여부, 메시지)
+        """
+        status = status if status is not None else {}
+        config = cls._image_cleanup_config(category)
+        if not config:
+            return False, '이미지 서버 모드가 아니거나 로컬 경로가 없습니다.'
+
+        prefix_map = {}
+        query = av_db_session.query(cls.code, cls.originaltitle, cls.ui_code).filter(cls.category == category)
+        for code, originaltitle, ui_code in query.yield_per(EXPORT_BATCH_SIZE):
+            for value in (code, ui_code, originaltitle):
+                if value:
+                    prefix_map.setdefault(str(value).lower(), code)
+
+        save_format = config['save_format']
+        static_dir = os.path.dirname(save_format.split('{', 1)[0] if '{' in save_format else save_format + '/').strip('/\\')
+        scan_root = os.path.join(config['local_root'], static_dir)
+        logger.info(f"[MetaDB] 이미지 매니페스트 재구성 시작: [{category}] {scan_root} (레코드 접두어 {len(prefix_map)}개)")
+
+        rows = []
+        stack = [scan_root]
+        while stack:
+            folder = stack.pop()
+            try:
+                entries = os.scandir(folder)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    status['current'] = status.get('current', 0) + 1
+                    prefix = cls._match_image_prefix(entry.name.lower(), prefix_map)
+                    if not prefix:
+                        continue
+                    try:
+                        rows.append(ModelAvImageFile._file_row(category, prefix_map[prefix], entry.path, entry.stat()))
+                    except OSError:
+                        continue
+
+        av_db_session.query(ModelAvImageFile).filter(ModelAvImageFile.category == category).delete(synchronize_session=False)
+        for i in range(0, len(rows), IMAGE_MANIFEST_BATCH_SIZE):
+            av_db_session.execute(text(IMAGE_MANIFEST_UPSERT_SQL), rows[i:i + IMAGE_MANIFEST_BATCH_SIZE])
+        av_db_session.commit()
+        P.ModelSetting.set(f"{config['module_name']}_image_manifest_time", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        status['indexed'] = len(rows)
+        msg = f"이미지 매니페스트 재구성 완료: 파일 {status['current']}개 확인, {len(rows)}개 등록"
+        logger.info(f"[MetaDB] {msg} [{category}]")
+        return True, msg
+
+
+    @classmethod
+    def start_image_reconcile(cls, category, status=None):
+        """reconcile_image_manifest 를 백그라운드 스레드로 실행. status dict (is_running, status, current, indexed, msg)"""
+        status = status if status is not None else {}
+        status.update({'is_running': True, 'status': '작업 중', 'current': 0, 'indexed': 0, 'msg': ''})
+
+        def _worker():
+            try:
+                success, msg = cls.reconcile_image_manifest(category, status=status)
+                status.update({'status': '완료' if success else '실패', 'msg': msg})
+            except Exception as e:
+                logger.error(f"[MetaDB] 이미지 매니페스트 재구성 실패: {e}")
+                logger.error(traceback.format_exc())
+                av_db_session.rollback()
+                status.update({'status': '실패', 'msg': str(e)})
+            finally:
+                status['is_running'] = False
+                av_db_session.remove()
+
+        t = threading.Thread(target=_worker, daemon=True)
+        t.start()
+        return status
+
+
+    @classmethod
+    def checkpoint_wal(cls, mode='TRUNCATE'):
+        """수동/유지보수용 즉시 체크포인트 (기본 TRUNCATE: WAL 파일 크기 0 초기화). 일반 쓰기 후에는 request_checkpoint 사용"""
+        try:
+            logger.debug(f"[MetaDB] checkpoint_wal({mode}) 실행 중...")
+            # 호출부 세션이 쓰기 연결을 잡고 있으면 같은 연결에서 실행 (쓰기 연결 대기 방지)
+            session = av_db_session()
+            conn = session.connection() if session.info.get('av_writer') else None
+            busy, log_pages, checkpointed = _run_wal_checkpoint(mode, conn=conn)
+            if not busy:
+                _wal_state['dirty'] = False
+            logger.debug(f"[MetaDB] checkpoint_wal 완료 ({checkpointed}/{log_pages} pages, {_wal_stats['last_duration_ms']}ms)")
+            return not busy
+        except Exception as e:
+            logger.error(f"[MetaDB] checkpoint_wal 에러: {e}")
+            logger.error(traceback.format_exc())
             return False
 
 
+    @classmethod
+    def request_checkpoint(cls):
+        """쓰기 작업 후 호출. 즉시 실행하지 않고 스케줄러가 WAL 크기/유휴 시간에 따라 PASSIVE 또는 TRUNCATE 로 처리"""
+        _wal_touch()
+        _wal_event.set()
+
+
+    @classmethod
+    def get_wal_status(cls):
+        with _wal_lock:
+            status = dict(_wal_stats)
+        status['wal_bytes'] = _wal_size()
+        status['dirty'] = _wal_state['dirty']
+        status['idle_seconds'] = round(time.time() - _wal_state['last_write'], 1) if _wal_state['last_write'] else None
+        checkpoints = status['passive'] + status['truncate']
+        status['avg_duration_ms'] = round(status['total_duration_ms'] / checkpoints, 2) if checkpoints else 0.0
+        return status
+
+
     @classmethod
     def vacuum_db(cls):
         try:
@@ -461,6 +1857,99 @@ class ModelAvMetadata(Base):
             return False
 
 
+    @classmethod
+    def compress_db(cls, codec='zstd', sample_size=2000, batch_size=500):
+        """
+        json_data 저장 방식을 오프라인 변환. codec: 'zstd' | 'zlib' | 'none'(압축 해제).
+        샘플 레코드로 공유 사전을 학습하여 활성화한 뒤 전체 행을 배치 단위로 재기록하고, 끝나면 VACUUM 으로 파일 크기 회수.
+        zstandard 패키지가 없으면 zstd 대신 zlib 사용. 반환: (변환 건수, 변환 전 바이트, 변환 후 바이트)
+        """
+        if codec == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                logger.warning("[MetaDB] zstandard 패키지가 없어 zlib 으로 압축합니다.")
+                codec = 'zlib'
+        cls.flush_write_behind()
+        size_before = os.path.getsize(db_path)
+        logger.info(f"[MetaDB] compress_db 시작: {codec} (DB 크기 {size_before / 1048576:.1f}MB)")
+
+        if codec in JSON_CODECS:
+            samples = []
+            rows = av_db_session.execute(text(
+                "SELECT json_data, json_zip FROM av_metadata_cache ORDER BY random() LIMIT :limit"
+            ), {'limit': sample_size}).fetchall()
+            for r_json, r_zip in rows:
+                try:
+                    samples.append(json.dumps(_load_row_json(r_json, r_zip), ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+                except Exception:
+                    continue
+            dict_data = _train_json_dict(codec, samples)
+            av_db_session.execute(text("UPDATE av_metadata_dict SET is_active = 0"))
+            new_dict = ModelAvMetadataDict(codec=codec, dict_data=dict_data, sample_count=len(samples), is_active=1)
+            av_db_session.add(new_dict)
+            av_db_session.commit()
+            logger.info(f"[MetaDB] compress_db 사전 학습 완료: #{new_dict.id} ({len(dict_data)} bytes, 샘플 {len(samples)}건)")
+        else:
+            av_db_session.execute(text("UPDATE av_metadata_dict SET is_active = 0"))
+            av_db_session.commit()
+        _load_json_codec()
+
+        total, failed, last_id = 0, 0, 0
+        while True:
+            rows = av_db_session.execute(text(
+                "SELECT id, json_data, json_zip FROM av_metadata_cache WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            values = []
+            for record_id, r_json, r_zip in rows:
+                try:
+                    data = _load_row_json(r_json, r_zip)
+                except Exception as e_row:
+                    logger.error(f"[MetaDB] compress_db 행 복원 실패 (id={record_id}): {e_row}")
+                    failed += 1
+                    continue
+                json_zip = _encode_json_zip(data)
+                values.append({
+                    'id': record_id, 'json_zip': json_zip,
+                    'json_data': json.dumps(_json_stub(data) if json_zip else data, ensure_ascii=False),
+                })
+            if values:
+                av_db_session.execute(text("UPDATE av_metadata_cache SET json_data = :json_data, json_zip = :json_zip WHERE id = :id"), values)
+            av_db_session.commit()
+            last_id = rows[-1][0]
+            total += len(values)
+            logger.debug(f"[MetaDB] compress_db 진행 중: {total}건 변환")
+
+        # 모든 행이 새 방식으로 재기록되었으면 이전 사전은 더 이상 참조되지 않음
+        if not failed:
+            av_db_session.execute(text("DELETE FROM av_metadata_dict WHERE is_active = 0"))
+            av_db_session.commit()
+        _load_json_codec()
+        cls.vacuum_db()
+        size_after = os.path.getsize(db_path)
+        logger.info(f"[MetaDB] compress_db 완료: {total}건, DB 크기 {size_before / 1048576:.1f}MB -> {size_after / 1048576:.1f}MB")
+        return total, size_before, size_after
+
+
+    @classmethod
+    def start_compress(cls, codec='zstd'):
+        """compress_db 를 백그라운드 스레드로 실행 (진행 상황은 로그로 확인)"""
+        def _worker():
+            try:
+                cls.compress_db(codec)
+            except Exception as e:
+                logger.error(f"[MetaDB] compress_db 실패: {e}")
+                logger.error(traceback.format_exc())
+                av_db_session.rollback()
+            finally:
+                av_db_session.remove()
+
+        t = threading.Thread(target=_worker, daemon=True)
+        t.start()
+
+
     @classmethod
     def merge_record(cls, category, new_data, mode='update'):
         try:
@@ -486,13 +1975,16 @@ class ModelAvMetadata(Base):
                 if existing_extras: merged_json['extras'] = existing_extras
 
                 record.originaltitle = new_data.get('originaltitle', record.originaltitle)
+                record.update_code_columns()
                 record.site = new_data.get('site', record.site)
                 record.title = new_data.get('title', record.title)
                 record.poster_url = existing_poster_url if existing_poster_url else (merged_json.get('image_url') or '')
                 record.json_data = merged_json
                 flag_modified(record, "json_data")
                 record.updated_time = datetime.now()
+                cls._fts_sync(record)
                 logger.debug(f"[MetaDB] merge_record 스마트 갱신: [{category}] {code} ({record.originaltitle})")
+                cls.invalidate_list_count()
                 return 'updated'
             else:
                 poster_url = ""
@@ -512,27 +2004,310 @@ class ModelAvMetadata(Base):
                 )
                 av_db_session.add(new_record)
                 av_db_session.flush()
+                cls._fts_sync(new_record)
                 logger.debug(f"[MetaDB] merge_record 신규 등록: [{category}] {code} ({new_record.originaltitle})")
+                cls.invalidate_list_count()
                 return 'inserted'
         except Exception as e:
             logger.error(f"[MetaDB] merge_record 에러 ({new_data.get('code')}): {e}")
             logger.error(traceback.format_exc())
+            # 실패한 flush 로 세션이 무효 상태가 되면 이후 병합/커밋이 모두 실패하므로 이 건만 되돌림
+            av_db_session.rollback()
             return 'error'
 
 
+    @classmethod
+    def _open_import_source(cls, import_path, category):
+        """
+        Import 경로를 (전체 건수, json dict 제너레이터) 로 연다. 건수를 미리 알 수 없으면 0.
+        .db/.sqlite 는 커서를 fetchmany 로, NDJSON(.gz/.zst) 은 한 줄씩 스트리밍하고, 그 외에는 .json 파일(폴더는 재귀)을 한 건씩 읽는다.
+        """
+        if os.path.isfile(import_path) and import_path.lower().endswith(NDJSON_EXTENSIONS):
+            def _iter_ndjson():
+                with cls._open_ndjson(import_path) as f:
+                    for line_no, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            row = json.loads(line)
+                        except Exception as e_row:
+                            logger.error(f"NDJSON 파싱 에러 ({import_path}:{line_no}): {e_row}")
+                            continue
+                        if 'json_data' not in row:
+                            yield row
+                        elif row.get('category', category) == category:
+                            yield row['json_data']
+            return 0, _iter_ndjson()
+
+        if os.path.isfile(import_path) and import_path.lower().endswith(('.db', '.sqlite')):
+            conn = sqlite3.connect(import_path)
+            total = conn.execute("SELECT COUNT(*) FROM av_metadata_cache WHERE category = ?", (category,)).fetchone()[0]
+
+            # 압축 저장 모드의 DB 파일이면 해당 파일의 사전으로 json_zip 을 풀어서 읽음
+            source_cols = {row[1] for row in conn.execute("PRAGMA table_info(av_metadata_cache)")}
+            zip_col = 'json_zip' if 'json_zip' in source_cols else 'NULL'
+            source_dicts = None
+            if zip_col == 'json_zip':
+                source_dicts = _parse_json_dicts(conn.execute("SELECT id, codec, dict_data FROM av_metadata_dict").fetchall())
+
+            def _iter_db():
+                try:
+                    cursor = conn.execute(f"SELECT code, json_data, {zip_col} FROM av_metadata_cache WHERE category = ?", (category,))
+                    while True:
+                        rows = cursor.fetchmany(IMPORT_BATCH_SIZE)
+                        if not rows:
+                            break
+                        for r_code, r_json, r_zip in rows:
+                            try:
+                                yield _load_row_json(r_json, r_zip, dicts=source_dicts)
+                            except Exception as e_row:
+                                logger.error(f"Row 파싱 에러 ({r_code}): {e_row}")
+                finally:
+                    conn.close()
+            return total, _iter_db()
+
+        json_files = []
+        if os.path.isfile(import_path) and import_path.lower().endswith('.json'):
+            json_files.append(import_path)
+        else:
+            for root, _, files in os.walk(import_path):
+                for f in files:
+                    if f.lower().endswith('.json'):
+                        json_files.append(os.path.join(root, f))
+
+        def _iter_json():
+            for jf in json_files:
+                try:
+                    with open(jf, 'r', encoding='utf-8') as file:
+                        yield json.load(file)
+                except Exception as e_jf:
+                    logger.error(f"JSON 파일 파싱 에러 ({jf}): {e_jf}")
+        return len(json_files), _iter_json()
+
+
+    @classmethod
+    def _prefetch_existing(cls, codes, ids_only=False):
+        """
+        병합 대상 코드의 기존 행을 IN 청크로 한 번에 조회. json_data 는 보존 대상(thumb/fanart/extras)만 추출.
+        ids_only 면 존재 여부(id)만 조회 (missing 모드는 기존 행을 건너뛰므로 내용이 필요 없음)
+        """
+        existing = {}
+        if ids_only:
+            stmt = text("SELECT id, code FROM av_metadata_cache WHERE code IN :codes").bindparams(bindparam('codes', expanding=True))
+            for i in range(0, len(codes), IMPORT_IN_CHUNK_SIZE):
+                for record_id, code in av_db_session.execute(stmt, {'codes': codes[i:i + IMPORT_IN_CHUNK_SIZE]}).fetchall():
+                    existing[code] = {'id': record_id}
+            return existing
+        preserve_cols = ', '.join(
+            f"CASE WHEN json_zip IS NULL AND json_valid(json_data) THEN json_quote(json_extract(json_data, '$.{key}')) END"
+            for key in IMPORT_PRESERVE_KEYS
+        )
+        stmt = text(
+            f"SELECT id, code, category, originaltitle, site, title, poster_url, json_zip, "
+            f"sort_key, code_norm, code_label, code_number, {preserve_cols} "
+            f"FROM av_metadata_cache WHERE code IN :codes"
+        ).bindparams(bindparam('codes', expanding=True))
+        for i in range(0, len(codes), IMPORT_IN_CHUNK_SIZE):
+            for row in av_db_session.execute(stmt, {'codes': codes[i:i + IMPORT_IN_CHUNK_SIZE]}).fetchall():
+                record_id, code, category, originaltitle, site, title, poster_url, json_zip, sort_key, code_norm, code_label, code_number = row[:12]
+                preserved = {}
+                if json_zip:
+                    # 압축 저장 행은 SQL 로 추출할 수 없으므로 원본을 풀어서 보존 키를 꺼냄
+                    full = _decode_json_zip(json_zip)
+                    preserved = {key: full.get(key) for key in IMPORT_PRESERVE_KEYS}
+                for key, raw in zip(IMPORT_PRESERVE_KEYS, row[12:]):
+                    if json_zip:
+                        break
+                    try:
+                        preserved[key] = json.loads(raw) if raw else None
+                    except Exception:
+                        preserved[key] = None
+                existing[code] = {
+                    'id': record_id, 'category': category, 'originaltitle': originaltitle, 'site': site,
+                    'title': title, 'poster_url': poster_url, 'preserved': preserved,
+                    'code_columns': {'sort_key': sort_key, 'code_norm': code_norm, 'code_label': code_label, 'code_number': code_number},
+                }
+        return existing
+
+
+    @classmethod
+    def _bulk_upsert_batch(cls, category, items, mode, fts_stale_ids):
+        """
+        merge_record 와 같은 규칙(기존 thumb/fanart/extras/poster_url 보존, missing 모드 스킵)을
+        배치 단위로 적용하여 INSERT ... ON CONFLICT DO UPDATE 를 executemany 로 실행. 커밋은 호출측에서.
+        FTS 는 갱신하지 않고 내용이 바뀐 기존 행 id 를 fts_stale_ids 에 모음 (신규 행은 색인 스레드가 미색인 행으로 찾음)
+        """
+        counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+        existing = cls._prefetch_existing(list({item['code'] for item in items}), ids_only=(mode == 'missing'))
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')
+        upserts = {}
+
+        for new_data in items:
+            code = new_data['code']
+            current = existing.get(code)
+            if current:
+                if mode == 'missing':
+                    counts['skipped'] += 1
+                    continue
+                merged_json = dict(new_data)
+                for key in IMPORT_PRESERVE_KEYS:
+                    if current['preserved'].get(key):
+                        merged_json[key] = current['preserved'][key]
+                row_category = current['category']
+                originaltitle = new_data.get('originaltitle') or current['originaltitle']
+                site = new_data.get('site') or current['site']
+                title = new_data.get('title', current['title']) or ''
+                poster_url = current['poster_url'] or (merged_json.get('image_url') or '')
+                # 파생 품번 컬럼은 originaltitle 이 그대로면 기존 값 재사용
+                code_columns = current['code_columns'] if originaltitle == current['originaltitle'] else None
+                counts['updated'] += 1
+            else:
+                merged_json = new_data
+                row_category = category
+                originaltitle = new_data.get('originaltitle') or code
+                site = new_data.get('site') or 'unknown'
+                title = new_data.get('title') or ''
+                poster_url = ''
+                for thumb in new_data.get('thumb', []):
+                    if isinstance(thumb, dict) and thumb.get('aspect') == 'poster':
+                        poster_url = thumb.get('value', '')
+                        break
+                code_columns = None
+                counts['inserted'] += 1
+
+            json_zip = _encode_json_zip(merged_json)
+            params = {
+                'category': row_category, 'code': code, 'originaltitle': originaltitle, 'site': site, 'title': title,
+                'poster_url': poster_url, 'json_data': json.dumps(_json_stub(merged_json) if json_zip else merged_json, ensure_ascii=False),
+                'json_zip': json_zip, 'created_time': now, 'updated_time': now,
+            }
+            code_columns = code_columns or cls.code_columns(row_category, originaltitle)
+            params.update(code_columns)
+            params.update(cls.summary_columns(merged_json))
+            upserts[code] = params
+            # 같은 배치 안의 중복 코드는 앞선 행을 기존 레코드로 보고 순차 병합
+            existing[code] = {
+                'id': current.get('id') if current else None, 'category': row_category, 'originaltitle': originaltitle, 'site': site, 'title': title,
+                'poster_url': poster_url, 'preserved': {key: merged_json.get(key) for key in IMPORT_PRESERVE_KEYS},
+                'code_columns': code_columns,
+            }
+
+        if upserts:
+            # 대량 executemany 는 세션 트랜잭션의 DBAPI 커서로 직접 실행 (파라미터 컴파일 오버헤드 제거)
+            cursor = av_db_session.connection().connection.cursor()
+            try:
+                cursor.executemany(IMPORT_UPSERT_SQL, list(upserts.values()))
+            finally:
+                cursor.close()
+            fts_stale_ids.update(existing[code]['id'] for code in upserts if existing[code].get('id'))
+        return counts
+
+
+    @classmethod
+    def bulk_import(cls, category, import_paths, mode='update', log_name='MetaDB'):
+        """
+        db_import 공용 엔진. 소스를 스트리밍하며 IMPORT_BATCH_SIZE 단위로 기존 코드 선조회 + 일괄 upsert + 커밋.
+        배치가 실패하면 롤백 후 해당 배치만 merge_record 로 한 건씩 재처리한다 (건별 커밋, 실패한 건만 건너뜀).
+        그 밖의 예외는 세션을 롤백한 뒤 그대로 올림. FTS 는 가져오기가 끝난 뒤 백그라운드에서 한 번에 색인 (그동안 조회는 LIKE).
+        반환: {'inserted', 'updated', 'skipped', 'total', 'elapsed', 'rows_per_sec'}
+        """
+        stats = {'inserted': 0, 'updated': 0, 'skipped': 0, 'total': 0}
+        cls.flush_write_behind()
+        start_time = time.time()
+
+        def _apply(batch):
+            try:
+                counts = cls._bulk_upsert_batch(category, batch, mode, fts_stale_ids)
+                av_db_session.commit()
+                cls.invalidate_metadata_cache([data.get('code') for data in batch])
+            except Exception as e_batch:
+                logger.warning(f"[{log_name}] 일괄 병합 실패, 건별 병합으로 재시도 ({len(batch)}건): {e_batch}")
+                av_db_session.rollback()
+                counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+                for data in batch:
+                    res = cls.merge_record(category, data, mode=mode)
+                    if res in ('inserted', 'updated'):
+                        # 갱신 건은 커밋 시점에 flush 되므로 커밋 실패도 해당 건만 롤백
+                        try:
+                            av_db_session.commit()
+                        except Exception as e_row:
+                            logger.error(f"[{log_name}] 건별 병합 커밋 실패 ({data.get('code')}): {e_row}")
+                            av_db_session.rollback()
+                            res = 'error'
+                    key = res if res in ('inserted', 'updated') else 'skipped'
+                    counts[key] += 1
+                cls.invalidate_metadata_cache([data.get('code') for data in batch])
+            for key, value in counts.items():
+                stats[key] += value
+
+        # 가져오는 동안 FTS 는 갱신하지 않음: 조회는 LIKE 로 돌리고, 끝난 뒤 바뀐 행/신규 행을 백그라운드에서 한 번에 색인
+        fts_stale_ids = set()
+        if _fts_enabled:
+            _hold_fts_reads()
+        try:
+            for import_path in import_paths:
+                if not os.path.exists(import_path):
+                    logger.warning(f"[{log_name}] Import 경로 없음: {import_path}")
+                    continue
+                try:
+                    total, source = cls._open_import_source(import_path, category)
+                except Exception as e_src:
+                    logger.error(f"[{log_name}] Import 소스 열기 실패 ({import_path}): {e_src}")
+                    continue
+                logger.info(f"[{log_name}] {total or '?'}개 레코드 병합 시작 -> {import_path}")
+
+                batch, processed = [], 0
+                for data in source:
+                    processed += 1
+                    if not isinstance(data, dict) or not data.get('code'):
+                        logger.warning(f"[{log_name}] 'code' 필드 누락으로 스킵")
+                        stats['skipped'] += 1
+                        continue
+                    batch.append(data)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        _apply(batch)
+                        batch = []
+                        elapsed = time.time() - start_time
+                        progress = f"{processed}/{total} ({(processed / total) * 100:.1f}%)" if total > 0 else f"{processed}건"
+                        logger.info(
+                            f"[{log_name}] DB Import 진행 중: {progress} | "
+                            f"신규: {stats['inserted']}, 갱신: {stats['updated']}, 스킵: {stats['skipped']} | "
+                            f"{(stats['total'] + processed) / elapsed if elapsed > 0 else 0:.0f}건/초"
+                        )
+                if batch:
+                    _apply(batch)
+                stats['total'] += processed
+                logger.info(f"[{log_name}] DB Import 진행 중: {processed}/{total or processed} (100.0%) | 최종 커밋 완료")
+        except Exception:
+            av_db_session.rollback()
+            raise
+        finally:
+            if _fts_enabled:
+                _start_fts_backfill(fts_stale_ids)
+
+        cls.invalidate_list_count()
+        stats['elapsed'] = time.time() - start_time
+        stats['rows_per_sec'] = stats['total'] / stats['elapsed'] if stats['elapsed'] > 0 else 0
+        logger.info(f"[{log_name}] DB Import 완료: {stats['total']}건, {stats['elapsed']:.1f}초 ({stats['rows_per_sec']:.0f}건/초)")
+        return stats
+
+
+    @staticmethod
+    def _parse_user_image_filename(filename):
+        """유저 이미지 파일명 -> (파일명, aspect, 품번 stem). _pl(_user) 이면 landscape, 그 외 poster"""
+        clean_name = os.path.basename(filename).strip()
+        if '_pl_user.' in clean_name.lower() or '_pl.' in clean_name.lower():
+            return clean_name, 'landscape', re.split(r'_pl(?:_user)?\.', clean_name, flags=re.I)[0]
+        return clean_name, 'poster', re.split(r'_p(?:_user)?\.', clean_name, flags=re.I)[0]
+
+
     @classmethod
     def update_user_image_by_filename(cls, filename):
         try:
-            clean_name = os.path.basename(filename).strip()
+            cls.flush_write_behind()
+            clean_name, target_aspect, stem = cls._parse_user_image_filename(filename)
             logger.debug(f"[MetaDB] update_user_image_by_filename 시작: {clean_name}")
 
-            if '_pl_user.' in clean_name.lower() or '_pl.' in clean_name.lower():
-                target_aspect = 'landscape'
-                stem = re.split(r'_pl(?:_user)?\.', clean_name, flags=re.I)[0]
-            else:
-                target_aspect = 'poster'
-                stem = re.split(r'_p(?:_user)?\.', clean_name, flags=re.I)[0]
-
             if not stem:
                 logger.warning(f"[MetaDB] 파일명에서 품번(stem) 추출 실패: {clean_name}")
                 return 'skipped', None, f"품번 추출 실패: {clean_name}"
@@ -552,285 +2327,1394 @@ class ModelAvMetadata(Base):
                 logger.debug(f"[MetaDB] 유저 이미지 매칭 실패 (DB에 레코드 없음): stem='{stem}' ({clean_name})")
                 return 'not_found', None, f"DB 레코드 없음: {stem}"
 
-            jd = copy.deepcopy(record.json_data) if record.json_data else {}
-            thumbs = jd.get('thumb', [])
-            if not isinstance(thumbs, list):
-                thumbs = []
-
-            is_already_set = False
-            for thumb in thumbs:
-                if isinstance(thumb, dict) and thumb.get('aspect') == target_aspect:
-                    val = thumb.get('value', '')
-                    if val and (val.endswith(f"/{clean_name}") or val == clean_name):
-                        is_already_set = True
-                        break
+            result = cls._apply_user_image(record, clean_name, target_aspect)
+            if result[0] == 'updated':
+                cls.invalidate_list_count()
+            return result
 
-            if target_aspect == 'poster' and record.poster_url:
-                if not (record.poster_url.endswith(f"/{clean_name}") or record.poster_url == clean_name):
-                    is_already_set = False
-
-            if is_already_set:
-                logger.debug(f"[MetaDB] 유저 이미지 이미 적용됨 (스킵): {record.code} [{target_aspect}] -> {clean_name}")
-                return 'already', record.code, {
-                    'code': record.code,
-                    'originaltitle': record.originaltitle,
-                    'category': record.category,
-                    'type': target_aspect,
-                    'file': clean_name,
-                    'status': 'already_applied'
-                }
+        except Exception as e:
+            logger.error(f"[MetaDB] update_user_image_by_filename 에러 ({filename}): {e}")
+            logger.error(traceback.format_exc())
+            return 'error', None, str(e)
 
-            new_image_url = None
-            updated_thumb = False
-            for thumb in thumbs:
-                if isinstance(thumb, dict) and thumb.get('aspect') == target_aspect:
-                    old_url = thumb.get('value', '')
-                    if old_url and '/' in old_url:
-                        new_image_url = f"{old_url.rsplit('/', 1)[0]}/{clean_name}"
-                        thumb['value'] = new_image_url
-                        updated_thumb = True
-                        break
 
-            if not updated_thumb:
-                base_dir = record.poster_url.rsplit('/', 1)[0] if (record.poster_url and '/' in record.poster_url) else ""
-                new_image_url = f"{base_dir}/{clean_name}" if base_dir else clean_name
-                thumbs.append({
-                    'aspect': target_aspect,
-                    'value': new_image_url,
-                    'thumb': '',
-                    'site': record.site or '',
-                    'score': 0
-                })
+    @classmethod
+    def update_user_images_by_filenames(cls, filenames):
+        """
+        update_user_image_by_filename 의 일괄 버전. 입력 순서대로 (filename, res, code, detail) 목록을 반환.
+        모든 파일명의 품번을 먼저 파싱해 청크 단위 IN 조회(정규화 품번 / code / poster_file 인덱스)로 레코드를 찾고,
+        매칭 규칙(originaltitle·code 대소문자 무시 일치 -> poster_url 파일명 일치)은 단건과 동일. 갱신은 한 트랜잭션으로 커밋
+        """
+        cls.flush_write_behind()
+        results = []
+        parsed = []
+        for filename in filenames:
+            if not filename or not isinstance(filename, str):
+                continue
+            parsed.append((filename,) + cls._parse_user_image_filename(filename))
+
+        stems = {stem.lower() for _, _, _, stem in parsed if stem}
+        by_stem, by_file = {}, {}
+        try:
+            # 정규화 품번은 (category, code_norm) 인덱스를 타도록 카테고리 목록을 함께 지정
+            categories = [row[0] for row in av_db_session.query(cls.category).distinct()]
+            norms = list({cls.normalize_code(stem) for stem in stems} - {''})
+            # code 는 unique 인덱스 (대소문자 구분) 이므로 원본/소문자/대문자 표기로 조회
+            codes = list({variant for _, _, _, stem in parsed if stem for variant in (stem, stem.lower(), stem.upper())})
+            candidates = {}
+            for i in range(0, len(norms), IMPORT_IN_CHUNK_SIZE):
+                for record in av_db_session.query(cls).filter(cls.category.in_(categories), cls.code_norm.in_(norms[i:i + IMPORT_IN_CHUNK_SIZE])):
+                    candidates[record.id] = record
+            for i in range(0, len(codes), IMPORT_IN_CHUNK_SIZE):
+                for record in av_db_session.query(cls).filter(cls.code.in_(codes[i:i + IMPORT_IN_CHUNK_SIZE])):
+                    candidates[record.id] = record
+            for record in sorted(candidates.values(), key=lambda r: r.id):
+                for value in {(record.originaltitle or '').lower(), (record.code or '').lower()} & stems:
+                    by_stem.setdefault(value, record)
+
+            missing = list({clean_name.replace('_user', '').lower() for _, clean_name, _, stem in parsed if stem and stem.lower() not in by_stem})
+            for i in range(0, len(missing), IMPORT_IN_CHUNK_SIZE):
+                for record in av_db_session.query(cls).filter(cls.poster_file.in_(missing[i:i + IMPORT_IN_CHUNK_SIZE])).order_by(cls.id):
+                    if record.poster_url and '/' in record.poster_url:
+                        by_file.setdefault(record.poster_file, record)
+        except Exception as e:
+            logger.error(f"[MetaDB] 유저 이미지 일괄 조회 에러: {e}")
+            logger.error(traceback.format_exc())
+            av_db_session.rollback()
+            return [(filename, 'error', None, str(e)) for filename, _, _, _ in parsed]
+
+        updated = 0
+        for filename, clean_name, target_aspect, stem in parsed:
+            if not stem:
+                logger.warning(f"[MetaDB] 파일명에서 품번(stem) 추출 실패: {clean_name}")
+                results.append((filename, 'skipped', None, f"품번 추출 실패: {clean_name}"))
+                continue
+            record = by_stem.get(stem.lower()) or by_file.get(clean_name.replace('_user', '').lower())
+            if not record:
+                logger.debug(f"[MetaDB] 유저 이미지 매칭 실패 (DB에 레코드 없음): stem='{stem}' ({clean_name})")
+                results.append((filename, 'not_found', None, f"DB 레코드 없음: {stem}"))
+                continue
+            try:
+                res, code, detail = cls._apply_user_image(record, clean_name, target_aspect)
+            except Exception as e:
+                logger.error(f"[MetaDB] update_user_image_by_filename 에러 ({filename}): {e}")
+                res, code, detail = 'error', None, str(e)
+            if res == 'updated':
+                updated += 1
+            results.append((filename, res, code, detail))
+
+        if updated:
+            try:
+                av_db_session.commit()
+                cls.invalidate_list_count()
+            except Exception as e:
+                logger.error(f"[MetaDB] 유저 이미지 일괄 커밋 에러: {e}")
+                logger.error(traceback.format_exc())
+                av_db_session.rollback()
+                results = [(f, 'error', None, str(e)) if res == 'updated' else (f, res, code, detail) for f, res, code, detail in results]
+        logger.info(f"[MetaDB] 유저 이미지 일괄 처리: {len(parsed)}개 파일, 레코드 후보 {len(by_stem) + len(by_file)}개, 갱신 {updated}개")
+        return results
 
-            jd['thumb'] = thumbs
 
-            if target_aspect == 'poster' and new_image_url:
-                record.poster_url = new_image_url
+    @classmethod
+    def _apply_user_image(cls, record, clean_name, target_aspect):
+        """레코드의 thumb/poster_url 을 유저 이미지로 교체 (커밋은 호출부). 이미 적용된 경우 'already'"""
+        jd = copy.deepcopy(record.json_data) if record.json_data else {}
+        thumbs = jd.get('thumb', [])
+        if not isinstance(thumbs, list):
+            thumbs = []
+
+        is_already_set = False
+        for thumb in thumbs:
+            if isinstance(thumb, dict) and thumb.get('aspect') == target_aspect:
+                val = thumb.get('value', '')
+                if val and (val.endswith(f"/{clean_name}") or val == clean_name):
+                    is_already_set = True
+                    break
 
-            record.json_data = jd
-            flag_modified(record, "json_data")
-            record.updated_time = datetime.now()
+        if target_aspect == 'poster' and record.poster_url:
+            if not (record.poster_url.endswith(f"/{clean_name}") or record.poster_url == clean_name):
+                is_already_set = False
 
-            logger.info(f"[MetaDB] 유저 이미지 갱신 성공: [{record.category}] {record.code} ({record.originaltitle}) [{target_aspect}] -> {clean_name}")
-            return 'updated', record.code, {
+        if is_already_set:
+            logger.debug(f"[MetaDB] 유저 이미지 이미 적용됨 (스킵): {record.code} [{target_aspect}] -> {clean_name}")
+            return 'already', record.code, {
                 'code': record.code,
                 'originaltitle': record.originaltitle,
                 'category': record.category,
                 'type': target_aspect,
                 'file': clean_name,
-                'url': new_image_url
+                'status': 'already_applied'
             }
 
+        new_image_url = None
+        updated_thumb = False
+        for thumb in thumbs:
+            if isinstance(thumb, dict) and thumb.get('aspect') == target_aspect:
+                old_url = thumb.get('value', '')
+                if old_url and '/' in old_url:
+                    new_image_url = f"{old_url.rsplit('/', 1)[0]}/{clean_name}"
+                    thumb['value'] = new_image_url
+                    updated_thumb = True
+                    break
+
+        if not updated_thumb:
+            base_dir = record.poster_url.rsplit('/', 1)[0] if (record.poster_url and '/' in record.poster_url) else ""
+            new_image_url = f"{base_dir}/{clean_name}" if base_dir else clean_name
+            thumbs.append({
+                'aspect': target_aspect,
+                'value': new_image_url,
+                'thumb': '',
+                'site': record.site or '',
+                'score': 0
+            })
+
+        jd['thumb'] = thumbs
+
+        if target_aspect == 'poster' and new_image_url:
+            record.poster_url = new_image_url
+
+        record.json_data = jd
+        flag_modified(record, "json_data")
+        record.updated_time = datetime.now()
+        config = cls._image_cleanup_config(record.category)
+        user_path = ModelAvImageFile.url_to_path(new_image_url, config) if config else None
+        if user_path:
+            ModelAvImageFile.record_files(record.category, record.code, [user_path])
+
+        logger.info(f"[MetaDB] 유저 이미지 갱신 성공: [{record.category}] {record.code} ({record.originaltitle}) [{target_aspect}] -> {clean_name}")
+        return 'updated', record.code, {
+            'code': record.code,
+            'originaltitle': record.originaltitle,
+            'category': record.category,
+            'type': target_aspect,
+            'file': clean_name,
+            'url': new_image_url
+        }
+
+
+    @classmethod
+    def _find_image_candidates(cls, manifest_ready, code, kind, folder, file_stem):
+        """
+        folder 안의 품번 이미지 파일 후보 [(path, is_user)] (유저 이미지 우선). kind: 'p' | 'pl'
+        매니페스트가 준비되어 있으면 인덱스에서 찾고, 아니면 확장자별 존재 여부를 확인
+        """
+        if manifest_ready:
+            return [(r.path, r.is_user) for r in ModelAvImageFile.find(code, IMAGE_ASPECTS[kind], folder=folder)]
+        candidates = []
+        names = [(f"{file_stem}_{kind}_user.jpg", 1)] + [(f"{file_stem}_{kind}.{ext}", 0) for ext in ('jpg', 'jpeg', 'png', 'webp')]
+        for name, is_user in names:
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                candidates.append((path, is_user))
+        return candidates
+
+
+    @classmethod
+    def save_user_cropped_poster(cls, code, crop_data_or_base64, pl_image_base64_data=None, p_image_base64_data=None):
+        """
+        웹 에디터에서 전송된 이미지/좌표를 검사하고 24비트 표준 RGB JPEG(_p_user.jpg, _pl_user.jpg)로 정규화 변환하여 저장 (동기 처리)
+        """
+        try:
+            cls.flush_write_behind()
+            ctx, error = cls._prepare_user_crop(code, crop_data_or_base64, pl_image_base64_data, p_image_base64_data)
+            if ctx is None:
+                return False, error
+            return True, cls._run_user_crop(ctx)
+
         except Exception as e:
-            logger.error(f"[MetaDB] update_user_image_by_filename 에러 ({filename}): {e}")
+            logger.error(f"[MetaDB] save_user_cropped_poster 실패 ({code}): {e}")
             logger.error(traceback.format_exc())
-            return 'error', None, str(e)
+            av_db_session.rollback()
+            return False, str(e)
 
 
     @classmethod
-    def save_user_cropped_poster(cls, code, crop_data_or_base64, pl_image_base64_data=None, p_image_base64_data=None):
+    def start_user_crop(cls, code, crop_data_or_base64, pl_image_base64_data=None, p_image_base64_data=None):
         """
-        웹 에디터에서 전송된 이미지/좌표를 검사하고 24비트 표준 RGB JPEG(_p_user.jpg, _pl_user.jpg)로 정규화 변환하여 저장
+        save_user_cropped_poster 의 백그라운드 버전. 요청 스레드에서는 저장 경로/URL 만 결정하고
+        디코딩·크롭·인코딩·DB 갱신은 크기 제한이 있는 워커 풀에서 처리.
+        반환: (성공 여부, {'job_id', 'new_url', 'thumb_url'} | 오류 메시지). 진행 상태는 get_crop_job(job_id)
         """
+        global _crop_executor
         try:
-            import base64
-            from io import BytesIO
-            from PIL import Image
+            cls.flush_write_behind()
+            ctx, error = cls._prepare_user_crop(code, crop_data_or_base64, pl_image_base64_data, p_image_base64_data)
+            if ctx is None:
+                return False, error
+        except Exception as e:
+            logger.error(f"[MetaDB] start_user_crop 실패 ({code}): {e}")
+            logger.error(traceback.format_exc())
+            return False, str(e)
 
-            record = av_db_session.query(cls).filter_by(code=code).first()
-            if not record:
-                return False, '해당 품번의 DB 레코드를 찾을 수 없습니다.'
-
-            code_lower = code.lower()
-            module_name = 'western' if record.category == 'WEST' else ('jav_censored' if record.category == 'CEN' else 'jav_uncensored')
-            local_root = P.ModelSetting.get(f"{module_name}_image_server_local_path") or P.ModelSetting.get('jav_censored_image_server_local_path')
-            server_url = P.ModelSetting.get(f"{module_name}_image_server_url") or P.ModelSetting.get('jav_censored_image_server_url')
-
-            if not local_root or not server_url:
-                return False, '이미지 서버 로컬 경로 또는 URL 설정이 비어있습니다.'
-
-            safe_studio = re.sub(r'[^A-Za-z0-9]', '_', record.json_data.get('studio', '')) or 'Unknown'
-            first_char = safe_studio[0].upper() if safe_studio else 'ETC'
-            if first_char.isdigit():
-                first_char = '09'
-
-            save_format = P.ModelSetting.get(f"{module_name}_image_server_save_format") or "/western/{studio_1}/{studio}"
-            format_map = {'studio': safe_studio, 'studio_1': first_char, 'label': safe_studio, 'label_1': first_char}
-            rel_dir = save_format.format_map(format_map).strip('/\\')
-
-            target_folder = os.path.join(local_root, rel_dir)
-            server_url_prefix = f"{server_url.rstrip('/')}/{rel_dir}".rstrip('/')
-            os.makedirs(target_folder, exist_ok=True)
-
-            # [Plex 호환성 보장] 모든 이미지를 24비트 표준 RGB JPEG로 강제 정규화하여 저장하는 헬퍼
-            def save_normalized_jpeg(pil_img, save_filepath):
-                if pil_img.mode not in ('RGB', 'L'):
-                    rgb_converted = pil_img.convert('RGB')
-                    rgb_converted.save(save_filepath, 'JPEG', quality=95, optimize=True)
-                    rgb_converted.close()
-                else:
-                    pil_img.save(save_filepath, 'JPEG', quality=95, optimize=True)
+        import uuid
+        from concurrent.futures import ThreadPoolExecutor
+        with _crop_lock:
+            pending = [job for job in _crop_jobs.values() if job['status'] in ('queued', 'running')]
+            if any(job['code'] == code for job in pending):
+                return False, '같은 품번의 이미지 처리 작업이 진행 중입니다.'
+            if len(pending) >= USER_CROP_MAX_PENDING:
+                return False, f'이미지 처리 대기열이 가득 찼습니다 ({len(pending)}건). 잠시 후 다시 시도하세요.'
+            job = {
+                'job_id': uuid.uuid4().hex[:12], 'code': code, 'status': 'queued', 'msg': '',
+                'new_url': ctx['new_url'], 'thumb_url': ctx['thumb_url'],
+                'created_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'elapsed_ms': 0,
+            }
+            _crop_jobs[job['job_id']] = job
+            for job_id in [k for k, v in _crop_jobs.items() if v['status'] in ('done', 'failed')][:max(0, len(_crop_jobs) - USER_CROP_JOB_KEEP)]:
+                del _crop_jobs[job_id]
+            if _crop_executor is None:
+                _crop_executor = ThreadPoolExecutor(max_workers=USER_CROP_WORKERS, thread_name_prefix='av_crop')
+            _crop_executor.submit(cls._crop_job_worker, job, ctx)
 
-            # 1. 크롭 대상 소스 이미지 확보
-            src_img = None
-            source_type = 'pl'
-            try:
-                if isinstance(crop_data_or_base64, str) and crop_data_or_base64.startswith('{'):
-                    crop_info_tmp = json.loads(crop_data_or_base64)
-                    if isinstance(crop_info_tmp, dict) and crop_info_tmp.get('source_type'):
-                        source_type = str(crop_info_tmp['source_type']).lower()
-            except Exception:
-                pass
+        logger.info(f"[MetaDB] 포스터 처리 작업 등록: [{code}] job={job['job_id']} (대기 {len(pending) + 1}건)")
+        return True, {'job_id': job['job_id'], 'new_url': job['new_url'], 'thumb_url': job['thumb_url']}
 
-            # (Case 1) 사용자가 세로 포스터(P)를 직접 업로드한 경우
-            if p_image_base64_data:
-                raw_b64 = p_image_base64_data.split(',', 1)[1] if ',' in p_image_base64_data else p_image_base64_data
-                src_img = Image.open(BytesIO(base64.b64decode(raw_b64)))
-
-            # (Case 2) 사용자가 가로 커버(PL)를 직접 업로드한 경우
-            elif pl_image_base64_data:
-                raw_b64 = pl_image_base64_data.split(',', 1)[1] if ',' in pl_image_base64_data else pl_image_base64_data
-                src_img = Image.open(BytesIO(base64.b64decode(raw_b64)))
-
-                user_pl_path = os.path.join(target_folder, f"{file_stem}_pl_user.jpg")
-                save_normalized_jpeg(src_img, user_pl_path)
-
-                for ext_cand in ['jpg', 'jpeg', 'png', 'webp']:
-                    old_pl = os.path.join(target_folder, f"{file_stem}_pl.{ext_cand}")
-                    if os.path.exists(old_pl):
-                        try: os.remove(old_pl)
-                        except Exception: pass
-
-            # (Case 3) 소스가 P(세로 포스터)로 선택된 경우
-            elif source_type == 'p':
-                for candidate_name in [f"{file_stem}_p_user.jpg", f"{file_stem}_p.jpg", f"{file_stem}_p.png", f"{file_stem}_p.webp"]:
-                    cand_path = os.path.join(target_folder, candidate_name)
-                    if os.path.exists(cand_path):
-                        src_img = Image.open(cand_path)
-                        break
-                if src_img is None and record.poster_url and record.poster_url.startswith('http'):
-                    from support_site import SiteAvBase
-                    src_img = SiteAvBase.imopen(record.poster_url)
 
-            # (Case 4) 소스가 PL(가로 커버)인 경우 (기본값)
+    @classmethod
+    def get_crop_job(cls, job_id):
+        with _crop_lock:
+            job = _crop_jobs.get(job_id or '')
+            return dict(job) if job else None
+
+
+    @classmethod
+    def _crop_job_worker(cls, job, ctx):
+        start = time.time()
+        job['status'] = 'running'
+        try:
+            cls._run_user_crop(ctx)
+            job['status'] = 'done'
+            job['msg'] = '포스터(_p_user)가 저장되었습니다.'
+        except Exception as e:
+            logger.error(f"[MetaDB] 포스터 처리 작업 실패 ({job['code']}): {e}")
+            logger.error(traceback.format_exc())
+            av_db_session.rollback()
+            job['status'] = 'failed'
+            job['msg'] = str(e)
+        finally:
+            av_db_session.remove()
+            job['elapsed_ms'] = round((time.time() - start) * 1000)
+
+
+    @classmethod
+    def _prepare_user_crop(cls, code, crop_data_or_base64, pl_image_base64_data=None, p_image_base64_data=None):
+        """레코드 확인 및 저장 폴더/파일명/URL 결정 (이미지 처리 없음). 반환: (작업 컨텍스트 | None, 오류 메시지)"""
+        record = av_db_session.query(cls).filter_by(code=code).first()
+        if not record:
+            return None, '해당 품번의 DB 레코드를 찾을 수 없습니다.'
+
+        module_name = 'western' if record.category == 'WEST' else ('jav_censored' if record.category == 'CEN' else 'jav_uncensored')
+        local_root = P.ModelSetting.get(f"{module_name}_image_server_local_path") or P.ModelSetting.get('jav_censored_image_server_local_path')
+        server_url = P.ModelSetting.get(f"{module_name}_image_server_url") or P.ModelSetting.get('jav_censored_image_server_url')
+
+        if not local_root or not server_url:
+            return None, '이미지 서버 로컬 경로 또는 URL 설정이 비어있습니다.'
+
+        safe_studio = re.sub(r'[^A-Za-z0-9]', '_', record.json_data.get('studio', '')) or 'Unknown'
+        first_char = safe_studio[0].upper() if safe_studio else 'ETC'
+        if first_char.isdigit():
+            first_char = '09'
+
+        save_format = P.ModelSetting.get(f"{module_name}_image_server_save_format") or "/western/{studio_1}/{studio}"
+        format_map = {'studio': safe_studio, 'studio_1': first_char, 'label': safe_studio, 'label_1': first_char}
+        rel_dir = save_format.format_map(format_map).strip('/\\')
+        server_url_prefix = f"{server_url.rstrip('/')}/{rel_dir}".rstrip('/')
+
+        # 파일명 기준 (기존 포스터 파일명 우선, 없으면 품번)
+        file_stem = None
+        if record.poster_url:
+            parsed_fname = os.path.basename(urlparse(record.poster_url).path)
+            if parsed_fname:
+                stem_match = re.split(r'_(?:p|pl)(?:_user)?\.', parsed_fname, flags=re.I)
+                if stem_match and stem_match[0]:
+                    file_stem = stem_match[0].lower()
+
+        if not file_stem:
+            if record.category == 'WEST':
+                file_stem = record.code.lower()
             else:
-                for candidate_name in [f"{file_stem}_pl_user.jpg", f"{file_stem}_pl.jpg", f"{file_stem}_pl.png", f"{file_stem}_pl.webp"]:
-                    cand_path = os.path.join(target_folder, candidate_name)
-                    if os.path.exists(cand_path):
-                        src_img = Image.open(cand_path)
-                        break
+                ui_code_val = record.json_data.get('ui_code') if isinstance(record.json_data, dict) else None
+                file_stem = (ui_code_val or record.originaltitle or record.code).lower()
 
-            # (Case 5) 디스크에 없으면 원격 URL에서 로드
-            if src_img is None:
-                target_url = None
-                if source_type == 'p':
-                    target_url = record.poster_url
-                else:
-                    for t in (record.json_data.get('thumb') or []):
-                        if isinstance(t, dict) and t.get('aspect') == 'landscape':
-                            target_url = t.get('value')
-                            break
-                    if not target_url and record.json_data.get('fanart'):
-                        target_url = record.json_data['fanart'][0]
-                    if not target_url:
-                        target_url = record.poster_url
+        crop_info = None
+        try:
+            if isinstance(crop_data_or_base64, str) and crop_data_or_base64.startswith('{'):
+                crop_info = json.loads(crop_data_or_base64)
+        except Exception as e_parse:
+            logger.debug(f"[MetaDB] 좌표 파싱 실패 -> 원본 폴백: {e_parse}")
+        crop_info = crop_info if isinstance(crop_info, dict) else {}
 
-                if target_url and target_url.startswith('http'):
-                    from support_site import SiteAvBase
-                    src_img = SiteAvBase.imopen(target_url)
+        return {
+            'code': record.code,
+            'target_folder': os.path.join(local_root, rel_dir),
+            'file_stem': file_stem,
+            'manifest_ready': bool(P.ModelSetting.get(f"{module_name}_image_manifest_time")),
+            'source_type': str(crop_info.get('source_type') or 'pl').lower(),
+            'crop_info': crop_info,
+            'pl_base64': pl_image_base64_data,
+            'p_base64': p_image_base64_data,
+            'new_url': f"{server_url_prefix}/{file_stem}_p_user.jpg",
+            'new_pl_url': f"{server_url_prefix}/{file_stem}_pl_user.jpg",
+            'thumb_url': f"{server_url_prefix}/{file_stem}_p_user_thumb.jpg",
+        }, None
+
+
+    @staticmethod
+    def _crop_box(crop_info, size):
+        """에디터 좌표(원본 해상도 기준)를 이미지 크기 안으로 제한한 crop box 로 변환. 좌표가 없으면 None"""
+        if not crop_info or 'width' not in crop_info or 'height' not in crop_info:
+            return None
+        img_w, img_h = size
+        cx = max(0, int(round(crop_info.get('x', 0))))
+        cy = max(0, int(round(crop_info.get('y', 0))))
+        cw = min(int(round(crop_info['width'])), img_w - cx)
+        ch = min(int(round(crop_info['height'])), img_h - cy)
+        return (cx, cy, cx + cw, cy + ch)
 
-            if src_img is None:
-                return False, '처리할 원본 이미지를 찾을 수 없습니다.'
 
-            # 2. 정밀 좌표 기반 무손실 크롭 수행
-            cropped_p_img = None
-            try:
-                crop_info = json.loads(crop_data_or_base64) if isinstance(crop_data_or_base64, str) and crop_data_or_base64.startswith('{') else None
-                if crop_info and 'width' in crop_info and 'height' in crop_info:
-                    rotate_angle = crop_info.get('rotate', 0)
-                    working_img = src_img
-                    if rotate_angle != 0:
-                        working_img = src_img.rotate(-rotate_angle, expand=True)
-
-                    img_w, img_h = working_img.size
-                    cx = max(0, int(round(crop_info['x'])))
-                    cy = max(0, int(round(crop_info['y'])))
-                    cw = min(int(round(crop_info['width'])), img_w - cx)
-                    ch = min(int(round(crop_info['height'])), img_h - cy)
-
-                    cropped_p_img = working_img.crop((cx, cy, cx + cw, cy + ch))
-            except Exception as e_parse:
-                logger.debug(f"[MetaDB] 좌표 파싱 실패 -> 원본 폴백: {e_parse}")
-
-            if cropped_p_img is None:
-                cropped_p_img = src_img
-
-            file_stem = None
-            if record.poster_url:
-                parsed_fname = os.path.basename(urlparse(record.poster_url).path)
-                if parsed_fname:
-                    stem_match = re.split(r'_(?:p|pl)(?:_user)?\.', parsed_fname, flags=re.I)
-                    if stem_match and stem_match[0]:
-                        file_stem = stem_match[0].lower()
-
-            if not file_stem:
-                if record.category == 'WEST':
-                    file_stem = record.code.lower()
-                else:
-                    ui_code_val = record.json_data.get('ui_code') if isinstance(record.json_data, dict) else None
-                    file_stem = (ui_code_val or record.originaltitle or record.code).lower()
+    @classmethod
+    def _run_user_crop(cls, ctx):
+        """
+        _prepare_user_crop 컨텍스트로 소스 이미지를 확보해 크롭/정규화 저장하고 DB 를 갱신. 반환: 새 포스터 URL
+        _p_user / _pl_user 는 원본 해상도로 저장. 썸네일은 thumbnail(reducing_gap) 으로 reduce() 후 리샘플링
+        """
+        from io import BytesIO
+        from PIL import Image
+
+        record = av_db_session.query(cls).filter_by(code=ctx['code']).first()
+        if not record:
+            raise Exception('해당 품번의 DB 레코드를 찾을 수 없습니다.')
+
+        target_folder, file_stem, manifest_ready = ctx['target_folder'], ctx['file_stem'], ctx['manifest_ready']
+        source_type, crop_info = ctx['source_type'], ctx['crop_info']
+        pl_image_base64_data, p_image_base64_data = ctx['pl_base64'], ctx['p_base64']
+        os.makedirs(target_folder, exist_ok=True)
+        removed_paths = []
+
+        # [Plex 호환성 보장] 모든 이미지를 24비트 표준 RGB JPEG로 강제 정규화하여 저장하는 헬퍼
+        def save_normalized_jpeg(pil_img, save_filepath, quality=95):
+            if pil_img.mode not in ('RGB', 'L'):
+                rgb_converted = pil_img.convert('RGB')
+                rgb_converted.save(save_filepath, 'JPEG', quality=quality, optimize=True)
+                rgb_converted.close()
+            else:
+                pil_img.save(save_filepath, 'JPEG', quality=quality, optimize=True)
+
+        # 1. 크롭 대상 소스 이미지 확보 (업로드/디스크 이미지는 디코딩 전 상태로 열어 둠)
+        src_img = None
+
+        # (Case 1) 사용자가 세로 포스터(P)를 직접 업로드한 경우
+        if p_image_base64_data:
+            raw_b64 = p_image_base64_data.split(',', 1)[1] if ',' in p_image_base64_data else p_image_base64_data
+            src_img = Image.open(BytesIO(base64.b64decode(raw_b64)))
+
+        # (Case 2) 사용자가 가로 커버(PL)를 직접 업로드한 경우
+        elif pl_image_base64_data:
+            raw_b64 = pl_image_base64_data.split(',', 1)[1] if ',' in pl_image_base64_data else pl_image_base64_data
+            src_img = Image.open(BytesIO(base64.b64decode(raw_b64)))
+
+        # (Case 3) 소스가 P(세로 포스터)로 선택된 경우
+        elif source_type == 'p':
+            for cand_path, _ in cls._find_image_candidates(manifest_ready, record.code, 'p', target_folder, file_stem):
+                src_img = Image.open(cand_path)
+                break
+            if src_img is None and record.poster_url and record.poster_url.startswith('http'):
+                from support_site import SiteAvBase
+                src_img = SiteAvBase.imopen(record.poster_url)
+
+        # (Case 4) 소스가 PL(가로 커버)인 경우 (기본값)
+        else:
+            for cand_path, _ in cls._find_image_candidates(manifest_ready, record.code, 'pl', target_folder, file_stem):
+                src_img = Image.open(cand_path)
+                break
+
+        # (Case 5) 디스크에 없으면 원격 URL에서 로드
+        if src_img is None:
+            target_url = None
+            if source_type == 'p':
+                target_url = record.poster_url
+            else:
+                for t in (record.json_data.get('thumb') or []):
+                    if isinstance(t, dict) and t.get('aspect') == 'landscape':
+                        target_url = t.get('value')
+                        break
+                if not target_url and record.json_data.get('fanart'):
+                    target_url = record.json_data['fanart'][0]
+                if not target_url:
+                    target_url = record.poster_url
 
-            # 3. _p_user.jpg로 표준 RGB JPEG 정규화 저장 및 시스템 _p 파일 정리
-            user_poster_path = os.path.join(target_folder, f"{file_stem}_p_user.jpg")
-            save_normalized_jpeg(cropped_p_img, user_poster_path)
-            cropped_p_img.close()
-            src_img.close()
+            if target_url and target_url.startswith('http'):
+                from support_site import SiteAvBase
+                src_img = SiteAvBase.imopen(target_url)
 
-            for ext_cand in ['jpg', 'jpeg', 'png', 'webp']:
-                old_p = os.path.join(target_folder, f"{file_stem}_p.{ext_cand}")
-                if os.path.exists(old_p):
-                    try: os.remove(old_p)
-                    except Exception: pass
+        if src_img is None:
+            raise Exception('처리할 원본 이미지를 찾을 수 없습니다.')
 
-            # 4. DB 및 JSON 갱신
-            new_poster_url = f"{server_url_prefix}/{file_stem}_p_user.jpg"
-            record.poster_url = new_poster_url
+        # 2. PL 업로드는 원본 그대로 _pl_user 로 저장
+        rotate_angle = crop_info.get('rotate', 0) or 0
+        if pl_image_base64_data and not p_image_base64_data:
+            user_pl_path = os.path.join(target_folder, f"{file_stem}_pl_user.jpg")
+            save_normalized_jpeg(src_img, user_pl_path)
+
+            for old_pl, is_user in cls._find_image_candidates(manifest_ready, record.code, 'pl', target_folder, file_stem):
+                if is_user:
+                    continue
+                try: os.remove(old_pl)
+                except Exception: pass
+                removed_paths.append(old_pl)
 
-            jd = copy.deepcopy(record.json_data) if record.json_data else {}
-            thumbs = jd.get('thumb', [])
+        # 3. 정밀 좌표 기반 크롭 (90도 단위 회전은 transpose 로 처리)
+        cropped_p_img = None
+        try:
+            working_img = src_img
+            if rotate_angle % 360:
+                transpose = {90: Image.ROTATE_270, 180: Image.ROTATE_180, 270: Image.ROTATE_90}.get(int(rotate_angle) % 360) if float(rotate_angle).is_integer() else None
+                working_img = src_img.transpose(transpose) if transpose is not None else src_img.rotate(-rotate_angle, expand=True)
+            box = cls._crop_box(crop_info, working_img.size)
+            if box:
+                cropped_p_img = working_img.crop(box)
+        except Exception as e_crop:
+            logger.debug(f"[MetaDB] 좌표 크롭 실패 -> 원본 폴백: {e_crop}")
+
+        if cropped_p_img is None:
+            cropped_p_img = src_img
+        elif working_img is not src_img:
+            working_img.close()
+
+        if cropped_p_img is not src_img:
+            src_img.close()
 
-            updated_p = False
+        # 4. _p_user.jpg 및 목록용 썸네일(_p_user_thumb.jpg) 저장, 시스템 _p 파일 정리
+        user_poster_path = os.path.join(target_folder, f"{file_stem}_p_user.jpg")
+        save_normalized_jpeg(cropped_p_img, user_poster_path)
+        user_thumb_path = os.path.join(target_folder, f"{file_stem}_p_user_thumb.jpg")
+        cropped_p_img.thumbnail(USER_POSTER_THUMB_SIZE, Image.LANCZOS, reducing_gap=2.0)
+        save_normalized_jpeg(cropped_p_img, user_thumb_path, quality=85)
+        cropped_p_img.close()
+
+        for old_p, is_user in cls._find_image_candidates(manifest_ready, record.code, 'p', target_folder, file_stem):
+            if is_user:
+                continue
+            try: os.remove(old_p)
+            except Exception: pass
+            removed_paths.append(old_p)
+
+        # 5. DB 및 JSON 갱신
+        new_poster_url = ctx['new_url']
+        record.poster_url = new_poster_url
+
+        jd = copy.deepcopy(record.json_data) if record.json_data else {}
+        thumbs = jd.get('thumb', [])
+
+        updated_p = False
+        for t in thumbs:
+            if isinstance(t, dict) and t.get('aspect') == 'poster':
+                t['value'] = new_poster_url
+                updated_p = True
+                break
+        if not updated_p:
+            thumbs.insert(0, {'aspect': 'poster', 'value': new_poster_url, 'site': record.site})
+
+        if pl_image_base64_data:
+            new_pl_url = ctx['new_pl_url']
+            updated_pl = False
             for t in thumbs:
-                if isinstance(t, dict) and t.get('aspect') == 'poster':
-                    t['value'] = new_poster_url
-                    updated_p = True
+                if isinstance(t, dict) and t.get('aspect') == 'landscape':
+                    t['value'] = new_pl_url
+                    updated_pl = True
                     break
-            if not updated_p:
-                thumbs.insert(0, {'aspect': 'poster', 'value': new_poster_url, 'site': record.site})
+            if not updated_pl:
+                thumbs.append({'aspect': 'landscape', 'value': new_pl_url, 'site': record.site})
 
-            if pl_image_base64_data:
-                new_pl_url = f"{server_url_prefix}/{file_stem}_pl_user.jpg"
-                updated_pl = False
-                for t in thumbs:
-                    if isinstance(t, dict) and t.get('aspect') == 'landscape':
-                        t['value'] = new_pl_url
-                        updated_pl = True
-                        break
-                if not updated_pl:
-                    thumbs.append({'aspect': 'landscape', 'value': new_pl_url, 'site': record.site})
+        jd['thumb'] = thumbs
+        record.json_data = jd
+        flag_modified(record, "json_data")
+        record.updated_time = datetime.now()
+        written_paths = [user_poster_path, user_thumb_path] + ([os.path.join(target_folder, f"{file_stem}_pl_user.jpg")] if pl_image_base64_data else [])
+        ModelAvImageFile.record_files(record.category, record.code, written_paths)
+        av_db_session.commit()
+        ModelAvImageFile.remove_paths(removed_paths)
+        cls.invalidate_list_count()
+        cls.request_checkpoint()
 
-            jd['thumb'] = thumbs
-            record.json_data = jd
-            flag_modified(record, "json_data")
-            record.updated_time = datetime.now()
+        logger.info(f"[MetaDB] 포스터 정규화 저장 완료: [{record.code}] -> {new_poster_url}")
+        return new_poster_url
+
+
+class ModelAvMetadataDict(Base):
+    """json_data 압축 저장용 공유 사전 (json_zip 헤더의 사전 id = 이 테이블의 id)"""
+    __tablename__ = 'av_metadata_dict'
+
+    id = Column(Integer, primary_key=True)
+    codec = Column(String(20), nullable=False)
+    dict_data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, default=0)
+    is_active = Column(Integer, default=0)
+    created_time = Column(DateTime, default=datetime.now)
+
+
+class ModelAvImageFile(Base):
+    """이미지 서버 파일 매니페스트. 품번별 파일을 디렉터리 조회/존재 확인 없이 찾기 위한 인덱스 (path 는 로컬 절대 경로)"""
+    __tablename__ = 'av_image_file'
+
+    id = Column(Integer, primary_key=True)
+    category = Column(String(20), nullable=False)
+    code = Column(String(100), nullable=False)
+    aspect = Column(String(20), nullable=False)
+    path = Column(String(1000), nullable=False, unique=True)
+    size = Column(Integer, default=0)
+    mtime = Column(Integer, default=0)
+    is_user = Column(Integer, default=0)
+    updated_time = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_av_image_file_code_aspect', 'code', 'aspect'),
+        Index('ix_av_image_file_category', 'category'),
+    )
+
+
+    @staticmethod
+    def parse_filename(fname):
+        """파일명 -> (aspect, is_user). 이미지 명명 규칙이 아니면 ('other', 0)"""
+        match = IMAGE_FILE_RE.match(fname)
+        if not match:
+            return 'other', 0
+        kind = match.group('kind').lower()
+        aspect = IMAGE_ASPECTS.get(kind, 'fanart')
+        if match.group('thumb'):
+            aspect += '_thumb'
+        return aspect, 1 if match.group('user') else 0
+
+
+    @staticmethod
+    def url_to_path(url, config):
+        """이미지 서버 URL -> 로컬 파일 경로 (이미지 서버 URL 이 아니면 None)"""
+        server_url = config.get('server_url')
+        if not url or not isinstance(url, str) or not server_url or server_url not in url:
+            return None
+        rel_path = urlparse(url.split(server_url, 1)[1]).path.lstrip('/')
+        return os.path.join(config['local_root'], rel_path) if rel_path else None
+
+
+    @classmethod
+    def _file_row(cls, category, code, path, st):
+        aspect, is_user = cls.parse_filename(os.path.basename(path))
+        return {
+            'category': category, 'code': code, 'aspect': aspect, 'path': path,
+            'size': st.st_size, 'mtime': int(st.st_mtime), 'is_user': is_user,
+            'updated_time': datetime.now(),
+        }
+
+
+    @classmethod
+    def record_files(cls, category, code, paths):
+        """파일을 stat 하여 매니페스트에 upsert (없는 파일은 건너뜀). 호출부 트랜잭션에서 실행"""
+        rows = []
+        for path in paths:
+            try:
+                rows.append(cls._file_row(category, code, path, os.stat(path)))
+            except OSError:
+                continue
+        if rows:
+            av_db_session.execute(text(IMAGE_MANIFEST_UPSERT_SQL), rows)
+        return len(rows)
+
+
+    @classmethod
+    def remove_paths(cls, paths, commit=True):
+        """
+        삭제된 파일을 매니페스트에서 제거 (기본: 별도 커밋).
+        commit=False 면 호출부 트랜잭션에 포함하고 커밋/롤백은 호출부가 처리 (오류도 그대로 전파)
+        """
+        if not paths:
+            return
+        paths = list(paths)
+        if not commit:
+            for i in range(0, len(paths), IMPORT_IN_CHUNK_SIZE):
+                av_db_session.query(cls).filter(cls.path.in_(paths[i:i + IMPORT_IN_CHUNK_SIZE])).delete(synchronize_session=False)
+            return
+        try:
+            for i in range(0, len(paths), IMPORT_IN_CHUNK_SIZE):
+                av_db_session.query(cls).filter(cls.path.in_(paths[i:i + IMPORT_IN_CHUNK_SIZE])).delete(synchronize_session=False)
             av_db_session.commit()
-            cls.checkpoint_wal()
+        except Exception as e:
+            logger.error(f"[MetaDB] 이미지 매니페스트 정리 실패: {e}")
+            av_db_session.rollback()
 
-            logger.info(f"[MetaDB] 포스터 정규화 저장 완료: [{record.code}] -> {new_poster_url}")
-            return True, new_poster_url
 
+    @classmethod
+    def find(cls, code, aspect, folder=None):
+        """품번/aspect 의 파일 목록 (유저 이미지 우선). folder 가 주어지면 해당 폴더의 파일만"""
+        rows = av_db_session.query(cls).filter(cls.code == code, cls.aspect == aspect).order_by(cls.is_user.desc(), cls.id).all()
+        if folder is not None:
+            folder = os.path.normpath(folder)
+            rows = [r for r in rows if os.path.dirname(os.path.normpath(r.path)) == folder]
+        return rows
+
+
+class ModelAvSearchCache(Base):
+    """
+    모듈 search() 최종 정렬 결과 캐시 (정규화 품번 + 수동 여부 단위). 결과가 없으면 빈 목록을 짧은 TTL 로 저장(negative cache).
+    fingerprint 는 검색 순서/우선순위 설정의 해시로, 설정이 바뀌면 기존 항목은 조회되지 않음
+    """
+    __tablename__ = 'av_search_cache'
+
+    id = Column(Integer, primary_key=True)
+    module = Column(String(50), nullable=False)
+    cache_key = Column(String(150), nullable=False)
+    manual = Column(Integer, nullable=False, default=0)
+    fingerprint = Column(String(40), nullable=False)
+    result_count = Column(Integer, default=0)
+    results = Column(JSON, nullable=False)
+    expires_time = Column(DateTime, nullable=False)
+    created_time = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ux_av_search_cache_key', 'module', 'cache_key', 'manual', unique=True),
+        Index('ix_av_search_cache_expires_time', 'expires_time'),
+    )
+
+
+    @classmethod
+    def get(cls, module, cache_key, manual, fingerprint):
+        """유효한 캐시 결과 목록 (negative 는 빈 목록). 없거나 만료/설정 변경이면 None"""
+        try:
+            row = av_db_session.query(cls.results, cls.fingerprint, cls.expires_time).filter(
+                cls.module == module, cls.cache_key == cache_key, cls.manual == int(bool(manual))
+            ).first()
         except Exception as e:
-            logger.error(f"[MetaDB] save_user_cropped_poster 실패 ({code}): {e}")
-            logger.error(traceback.format_exc())
+            logger.error(f"[MetaDB] 검색 캐시 조회 실패: {e}")
+            return None
+        if not row or row.fingerprint != fingerprint or row.expires_time <= datetime.now() or not isinstance(row.results, list):
+            cls._count_stat(module, 'misses')
+            return None
+        cls._count_stat(module, 'negative_hits' if not row.results else 'hits')
+        return row.results
+
+
+    @classmethod
+    def _count_stat(cls, module, key):
+        with _search_cache_stats_lock:
+            _search_cache_stats.setdefault(module, {'hits': 0, 'negative_hits': 0, 'misses': 0, 'stores': 0})[key] += 1
+
+
+    @classmethod
+    def put(cls, module, cache_key, manual, fingerprint, results, ttl_seconds):
+        global _search_cache_last_purge
+        if not cache_key or ttl_seconds <= 0:
+            return
+        now = datetime.now()
+        try:
+            av_db_session.execute(text(SEARCH_CACHE_UPSERT_SQL), {
+                'module': module, 'cache_key': cache_key, 'manual': int(bool(manual)), 'fingerprint': fingerprint,
+                'result_count': len(results), 'results': json.dumps(results, ensure_ascii=False, default=str),
+                'expires_time': now + timedelta(seconds=ttl_seconds), 'created_time': now,
+            })
+            if time.time() - _search_cache_last_purge > SEARCH_CACHE_PURGE_INTERVAL:
+                _search_cache_last_purge = time.time()
+                av_db_session.query(cls).filter(cls.expires_time < now).delete(synchronize_session=False)
+            av_db_session.commit()
+            cls._count_stat(module, 'stores')
+        except Exception as e:
+            logger.error(f"[MetaDB] 검색 캐시 저장 실패: {e}")
             av_db_session.rollback()
-            return False, str(e)
+
+
+    @classmethod
+    def invalidate(cls, module):
+        try:
+            count = av_db_session.query(cls).filter(cls.module == module).delete(synchronize_session=False)
+            av_db_session.commit()
+            logger.info(f"[MetaDB] 검색 캐시 무효화: {module} ({count}건)")
+            return count
+        except Exception as e:
+            logger.error(f"[MetaDB] 검색 캐시 무효화 실패: {e}")
+            av_db_session.rollback()
+            return 0
+
+
+    @classmethod
+    def get_status(cls, module):
+        with _search_cache_stats_lock:
+            status = dict(_search_cache_stats.get(module) or {'hits': 0, 'negative_hits': 0, 'misses': 0, 'stores': 0})
+        lookups = status['hits'] + status['negative_hits'] + status['misses']
+        status['hit_rate'] = round((status['hits'] + status['negative_hits']) / lookups * 100, 1) if lookups else 0.0
+        try:
+            now = datetime.now()
+            base = av_db_session.query(func.count(cls.id)).filter(cls.module == module, cls.expires_time > now)
+            status['entries'] = base.scalar() or 0
+            status['negative_entries'] = base.filter(cls.result_count == 0).scalar() or 0
+        except Exception as e:
+            logger.error(f"[MetaDB] 검색 캐시 상태 조회 실패: {e}")
+        return status
+
+
+class ModelAvLabelRoute(Base):
+    """
+    레이블별 사이트 검색 경로 통계. attempts = 조회 횟수, hits = 100점 결과를 낸 횟수, accepts = 최종 1순위(채택) 횟수.
+    plan() 이 이 통계로 검색 사이트 순서를 정하고, 일정 횟수 이상 조회했지만 한 번도 100점을 내지 못한 사이트는 제외
+    """
+    __tablename__ = 'av_label_route'
+
+    id = Column(Integer, primary_key=True)
+    module = Column(String(50), nullable=False)
+    label = Column(String(50), nullable=False)
+    site = Column(String(30), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    hits = Column(Integer, nullable=False, default=0)
+    accepts = Column(Integer, nullable=False, default=0)
+    latency_total = Column(Integer, nullable=False, default=0)  # ms
+    last_hit_time = Column(DateTime)
+    updated_time = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ux_av_label_route_key', 'module', 'label', 'site', unique=True),
+    )
+
+
+    @classmethod
+    def record(cls, module, label, site_stats):
+        """site_stats: [(site, hit, accept, latency_ms)] - 이번 검색에서 실제로 조회해 응답을 받은 사이트들 (응답 실패 사이트는 호출부에서 제외)"""
+        if not label or not site_stats:
+            return
+        now = datetime.now()
+        try:
+            av_db_session.execute(text(LABEL_ROUTE_UPSERT_SQL), [{
+                'module': module, 'label': label, 'site': site, 'hit': int(bool(hit)), 'accept': int(bool(accept)),
+                'latency': int(latency_ms or 0), 'last_hit_time': now if hit else None, 'updated_time': now,
+            } for site, hit, accept, latency_ms in site_stats])
+            av_db_session.commit()
+        except Exception as e:
+            logger.error(f"[MetaDB] 레이블 경로 기록 실패: {e}")
+            av_db_session.rollback()
+
+
+    @classmethod
+    def plan(cls, module, label, site_list, min_attempts=0, pinned=None):
+        """
+        (정렬된 사이트 목록, 제외된 사이트 목록).
+        채택 이력이 있는 사이트(채택 수 내림차순, 평균 응답 시간 오름차순) -> 이력 없음/100점 이력 사이트(기존 순서) -> 100점 이력 없는 사이트(기존 순서).
+        pinned(사용자/MGS 우선 사이트)는 맨 앞 고정이며 제외하지 않음. 모두 제외되면 기존 순서 유지.
+        마지막 조회가 LABEL_ROUTE_REPROBE_DAYS 일 이전인 사이트는 제외하지 않고 다시 조회 (맨 뒤 순서)
+        """
+        if not label or not site_list:
+            return list(site_list), []
+        try:
+            rows = av_db_session.query(cls.site, cls.attempts, cls.hits, cls.accepts, cls.latency_total, cls.updated_time).filter(
+                cls.module == module, cls.label == label
+            ).all()
+        except Exception as e:
+            logger.error(f"[MetaDB] 레이블 경로 조회 실패: {e}")
+            return list(site_list), []
+        stats = {row.site: row for row in rows}
+
+        def sort_key(indexed_site):
+            index, site = indexed_site
+            row = stats.get(site)
+            if row is None:
+                return (1, 0, 0, index)
+            if row.accepts:
+                return (0, -row.accepts, row.latency_total / max(1, row.attempts), index)
+            return (1 if row.hits else 2, 0, 0, index)
+
+        ordered = [site for _, site in sorted(enumerate(site_list), key=sort_key)]
+        pruned = []
+        if min_attempts and min_attempts > 0:
+            reprobe_before = datetime.now() - timedelta(days=LABEL_ROUTE_REPROBE_DAYS)
+            pruned = [
+                site for site in ordered
+                if site != pinned and site in stats and stats[site].hits == 0 and stats[site].attempts >= min_attempts
+                and (stats[site].updated_time is None or stats[site].updated_time >= reprobe_before)
+            ]
+            if len(pruned) == len(ordered):
+                pruned = []
+            ordered = [site for site in ordered if site not in pruned]
+        if pinned in ordered:
+            ordered.remove(pinned)
+            ordered.insert(0, pinned)
+        return ordered, pruned
+
+
+    @classmethod
+    def get_table(cls, module):
+        """설정 화면용: 레이블별 행(최근 갱신순, LABEL_ROUTE_TABLE_LIMIT 건)과 사이트별 합계/평균 응답 시간"""
+        result = {'rows': [], 'sites': [], 'labels': 0}
+        try:
+            rows = av_db_session.query(cls).filter(cls.module == module).order_by(cls.updated_time.desc()).limit(LABEL_ROUTE_TABLE_LIMIT).all()
+            result['rows'] = [{
+                'label': r.label, 'site': r.site, 'attempts': r.attempts, 'hits': r.hits, 'accepts': r.accepts,
+                'avg_latency': int(r.latency_total / r.attempts) if r.attempts else 0,
+                'last_hit_time': r.last_hit_time.strftime('%Y-%m-%d %H:%M') if r.last_hit_time else '',
+            } for r in rows]
+            site_rows = av_db_session.query(
+                cls.site, func.sum(cls.attempts), func.sum(cls.hits), func.sum(cls.accepts), func.sum(cls.latency_total)
+            ).filter(cls.module == module).group_by(cls.site).all()
+            result['sites'] = [{
+                'site': site, 'attempts': attempts or 0, 'hits': hits or 0, 'accepts': accepts or 0,
+                'avg_latency': int((latency or 0) / attempts) if attempts else 0,
+            } for site, attempts, hits, accepts, latency in site_rows]
+            result['labels'] = av_db_session.query(func.count(func.distinct(cls.label))).filter(cls.module == module).scalar() or 0
+        except Exception as e:
+            logger.error(f"[MetaDB] 레이블 경로 목록 조회 실패: {e}")
+        return result
+
+
+    @classmethod
+    def reset(cls, module, label=None):
+        try:
+            query = av_db_session.query(cls).filter(cls.module == module)
+            if label:
+                query = query.filter(cls.label == label.upper())
+            count = query.delete(synchronize_session=False)
+            av_db_session.commit()
+            logger.info(f"[MetaDB] 레이블 경로 초기화: {module} {label or '(전체)'} ({count}건)")
+            return count
+        except Exception as e:
+            logger.error(f"[MetaDB] 레이블 경로 초기화 실패: {e}")
+            av_db_session.rollback()
+            return 0
+
+
+class ModelAvTransMemory(Base):
+    """
+    모듈 공용 번역 메모리. 번역 엔진 호출 전에 조회하고 새 번역 결과를 저장 (trans_batch).
+    적중/미적중 통계는 모듈별로 메모리에 보관
+    """
+    __tablename__ = 'av_trans_memory'
+
+    id = Column(Integer, primary_key=True)
+    engine = Column(String(100), nullable=False)
+    source_lang = Column(String(10), nullable=False)
+    target_lang = Column(String(10), nullable=False)
+    text_hash = Column(String(40), nullable=False)
+    source_text = Column(Text, nullable=False)
+    translated = Column(Text, nullable=False)
+    last_used_time = Column(DateTime, default=datetime.now)
+    created_time = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index('ux_av_trans_memory_key', 'engine', 'source_lang', 'target_lang', 'text_hash', unique=True),
+        Index('ix_av_trans_memory_last_used_time', 'last_used_time'),
+    )
+
+
+    @staticmethod
+    def _text_hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+    @classmethod
+    def _module_stats(cls, module):
+        return _trans_memory_stats.setdefault(module or 'unknown', {'hits': 0, 'misses': 0, 'stores': 0})
+
+
+    @classmethod
+    def lookup(cls, trans_engine, source_lang, target_lang, texts, module=None):
+        """{원문: 번역문} (메모리에 있는 것만). 오래 사용되지 않은 적중 행은 최근 사용 시각 갱신 대상으로 등록"""
+        if not texts:
+            return {}
+        hashes = {cls._text_hash(text): text for text in texts}
+        found, touch_ids = {}, []
+        touch_before = datetime.now() - timedelta(seconds=TRANS_MEMORY_TOUCH_INTERVAL)
+        try:
+            hash_list = list(hashes)
+            with engine.connect() as conn:
+                for i in range(0, len(hash_list), IMPORT_IN_CHUNK_SIZE):
+                    rows = conn.execute(select(cls.id, cls.text_hash, cls.source_text, cls.translated, cls.last_used_time).where(
+                        cls.engine == trans_engine, cls.source_lang == source_lang, cls.target_lang == target_lang,
+                        cls.text_hash.in_(hash_list[i:i + IMPORT_IN_CHUNK_SIZE])
+                    )).all()
+                    for row in rows:
+                        text = hashes.get(row.text_hash)
+                        if text is not None and row.source_text == text:
+                            found[text] = row.translated
+                            if row.last_used_time is None or row.last_used_time < touch_before:
+                                touch_ids.append(row.id)
+        except Exception as e:
+            logger.error(f"[MetaDB] 번역 메모리 조회 실패: {e}")
+        with _trans_memory_lock:
+            _trans_memory_touch.update(touch_ids)
+            stats = cls._module_stats(module)
+            stats['hits'] += len(found)
+            stats['misses'] += len(hashes) - len(found)
+        return found
+
+
+    @classmethod
+    def store(cls, trans_engine, source_lang, target_lang, pairs, module=None):
+        """pairs: {원문: 번역문}. 별도 트랜잭션으로 저장하면서 밀린 최근 사용 시각 갱신을 반영하고, 주기적으로 LRU 정리"""
+        global _trans_memory_last_evict
+        if not pairs:
+            return
+        now = datetime.now()
+        with _trans_memory_lock:
+            touch_ids = list(_trans_memory_touch)
+            _trans_memory_touch.clear()
+        try:
+            with writer_engine.begin() as conn:
+                conn.execute(text(TRANS_MEMORY_UPSERT_SQL), [{
+                    'engine': trans_engine, 'source_lang': source_lang, 'target_lang': target_lang, 'text_hash': cls._text_hash(source_text),
+                    'source_text': source_text, 'translated': translated, 'last_used_time': now, 'created_time': now,
+                } for source_text, translated in pairs.items()])
+                for i in range(0, len(touch_ids), IMPORT_IN_CHUNK_SIZE):
+                    conn.execute(TRANS_MEMORY_TOUCH_SQL, {'now': now, 'ids': touch_ids[i:i + IMPORT_IN_CHUNK_SIZE]})
+                if time.time() - _trans_memory_last_evict > TRANS_MEMORY_EVICT_INTERVAL:
+                    _trans_memory_last_evict = time.time()
+                    overflow = (conn.execute(select(func.count(cls.id))).scalar() or 0) - TRANS_MEMORY_MAX_ROWS
+                    if overflow > 0:
+                        # 상한의 10% 여유를 두고 정리하여 매 점검마다 삭제가 일어나지 않도록 함
+                        evict_count = overflow + TRANS_MEMORY_MAX_ROWS // 10
+                        deleted = conn.execute(text(TRANS_MEMORY_EVICT_SQL), {'limit': evict_count}).rowcount
+                        logger.info(f"[MetaDB] 번역 메모리 LRU 정리: {deleted}건")
+            _wal_touch()
+            with _trans_memory_lock:
+                cls._module_stats(module)['stores'] += len(pairs)
+        except Exception as e:
+            logger.error(f"[MetaDB] 번역 메모리 저장 실패: {e}")
+
+
+    @classmethod
+    def clear(cls, engine=None):
+        try:
+            query = av_db_session.query(cls)
+            if engine:
+                query = query.filter(cls.engine == engine)
+            count = query.delete(synchronize_session=False)
+            av_db_session.commit()
+            logger.info(f"[MetaDB] 번역 메모리 초기화: {engine or '(전체)'} ({count}건)")
+            return count
+        except Exception as e:
+            logger.error(f"[MetaDB] 번역 메모리 초기화 실패: {e}")
+            av_db_session.rollback()
+            return 0
+
+
+    @classmethod
+    def get_status(cls):
+        with _trans_memory_lock:
+            modules = {module: dict(stats) for module, stats in _trans_memory_stats.items()}
+        for stats in modules.values():
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        status = {'modules': modules, 'max_entries': TRANS_MEMORY_MAX_ROWS}
+        try:
+            status['entries'] = av_db_session.query(func.count(cls.id)).scalar() or 0
+            status['engines'] = dict(av_db_session.query(cls.engine, func.count(cls.id)).group_by(cls.engine).all())
+        except Exception as e:
+            logger.error(f"[MetaDB] 번역 메모리 상태 조회 실패: {e}")
+        return status
+
+
+def _parse_json_dicts(rows):
+    return {row[0]: (row[1], bytes(row[2] or b'')) for row in rows}
+
+
+def _load_json_codec():
+    """av_metadata_dict 의 사전과 활성 코덱을 메모리로 읽음. 활성 행이 없으면 압축 저장 OFF"""
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, codec, dict_data, is_active FROM av_metadata_dict ORDER BY id")).fetchall()
+    _json_dicts.clear()
+    _json_dicts.update(_parse_json_dicts(rows))
+    _zstd_dicts.clear()
+    active = [row for row in rows if row[3]]
+    _json_codec.update({'name': active[-1][1], 'dict_id': active[-1][0]} if active else {'name': None, 'dict_id': 0})
+    if _json_codec['name']:
+        logger.info(f"[MetaDB] json_data 압축 저장 사용 중: {_json_codec['name']} (사전 #{_json_codec['dict_id']})")
+
+
+def _get_json_dict(dict_id, dicts=None):
+    dicts = _json_dicts if dicts is None else dicts
+    if dict_id not in dicts and dicts is _json_dicts:
+        _load_json_codec()
+    return dicts[dict_id]
+
+
+def _zstd_dict(dict_id, dict_data, shared=True):
+    """zstd 사전 객체 (압축 파라미터 사전 계산 포함). 사전 로딩 비용이 커서 자체 DB 사전은 id 별로 재사용"""
+    import zstandard
+    if shared and dict_id in _zstd_dicts:
+        return _zstd_dicts[dict_id]
+    zdict = zstandard.ZstdCompressionDict(dict_data)
+    if shared:
+        zdict.precompute_compress(level=JSON_ZSTD_LEVEL)
+        _zstd_dicts[dict_id] = zdict
+    return zdict
+
+
+def _json_stub(data):
+    """압축 저장 시 json_data 에 남기는 요약. 생성 컬럼(has_plot/oshash/phash/ui_code/year/studio)과 같은 값을 내야 함"""
+    stub = {key: data[key] for key in JSON_STUB_KEYS if key in data}
+    if data.get('plot'):
+        stub['plot'] = str(data['plot'])[:1]
+    extra_info = data.get('extra_info')
+    if isinstance(extra_info, dict):
+        stub['extra_info'] = {key: extra_info[key] for key in ('oshash', 'phash') if key in extra_info}
+    return stub
+
+
+def _encode_json_zip(data):
+    """활성 코덱으로 json 압축. 압축 저장 OFF 이거나 dict 가 아니면 None"""
+    codec, dict_id = _json_codec['name'], _json_codec['dict_id']
+    if not codec or not isinstance(data, dict):
+        return None
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    dict_data = _get_json_dict(dict_id)[1]
+    if codec == 'zstd':
+        import zstandard
+        cctx = zstandard.ZstdCompressor(level=JSON_ZSTD_LEVEL, dict_data=_zstd_dict(dict_id, dict_data)) if dict_data else zstandard.ZstdCompressor(level=JSON_ZSTD_LEVEL)
+        payload = cctx.compress(raw)
+    else:
+        cobj = zlib.compressobj(6, zdict=dict_data) if dict_data else zlib.compressobj(6)
+        payload = cobj.compress(raw) + cobj.flush()
+    return JSON_ZIP_HEADER.pack(JSON_CODECS[codec], dict_id) + payload
+
+
+def _decode_json_zip(blob, dicts=None):
+    codec_id, dict_id = JSON_ZIP_HEADER.unpack_from(blob)
+    payload = bytes(blob[JSON_ZIP_HEADER.size:])
+    dict_data = _get_json_dict(dict_id, dicts)[1] if dict_id else b''
+    if codec_id == JSON_CODECS['zstd']:
+        import zstandard
+        dctx = zstandard.ZstdDecompressor(dict_data=_zstd_dict(dict_id, dict_data, shared=dicts is None)) if dict_data else zstandard.ZstdDecompressor()
+        raw = dctx.decompress(payload)
+    else:
+        dobj = zlib.decompressobj(zdict=dict_data) if dict_data else zlib.decompressobj()
+        raw = dobj.decompress(payload) + dobj.flush()
+    return json.loads(raw)
+
+
+def _load_row_json(json_data, json_zip=None, dicts=None):
+    """raw SQL 로 읽은 행의 json 원본 복원 (json_zip 우선)"""
+    if json_zip:
+        return _decode_json_zip(json_zip, dicts)
+    if isinstance(json_data, (str, bytes)):
+        return json.loads(json_data)
+    return json_data or {}
+
+
+def _train_json_dict(codec, samples):
+    """캐시 레코드 샘플(raw json bytes)로 공유 사전 학습. zstd 는 zstandard 학습기, zlib 은 자주 나오는 키/값 조각 모음"""
+    size = JSON_DICT_SIZE[codec]
+    if codec == 'zstd':
+        import zstandard
+        try:
+            return zstandard.train_dictionary(size, samples).as_bytes()
+        except Exception as e:
+            logger.warning(f"[MetaDB] zstd 사전 학습 실패 (사전 없이 압축): {e}")
+            return b''
+    counter = Counter()
+    for raw in samples:
+        tokens = re.findall(rb'"(?:[^"\\]|\\.){1,80}"\s*:?', raw)
+        tokens += re.findall(rb'https?://[^"/]+/(?:[^"/]+/){0,3}', raw)
+        counter.update(set(tokens))
+    pieces, total = [], 0
+    for piece, count in counter.most_common():
+        if count < 2 or total + len(piece) > size:
+            break
+        pieces.append(piece)
+        total += len(piece)
+    # zlib 은 사전 끝쪽일수록 짧은 거리로 참조되므로 자주 쓰는 조각을 뒤에 둠
+    return b''.join(reversed(pieces))
+
+
+@event.listens_for(ModelAvMetadata, 'load')
+def _on_av_metadata_load(target, context):
+    if target.__dict__.get('json_zip'):
+        set_committed_value(target, 'json_data', _decode_json_zip(target.__dict__['json_zip']))
+
+
+@event.listens_for(ModelAvMetadata, 'refresh')
+def _on_av_metadata_refresh(target, context, attrs):
+    if (attrs is None or 'json_data' in attrs) and target.__dict__.get('json_zip'):
+        set_committed_value(target, 'json_data', _decode_json_zip(target.__dict__['json_zip']))
+
+
+@event.listens_for(ModelAvMetadata, 'before_insert')
+@event.listens_for(ModelAvMetadata, 'before_update')
+def _on_av_metadata_before_save(mapper, connection, target):
+    """json_data 가 바뀐 행만 요약 컬럼을 갱신하고, 활성 코덱으로 압축하여 json_zip 에 기록 (json_data 는 요약으로 교체)"""
+    state = sa_inspect(target)
+    if state.persistent and not state.attrs.json_data.history.has_changes():
+        return
+    for key, value in ModelAvMetadata.summary_columns(target.json_data).items():
+        setattr(target, key, value)
+    json_zip = _encode_json_zip(target.json_data)
+    if json_zip:
+        target._json_full = target.json_data
+        target.json_data = _json_stub(target.json_data)
+    target.json_zip = json_zip
+
+
+@event.listens_for(ModelAvMetadata, 'after_insert')
+@event.listens_for(ModelAvMetadata, 'after_update')
+def _on_av_metadata_after_save(mapper, connection, target):
+    # flush 후에도 객체에서는 원본 dict 가 보이도록 복원
+    full = target.__dict__.pop('_json_full', None)
+    if full is not None:
+        set_committed_value(target, 'json_data', full)
+
+
+@event.listens_for(ModelAvMetadata, 'after_insert')
+@event.listens_for(ModelAvMetadata, 'after_update')
+@event.listens_for(ModelAvMetadata, 'after_delete')
+def _on_av_metadata_changed(mapper, connection, target):
+    # 커밋 시 get_metadata 캐시에서 제거할 품번 기록
+    session = sa_inspect(target).session
+    if session is not None and target.code:
+        session.info.setdefault('av_changed_codes', set()).add(target.code)
+
+
+@event.listens_for(av_db_session, 'after_commit')
+def _on_av_session_commit(session):
+    codes = session.info.pop('av_changed_codes', None)
+    if codes:
+        ModelAvMetadata.invalidate_metadata_cache(codes)
+
+
+@event.listens_for(av_db_session, 'after_rollback')
+def _on_av_session_rollback(session):
+    session.info.pop('av_changed_codes', None)
+
+
+def _write_behind_worker():
+    """write-behind 전용 스레드. 큐 등록 신호를 받으면 WRITE_BEHIND_INTERVAL 동안 모은 뒤 그룹 커밋"""
+    while True:
+        _write_event.wait()
+        time.sleep(WRITE_BEHIND_INTERVAL)
+        _write_event.clear()
+        try:
+            ModelAvMetadata.flush_write_behind()
+        except Exception as e:
+            logger.error(f"[MetaDB] write-behind 스레드 오류: {e}")
+            logger.error(traceback.format_exc())
+        finally:
+            av_db_session.remove()
+
+
+@atexit.register
+def _flush_write_behind_on_exit():
+    """프로세스 종료 시 남은 write-behind 항목 기록 (데몬 스레드는 종료 시 강제로 중단되므로)"""
+    if not _write_queue:
+        return
+    try:
+        ModelAvMetadata.flush_write_behind()
+    except Exception as e:
+        logger.error(f"[MetaDB] 종료 시 write-behind 플러시 실패: {e}")
+    finally:
+        av_db_session.remove()
+
+
+def migrate_db():
+    """
+    기존 metadata_av.db 파일에 신규 컬럼/인덱스를 온라인으로 추가하고 필요한 값을 채움.
+    create_all 은 이미 존재하는 테이블을 변경하지 않으므로 plugin_load 에서 create_all 직후 호출.
+    """
+    global _migrated
+    if _migrated:
+        return
+    try:
+        table = ModelAvMetadata.__table__
+        with writer_engine.begin() as conn:
+            existing_cols = {row[1] for row in conn.execute(text(f"PRAGMA table_info({table.name})"))}
+            existing_cols |= {row[1] for row in conn.execute(text(f"PRAGMA table_xinfo({table.name})"))}
+            for col in table.columns:
+                if col.name in existing_cols:
+                    continue
+                col_type = col.type.compile(dialect=writer_engine.dialect)
+                col_ddl = f"{col.name} {col_type}"
+                if col.computed is not None:
+                    # ALTER TABLE 로는 VIRTUAL 생성 컬럼만 추가 가능
+                    col_ddl += f" GENERATED ALWAYS AS ({col.computed.sqltext}) VIRTUAL"
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col_ddl}"))
+                logger.info(f"[MetaDB] 마이그레이션: 컬럼 추가 {table.name}.{col.name} ({col_type})")
+
+        for index in table.indexes:
+            index.create(bind=writer_engine, checkfirst=True)
+
+        _load_json_codec()
+        _backfill_code_columns()
+        _backfill_summary_columns()
+        _setup_fts()
+        with writer_engine.begin() as conn:
+            fixed = conn.execute(text(IMAGE_USER_THUMB_FIX_SQL)).rowcount
+        if fixed:
+            logger.info(f"[MetaDB] 마이그레이션: 유저 썸네일 매니페스트 {fixed}건 보정 (poster_thumb, 유저 파일)")
+        _migrated = True
+    except Exception as e:
+        logger.error(f"[MetaDB] migrate_db 실패: {e}")
+        logger.error(traceback.format_exc())
+
+
+def _backfill_code_columns(batch_size=5000):
+    total = 0
+    while True:
+        with writer_engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, category, originaltitle, code FROM av_metadata_cache "
+                "WHERE sort_key IS NULL OR code_norm IS NULL LIMIT :limit"
+            ), {'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            values = []
+            for r in rows:
+                value = r[2] or r[3]
+                label, number = ModelAvMetadata.parse_code_parts(r[1], value)
+                values.append({
+                    'id': r[0],
+                    'sort_key': ModelAvMetadata.make_sort_key(value),
+                    'code_norm': ModelAvMetadata.normalize_code(value),
+                    'code_label': label,
+                    'code_number': number,
+                })
+            conn.execute(text(
+                "UPDATE av_metadata_cache SET sort_key = :sort_key, code_norm = :code_norm, "
+                "code_label = :code_label, code_number = :code_number WHERE id = :id"
+            ), values)
+            total += len(rows)
+    if total:
+        logger.info(f"[MetaDB] 마이그레이션: 정렬/정규화 품번 컬럼 {total}건 백필 완료")
+
+
+def _backfill_summary_columns(batch_size=2000):
+    total = 0
+    while True:
+        with writer_engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, json_data, json_zip FROM av_metadata_cache WHERE actor_count IS NULL OR list_year IS NULL LIMIT :limit"
+            ), {'limit': batch_size}).fetchall()
+            if not rows:
+                break
+            values = []
+            for r in rows:
+                try: jd = _load_row_json(r[1], r[2])
+                except Exception: jd = {}
+                values.append(dict(ModelAvMetadata.summary_columns(jd), id=r[0]))
+            conn.execute(text(
+                "UPDATE av_metadata_cache SET has_thumb = :has_thumb, actor_count = :actor_count, "
+                "plot_preview = :plot_preview, list_year = :list_year WHERE id = :id"
+            ), values)
+            total += len(rows)
+    if total:
+        logger.info(f"[MetaDB] 마이그레이션: 목록 요약 컬럼 {total}건 백필 완료")
+
+
+def _setup_fts():
+    """
+    FTS5 테이블 생성 후 색인되지 않은 기존 레코드가 있으면 백그라운드 스레드로 색인 (plugin_load 를 막지 않음).
+    색인이 끝날 때까지 조회는 LIKE 검색. FTS5 미지원 SQLite 면 LIKE 검색 유지
+    """
+    global _fts_enabled, _fts_ready
+    try:
+        with writer_engine.begin() as conn:
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}).first()
+            if not exists:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    f"category UNINDEXED, {', '.join(FTS_COLUMNS)}, tokenize = 'trigram')"
+                ))
+                logger.info(f"[MetaDB] 마이그레이션: FTS5 테이블 생성 ({FTS_TABLE})")
+        _fts_enabled = True
+    except Exception as e:
+        logger.warning(f"[MetaDB] FTS5 사용 불가 (LIKE 검색 유지): {e}")
+        _fts_enabled = False
+        return
+
+    with engine.connect() as conn:
+        pending = conn.execute(text(
+            f"SELECT 1 FROM av_metadata_cache WHERE id NOT IN (SELECT rowid FROM {FTS_TABLE}) LIMIT 1"
+        )).first()
+    if not pending:
+        _fts_ready = True
+        return
+    _start_fts_backfill()
+
+
+def _hold_fts_reads():
+    """색인이 따라잡을 때까지 조회를 LIKE 로 (이후 _start_fts_backfill 이 완료 시 다시 켬)"""
+    global _fts_ready
+    with _fts_backfill_lock:
+        _fts_ready = False
+
+
+def _start_fts_backfill(stale_ids=None):
+    """
+    색인 스레드 시작 (이미 실행 중이면 stale_ids 만 추가). stale_ids 는 기존 색인을 지우고 다시 색인할 행 id.
+    완료 전까지 조회는 LIKE 검색
+    """
+    global _fts_ready, _fts_backfill_thread
+    if not _fts_enabled:
+        return
+    with _fts_backfill_lock:
+        if stale_ids:
+            _fts_stale_ids.update(stale_ids)
+        _fts_ready = False
+        if _fts_backfill_thread is None:
+            _fts_backfill_thread = threading.Thread(target=_fts_backfill_worker, name='MetaDBFtsBackfill')
+            _fts_backfill_thread.daemon = True
+            _fts_backfill_thread.start()
+            logger.info("[MetaDB] FTS 색인 백그라운드 생성 시작 (완료 전까지 LIKE 검색)")
+
+
+def _fts_backfill_worker(batch_size=2000, max_failures=5):
+    """
+    _fts_stale_ids 의 기존 색인을 지운 뒤 색인되지 않은 레코드를 batch_size 단위 트랜잭션으로 색인.
+    배치 사이에 쓰기 락을 놓아 다른 쓰기가 끼어들 수 있게 하고, 동시 저장과 충돌(busy/이미 색인됨)하면 잠시 후 같은 구간을 다시 시도.
+    연속 실패가 max_failures 회면 중단 (LIKE 검색 유지)
+    """
+    global _fts_ready, _fts_backfill_thread
+    total, last_id, failures = 0, 0, 0
+    started = time.time()
+    while True:
+        stale = []
+        try:
+            with _fts_backfill_lock:
+                while _fts_stale_ids and len(stale) < batch_size:
+                    stale.append(_fts_stale_ids.pop())
+            if stale:
+                with writer_engine.begin() as conn:
+                    conn.execute(FTS_DELETE_IDS_SQL, {'ids': stale})
+                _wal_touch()
+                # 지운 행은 이미 지나간 구간일 수 있으므로 그 앞부터 다시 색인
+                last_id = min(last_id, min(stale) - 1)
+                failures = 0
+                continue
+            with writer_engine.begin() as conn:
+                rows = conn.execute(text(
+                    "SELECT id, category, code, originaltitle, title, json_data, json_zip FROM av_metadata_cache "
+                    f"WHERE id > :last_id AND id NOT IN (SELECT rowid FROM {FTS_TABLE}) ORDER BY id LIMIT :limit"
+                ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+                if rows:
+                    values = []
+                    for r in rows:
+                        try: jd = _load_row_json(r[5], r[6])
+                        except Exception: jd = {}
+                        values.append(ModelAvMetadata._fts_values(r[0], r[1], r[2], r[3], r[4], jd))
+                    conn.execute(text(FTS_INSERT_SQL), values)
+            if not rows:
+                with _fts_backfill_lock:
+                    if _fts_stale_ids:
+                        continue
+                    _fts_ready = True
+                    _fts_backfill_thread = None
+                break
+            _wal_touch()
+            last_id = rows[-1][0]
+            total += len(rows)
+            failures = 0
+        except Exception as e:
+            if stale:
+                with _fts_backfill_lock:
+                    _fts_stale_ids.update(stale)
+            failures += 1
+            if failures >= max_failures:
+                logger.error(f"[MetaDB] FTS 색인 생성 중단 (LIKE 검색 유지): {e}")
+                with _fts_backfill_lock:
+                    _fts_backfill_thread = None
+                return
+            logger.debug(f"[MetaDB] FTS 색인 배치 재시도 ({failures}/{max_failures}): {e}")
+            time.sleep(1)
+    logger.info(f"[MetaDB] FTS 색인 {total}건 생성 완료 ({time.time() - started:.1f}초)")
+
+
+_migrated = False
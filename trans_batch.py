@@ -0,0 +1,150 @@
+import re
+import threading
+
+from .setup import *
+
+# 일괄 번역 (movie/ftv/jav 번역 단계 공용).
+# 한 엔티티의 번역 대상 문자열을 모아 중복을 제거한 뒤, 한 줄짜리 짧은 문자열은 "번호<탭>문자열" 줄로 묶어 한 번에 요청하고
+# 응답의 줄 번호가 1..n 순서 그대로가 아니면(줄 합침/분리/순서 뒤바뀜) 개별 요청으로 되돌림. 여러 줄/긴 문자열과 묶음 요청은 TRANS_BATCH_WORKERS 스레드로 동시 처리.
+# engine 이 정해지면 번역 메모리(av_trans_memory)를 먼저 조회하고, 새로 번역된 문자열만 저장
+TRANS_PACK_MAX_CHARS = 3000
+TRANS_PACK_MAX_ITEMS = 50
+TRANS_PACK_MAX_ITEM_CHARS = 1000
+TRANS_BATCH_WORKERS = 4
+# 묶음 응답 한 줄 ("3\t번역문"). 번역기가 탭을 공백으로 바꾸는 경우도 허용
+TRANS_PACK_LINE_RE = re.compile(r'^\s*(\d+)[\t ]+(.*\S)\s*$')
+_trans_executor = None
+_trans_executor_lock = threading.Lock()
+
+
+def _get_trans_executor():
+    global _trans_executor
+    with _trans_executor_lock:
+        if _trans_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _trans_executor = ThreadPoolExecutor(max_workers=TRANS_BATCH_WORKERS, thread_name_prefix='metadata_trans')
+        return _trans_executor
+
+
+def _pack_chunks(texts):
+    """묶음 요청 단위로 분할 (글자 수/개수 상한)"""
+    chunks, chunk, size = [], [], 0
+    for text in texts:
+        if chunk and (size + len(text) + 1 > TRANS_PACK_MAX_CHARS or len(chunk) >= TRANS_PACK_MAX_ITEMS):
+            chunks.append(chunk)
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _pack_text(chunk):
+    return '\n'.join(f"{index}\t{text}" for index, text in enumerate(chunk, 1))
+
+
+def _unpack_lines(result, count):
+    """묶음 응답을 줄 번호로 검증하고 번호를 떼어낸 번역 목록. 번호가 1..count 순서와 다르거나 빈 줄이 있으면 None"""
+    lines = [line for line in (result or '').split('\n') if line.strip()]
+    if len(lines) != count:
+        return None
+    unpacked = []
+    for index, line in enumerate(lines, 1):
+        match = TRANS_PACK_LINE_RE.match(line)
+        if not match or int(match.group(1)) != index:
+            return None
+        unpacked.append(match.group(2).strip())
+    return unpacked
+
+
+def _site_util_engine():
+    """SiteUtil.trans 가 현재 사용하는 번역 백엔드(시스템 설정 trans_type)를 포함한 메모리 엔진 키. 알 수 없으면 None (메모리 사용 안 함)"""
+    try:
+        trans_type = F.SystemModelSetting.get('trans_type')
+    except Exception:
+        trans_type = None
+    return f"site_util:{trans_type}" if trans_type else None
+
+
+def _memory_lookup(engine, source, target, texts, module):
+    try:
+        from .model_metadata_db import ModelAvTransMemory
+        return ModelAvTransMemory.lookup(engine, source, target, texts, module=module)
+    except Exception as e:
+        logger.error(f"[Trans] 번역 메모리 조회 실패: {e}")
+        return {}
+
+
+def _memory_store(engine, source, target, pairs, module):
+    try:
+        from .model_metadata_db import ModelAvTransMemory
+        ModelAvTransMemory.store(engine, source, target, pairs, module=module)
+    except Exception as e:
+        logger.error(f"[Trans] 번역 메모리 저장 실패: {e}")
+
+
+def trans_batch(texts, source='en', target='ko', trans_func=None, pack=True, keep_failed=True, engine=None, module=None):
+    """
+    texts 와 같은 순서/길이의 번역 결과 목록. 빈 값은 그대로, 번역 실패한 문자열은 원문(keep_failed=False 면 None, 빈 결과도 그대로).
+    trans_func(text) 가 없으면 SiteUtil.trans(text, source, target) 이고 engine 기본값은 'site_util:<trans_type>'.
+    trans_func 를 넘길 때는 결과를 구분할 수 있는 engine 을 함께 넘겨야 번역 메모리를 사용. module 은 적중률 통계 구분용.
+    pack=False 면 묶음 요청 없이 서로 다른 문자열만 개별 요청
+    """
+    if trans_func is None:
+        from support_site import SiteUtil
+        trans_func = lambda text: SiteUtil.trans(text, source=source, target=target)
+        engine = engine or _site_util_engine()
+
+    unique = list(dict.fromkeys(text for text in texts if isinstance(text, str) and text.strip()))
+    if not unique:
+        return list(texts)
+
+    translated = _memory_lookup(engine, source, target, unique, module) if engine else {}
+    remembered = len(translated)
+    fresh = {}
+    unique = [text for text in unique if text not in translated]
+
+    def trans_one(text):
+        try:
+            result = trans_func(text)
+            translated[text] = result if result or not keep_failed else text
+            if result and result != text:
+                fresh[text] = result
+        except Exception as e:
+            logger.error(f"[Trans] 번역 실패: {e}")
+            translated[text] = text if keep_failed else None
+
+    def trans_chunk(chunk):
+        try:
+            lines = _unpack_lines(trans_func(_pack_text(chunk)), len(chunk))
+        except Exception as e:
+            logger.error(f"[Trans] 묶음 번역 실패 -> 개별 번역: {e}")
+            lines = None
+        if lines is None:
+            logger.debug(f"[Trans] 묶음 응답 줄 번호 불일치 -> 개별 번역 {len(chunk)}건")
+            return chunk
+        translated.update(zip(chunk, lines))
+        fresh.update((text, line) for text, line in zip(chunk, lines) if line != text)
+        return []
+
+    packable = [text for text in unique if '\n' not in text and len(text) <= TRANS_PACK_MAX_ITEM_CHARS] if pack else []
+    chunks = _pack_chunks(packable) if len(packable) > 1 else []
+    packed = set(packable) if chunks else set()
+    solo = [text for text in unique if text not in packed]
+
+    executor = _get_trans_executor() if len(chunks) + len(solo) > 1 else None
+    if chunks:
+        for failed in (executor.map(trans_chunk, chunks) if executor else map(trans_chunk, chunks)):
+            solo.extend(failed)
+    if len(solo) > 1:
+        list(_get_trans_executor().map(trans_one, solo))
+    elif solo:
+        trans_one(solo[0])
+
+    if engine and fresh:
+        _memory_store(engine, source, target, fresh, module)
+
+    if len(unique) < len(texts) or chunks:
+        logger.debug(f"[Trans] 일괄 번역: {len(texts)}건 -> 메모리 {remembered}건, 요청 {len(unique)}건, 묶음 요청 {len(chunks)}회")
+    return [translated.get(text, text) if isinstance(text, str) else text for text in texts]